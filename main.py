@@ -8,6 +8,11 @@ from PySide6.QtWidgets import QApplication
 from widgets.main_window import ChainFlowFiler
 
 if __name__ == "__main__":
+    # v12.12 デバッグ: GUI スレッドでのファイルシステム呼び出しを stderr に記録する
+    if os.environ.get("CFF_TRACE_GUI_IO"):
+        from models.stat_service import enable_gui_io_trace
+        enable_gui_io_trace()
+
     # Windows Taskbar Icon Fix
     import ctypes
     myappid = 'antigravity.chainflowfiler.v12.0' # Versioned AppID
@@ -0,0 +1,114 @@
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class _Burst:
+    __slots__ = ("first", "deadline", "window", "count")
+
+    def __init__(self, first, window):
+        self.first = first
+        self.deadline = first + window
+        self.window = window
+        self.count = 1
+
+
+class ChangeCoalescer(QObject):
+    """
+    v12.10 ディレクトリ変更通知のバースト（ビルドや展開で数万件が書かれる等）を
+    ディレクトリごとにまとめ、1回の directoryChanged にして流す。
+
+    通知を受けると窓（最初は MIN_WINDOW_MS）の間だけ待ち、その間に次の通知が来れば
+    窓を延ばす。フラッシュ直後にまた通知が来る（変更が続いている）ときは次の窓を倍にして
+    MAX_WINDOW_MS まで広げ、静かになれば最小に戻す。どれだけ通知が続いても、
+    最初の通知から MAX_LATENCY_MS 以内には必ずフラッシュするので、単発の変更は
+    ほぼ即座に、連続した変更も一定間隔で画面に反映される。
+    """
+    directoryChanged = Signal(str)
+
+    MIN_WINDOW_MS = 30
+    MAX_WINDOW_MS = 250
+    MAX_LATENCY_MS = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.min_window_ms = self.MIN_WINDOW_MS
+        self.max_window_ms = self.MAX_WINDOW_MS
+        self.max_latency_ms = self.MAX_LATENCY_MS
+        self._bursts = {}      # path -> _Burst
+        self._last_flush = {}  # path -> (フラッシュ時刻, そのときの窓)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush_due)
+
+    def configure(self, min_window_ms=None, max_window_ms=None, max_latency_ms=None):
+        """窓と最大遅延を変更する（単位はミリ秒）"""
+        if min_window_ms is not None:
+            self.min_window_ms = min_window_ms
+        if max_window_ms is not None:
+            self.max_window_ms = max_window_ms
+        if max_latency_ms is not None:
+            self.max_latency_ms = max_latency_ms
+
+    def notify(self, path):
+        """path の変更通知を1件受け付ける"""
+        now = time.monotonic()
+        burst = self._bursts.get(path)
+        if burst is None:
+            burst = self._bursts[path] = _Burst(now, self._initial_window(path, now))
+        else:
+            burst.count += 1
+            burst.deadline = now + burst.window
+        burst.deadline = min(burst.deadline, burst.first + self.max_latency_ms / 1000)
+        self._schedule()
+
+    def flush(self, path=None):
+        """待たずに即座に流す（path 省略時はすべて）"""
+        paths = [path] if path is not None else list(self._bursts)
+        for p in paths:
+            if p in self._bursts:
+                self._emit(p, time.monotonic())
+        self._schedule()
+
+    def pendingCount(self):
+        return len(self._bursts)
+
+    # --- internal ---
+
+    def _initial_window(self, path, now):
+        """直前のフラッシュから間がなければ、変更が続いているとみなして窓を広げる"""
+        last = self._last_flush.get(path)
+        if last and now - last[0] < self.max_window_ms / 1000:
+            return min(last[1] * 2, self.max_window_ms / 1000)
+        return self.min_window_ms / 1000
+
+    def _schedule(self):
+        if not self._bursts:
+            self._timer.stop()
+            return
+        deadline = min(b.deadline for b in self._bursts.values())
+        self._timer.start(max(0, int((deadline - time.monotonic()) * 1000)))
+
+    def _flush_due(self):
+        now = time.monotonic()
+        for path in [p for p, b in self._bursts.items() if b.deadline <= now + 0.001]:
+            self._emit(path, now)
+        self._schedule()
+
+    def _emit(self, path, now):
+        burst = self._bursts.pop(path)
+        self._last_flush[path] = (now, burst.window)
+        if len(self._last_flush) > 256:
+            # 古い履歴は窓の計算に使われないので捨てる
+            horizon = now - self.max_window_ms / 1000
+            self._last_flush = {p: v for p, v in self._last_flush.items() if v[0] >= horizon}
+        self.directoryChanged.emit(path)
+
+
+_shared_coalescer = None
+
+def shared_change_coalescer():
+    """プロセス共有の変更通知まとめ役を返す"""
+    global _shared_coalescer
+    if _shared_coalescer is None:
+        _shared_coalescer = ChangeCoalescer()
+    return _shared_coalescer
@@ -0,0 +1,314 @@
+import fnmatch
+import mmap
+import os
+import re
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from models.prefetcher import lower_thread_priority
+from models.tree_walk import outermost_roots
+
+# バイナリ判定に見る先頭のバイト数（NUL を含めばバイナリとして飛ばす。git/grep と同じ考え方）
+BINARY_PROBE = 8192
+SNIPPET_CHARS = 160
+
+
+class GrepOptions:
+    """
+    v12.19 内容検索の条件。
+    include/exclude はファイル名の glob（";" や "," 区切りの文字列でも可）。exclude はフォルダ名にも効く
+    """
+    __slots__ = ("pattern", "regex", "case_sensitive", "include", "exclude",
+                 "max_file_size", "max_hits_per_file")
+
+    def __init__(self, pattern, regex=False, case_sensitive=False, include=(), exclude=(),
+                 max_file_size=64 * 1024 * 1024, max_hits_per_file=100):
+        self.pattern = pattern
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        self.include = _split_globs(include)
+        self.exclude = _split_globs(exclude)
+        self.max_file_size = max_file_size
+        self.max_hits_per_file = max_hits_per_file
+
+    def compile(self):
+        """バイト列に対する正規表現を返す（不正な正規表現は re.error）"""
+        source = self.pattern.encode("utf-8")
+        if not self.regex:
+            source = re.escape(source)
+        # バイト列の IGNORECASE は ASCII のみ（UTF-8 の多バイト文字は大文字小文字を区別する）
+        return re.compile(source, 0 if self.case_sensitive else re.IGNORECASE)
+
+
+def _split_globs(globs):
+    if isinstance(globs, str):
+        globs = re.split(r"[;,\s]+", globs)
+    return tuple(g for g in globs if g)
+
+
+def _glob_match(name, globs):
+    return any(fnmatch.fnmatch(name, g) for g in globs)
+
+
+def _size_of(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def search_file(path, regex, max_hits=100, max_size=None):
+    """
+    path を mmap して regex の一致を探し、[(行番号, 抜粋, 行内の位置)] を返す。
+    空・大きすぎる・バイナリ（先頭に NUL がある）ファイルは None（数えない）
+    """
+    try:
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0 or (max_size and size > max_size):
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm.find(b"\0", 0, BINARY_PROBE) != -1:
+                    return None
+                hits = []
+                line_no = 1
+                counted_to = 0
+                next_line = 0
+                for m in regex.finditer(mm):
+                    start = m.start()
+                    if start < next_line:
+                        continue # 同じ行の2つ目以降の一致
+                    line_no += mm[counted_to:start].count(b"\n")
+                    counted_to = start
+                    line_start = mm.rfind(b"\n", 0, start) + 1
+                    line_end = mm.find(b"\n", start)
+                    if line_end == -1:
+                        line_end = size
+                    next_line = line_end + 1
+                    hits.append((line_no, *_snippet(mm[line_start:line_end], start - line_start)))
+                    if len(hits) >= max_hits:
+                        break
+                return hits
+    except (OSError, ValueError):
+        return None # 読めない・途中で消えた・mmap できない（特殊ファイル）
+
+
+def _snippet(line, column):
+    """行の一致位置を中心に SNIPPET_CHARS 文字までを切り出す"""
+    prefix = line[:column].decode("utf-8", "replace")
+    text = (prefix + line[column:].decode("utf-8", "replace")).rstrip("\r").replace("\t", " ")
+    column = len(prefix)
+    if len(text) > SNIPPET_CHARS:
+        start = max(0, min(column - SNIPPET_CHARS // 4, len(text) - SNIPPET_CHARS))
+        text = ("…" if start else "") + text[start:start + SNIPPET_CHARS] + "…"
+        column -= start
+    stripped = text.lstrip()
+    return stripped.rstrip(), max(0, column - (len(text) - len(stripped)))
+
+
+class GrepJob:
+    """1回分の内容検索。cancelled が立ったら列挙も照合も途中でやめる"""
+
+    def __init__(self, token, roots, options):
+        self.token = token
+        self.roots = roots
+        self.options = options
+        self.cancelled = False
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.files = 0   # 照合したファイル数
+        self.bytes = 0   # 照合したバイト数
+        self.hits = 0
+        self.matched_files = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class ContentSearch(QObject):
+    """
+    v12.19 フォルダ（とファイル）以下のファイルの内容を並列に検索する。
+    列挙は1本のスレッドで行い、見つけたファイルをワーカー（WORKERS 本）に渡して mmap で照合する。
+    一致したファイルごとに hitsFound(番号, パス, [(行番号, 抜粋, 行内の位置)]) を流し、
+    PROGRESS_MS ごとに progress(番号, ファイル数, バイト数, 経過秒) を出す。
+    未処理のファイルは MAX_QUEUED まとまりまでしか持たない（数百万ファイルでもメモリが増えない）。
+    一致が MAX_HITS 件に達したら打ち切る。
+    """
+    hitsFound = Signal(int, str, list)
+    progress = Signal(int, int, object, float) # バイト数は 2GB を超えるので object
+    finished = Signal(int, int, object, int, bool) # 番号, ファイル数, バイト数, 一致数, 中断したか
+    _hits = Signal(object, str, list)   # ワーカー -> GUI スレッド
+    _done = Signal(object)
+
+    WORKERS = min(8, (os.cpu_count() or 2))
+    MAX_QUEUED = WORKERS * 4 # 未処理のまとまりの数
+    BATCH_FILES = 64         # ワーカーへは小さなファイルをまとめて渡す（1件ずつだとスレッド間の受け渡しが律速になる）
+    BATCH_BYTES = 4 * 1024 * 1024
+    MAX_HITS = 20000
+    PROGRESS_MS = 250
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._job = None
+        self._token = 0
+        self._pool = ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix="cff-grep",
+                                        initializer=lower_thread_priority)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._emit_progress)
+        self._hits.connect(self._on_hits)
+        self._done.connect(self._on_done)
+
+    def start(self, roots, options):
+        """検索を始めて番号を返す（走行中の検索は打ち切る）。不正な正規表現は re.error"""
+        regex = options.compile()
+        self.cancel()
+        self._token += 1
+        job = self._job = GrepJob(self._token, list(roots), options)
+        threading.Thread(target=self._walk, args=(job, regex), name="cff-grep-walk", daemon=True).start()
+        self._timer.start(self.PROGRESS_MS)
+        return job.token
+
+    def cancel(self):
+        if self._job:
+            self._job.cancel()
+
+    def isRunning(self):
+        return self._job is not None
+
+    def close(self):
+        """打ち切ってワーカーを片付ける（検索画面を閉じるとき）"""
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- internal ---
+
+    def _walk(self, job, regex):
+        slots = threading.BoundedSemaphore(self.MAX_QUEUED)
+        pending = []
+        batch, batch_bytes = [], 0
+        try:
+            for path, size in self._files(job):
+                batch.append(path)
+                batch_bytes += size
+                if len(batch) < self.BATCH_FILES and batch_bytes < self.BATCH_BYTES:
+                    continue
+                if not self._submit(job, regex, batch, slots, pending):
+                    break
+                batch, batch_bytes = [], 0
+            else:
+                if batch:
+                    self._submit(job, regex, batch, slots, pending)
+        finally:
+            for future in pending:
+                try:
+                    future.result()
+                except (Exception, CancelledError):
+                    pass
+            self._notify(self._done, job)
+
+    def _submit(self, job, regex, batch, slots, pending):
+        """batch をワーカーに渡す。打ち切られたら False"""
+        # ワーカーが追いつくまで待つ（打ち切りを見られるようにタイムアウト付き）
+        while not slots.acquire(timeout=0.2):
+            if job.cancelled:
+                return False
+        if job.cancelled:
+            return False
+        try:
+            future = self._pool.submit(self._scan, job, batch, regex)
+        except RuntimeError: # close() 済み
+            return False
+        future.add_done_callback(lambda _: slots.release())
+        pending.append(future)
+        if len(pending) > self.MAX_QUEUED * 4:
+            pending[:] = [f for f in pending if not f.done()]
+        return True
+
+    def _files(self, job):
+        """
+        照合するファイルの (パス, サイズ) を順に返す。
+        シンボリックリンクのフォルダは辿らず、空・大きすぎるファイルは開く前に除く
+        """
+        options = job.options
+        include, exclude = options.include, options.exclude
+        max_size = options.max_file_size
+        for root in outermost_roots(job.roots):
+            if not os.path.isdir(root):
+                try:
+                    size = os.path.getsize(root)
+                except OSError:
+                    continue
+                if size and not (max_size and size > max_size):
+                    yield root, size
+                continue
+            stack = [root]
+            while stack:
+                if job.cancelled:
+                    return
+                directory = stack.pop()
+                try:
+                    with os.scandir(directory) as it:
+                        entries = sorted(it, key=lambda e: e.name)
+                except OSError:
+                    continue
+                subdirs = []
+                for e in entries:
+                    if exclude and _glob_match(e.name, exclude):
+                        continue
+                    try:
+                        if e.is_dir(follow_symlinks=False):
+                            subdirs.append(e.path)
+                            continue
+                        if not e.is_file():
+                            continue
+                        if include and not _glob_match(e.name, include):
+                            continue
+                        size = e.stat().st_size
+                    except OSError:
+                        continue
+                    if size and not (max_size and size > max_size):
+                        yield e.path, size
+                stack.extend(reversed(subdirs)) # 名前順に潜る
+
+    def _scan(self, job, paths, regex):
+        options = job.options
+        for path in paths:
+            if job.cancelled:
+                return
+            hits = search_file(path, regex, options.max_hits_per_file)
+            with job.lock:
+                job.files += 1
+                if hits is not None:
+                    job.bytes += _size_of(path)
+                if hits:
+                    job.hits += len(hits)
+                    job.matched_files += 1
+                    if job.hits >= self.MAX_HITS:
+                        job.cancel()
+            if hits:
+                self._notify(self._hits, job, path, hits)
+
+    def _notify(self, signal, *args):
+        try:
+            signal.emit(*args)
+        except RuntimeError: # 検索画面が既に破棄済み
+            pass
+
+    def _on_hits(self, job, path, hits):
+        if job is self._job:
+            self.hitsFound.emit(job.token, path, hits)
+
+    def _emit_progress(self):
+        job = self._job
+        if job is not None:
+            self.progress.emit(job.token, job.files, job.bytes, time.monotonic() - job.started)
+
+    def _on_done(self, job):
+        if job is not self._job:
+            return
+        self._job = None
+        self._timer.stop()
+        self.progress.emit(job.token, job.files, job.bytes, time.monotonic() - job.started)
+        self.finished.emit(job.token, job.files, job.bytes, job.hits, job.cancelled)
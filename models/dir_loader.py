@@ -0,0 +1,186 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, Signal
+
+from models.listing_cache import dir_signature
+
+
+def make_row(dir_entry, with_stat=True):
+    """
+    os.DirEntry から (name, is_dir, size, mtime) のタプルを作る（キャッシュ格納用）。
+    v12.6 with_stat=False なら d_type だけで判定し、size/mtime は None（未取得）にする。
+    """
+    try:
+        is_dir = dir_entry.is_dir()
+        if not with_stat:
+            return (dir_entry.name, is_dir, None, None)
+        st = dir_entry.stat()
+        return (dir_entry.name, is_dir, st.st_size, st.st_mtime)
+    except OSError:
+        # リンク切れなど。名前だけは表示する
+        return (dir_entry.name, False, 0, 0.0)
+
+
+def scan_directory(path, with_stat=True):
+    """os.scandir で1階層だけ列挙し、行タプルのリストを返す（同期版）"""
+    with os.scandir(path) as it:
+        return [make_row(e, with_stat) for e in it]
+
+
+_io_pool = None
+
+def io_thread_pool():
+    """
+    v12.3 ディレクトリ列挙専用のスレッドプール。
+    QRunnable は寿命管理が PySide 側と衝突しやすいので、素の Python スレッドを使う。
+    Qt の Signal は別スレッドから emit しても Queued 接続でGUIスレッドに届く。
+    """
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cff-io")
+    return _io_pool
+
+
+class LoaderChannel(QObject):
+    """ワーカー→GUIスレッドへの通知用（Queued接続で届く）"""
+    batchReady = Signal(int, list)        # generation, rows
+    finished = Signal(int, list, str)     # generation, rows(スナップショット時のみ), error
+    statReady = Signal(int, list, bool)   # stat世代, [(name, size, mtime)], 一括取得か
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.loader = None # 現在走行中のローダー
+        self.stat_job = None # 走行中の一括stat
+
+    def cancel(self):
+        self.cancel_loader()
+        self.cancel_stat()
+
+    def cancel_loader(self):
+        if self.loader:
+            self.loader.cancel()
+            self.loader = None
+
+    def cancel_stat(self):
+        if self.stat_job:
+            self.stat_job.cancel()
+            self.stat_job = None
+
+
+class DirectoryLoader:
+    """
+    v12.3 ワーカースレッドで os.scandir を回し、結果を小分けにGUIスレッドへ送る。
+    stream=True のときは batch_size 件または batch_interval 秒ごとに batchReady を出す。
+    stream=False のときは全件を finished でまとめて返す（再スキャン差分用）。
+
+    v12.4 cache を渡すと、ディレクトリの mtime/inode が変わっていない限り
+    再列挙せずキャッシュ内容を1バッチで返す。列挙した結果はキャッシュに登録する。
+    キャッシュはフォルダ自身の mtime しか見ないので、ファイルの中身だけが変わっても古い
+    サイズ・日付を返す。再スキャン（reuse=False）はキャッシュを使わずに列挙し、結果で上書きする。
+
+    v12.7 結果は (name, is_dir, size, mtime) のタプルのまま送る（受け手が EntryStore に詰める）。
+    """
+    def __init__(self, channel, generation, path, stream=True,
+                 batch_size=2000, batch_interval=0.016, cache=None, with_stat=True, reuse=True):
+        self.cache = cache
+        self.reuse = reuse
+        self.from_cache = False # キャッシュの内容を返したか
+        self.with_stat = with_stat
+        self.channel = channel
+        self.generation = generation
+        self.path = path
+        self.stream = stream
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        if self.cache is not None and self.reuse:
+            rows = self.cache.get(self.path)
+            if rows is not None:
+                self.from_cache = True
+                self._emit_final(rows, "")
+                return
+
+        batch = []
+        rows = []
+        error = ""
+        signature = None
+        try:
+            # 列挙前の状態を控える（列挙中の変更は次回の検証で弾かれる）
+            signature = dir_signature(self.path)
+            last_emit = time.monotonic()
+            with os.scandir(self.path) as it:
+                for e in it:
+                    if self.cancelled:
+                        return
+                    row = make_row(e, self.with_stat)
+                    rows.append(row)
+                    batch.append(row)
+                    if self.stream and (len(batch) >= self.batch_size or
+                                        time.monotonic() - last_emit >= self.batch_interval):
+                        self.channel.batchReady.emit(self.generation, batch)
+                        batch = []
+                        last_emit = time.monotonic()
+        except OSError as e:
+            error = str(e)
+        except RuntimeError: # 受け手のモデルが破棄済み
+            return
+
+        if self.cancelled:
+            return
+        if self.cache is not None and signature is not None and not error:
+            self.cache.put(self.path, rows, signature)
+        self._emit_final(batch if self.stream else rows, error)
+
+    def _emit_final(self, rows, error):
+        try:
+            if self.stream:
+                if rows:
+                    self.channel.batchReady.emit(self.generation, rows)
+                self.channel.finished.emit(self.generation, [], error)
+            else:
+                self.channel.finished.emit(self.generation, rows, error)
+        except RuntimeError:
+            pass
+
+
+class StatJob:
+    """
+    v12.6 名前のリストをワーカースレッドで stat し、chunk 件ごとに statReady で返す。
+    遅延stat（表示中の行だけ）と、サイズ/日付ソート時の一括取得の両方で使う。
+    """
+    def __init__(self, channel, generation, root, names, bulk=False, chunk=2000):
+        self.channel = channel
+        self.generation = generation
+        self.root = root
+        self.names = names
+        self.bulk = bulk
+        self.chunk = chunk
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        results = []
+        try:
+            for name in self.names:
+                if self.cancelled:
+                    return
+                try:
+                    st = os.stat(os.path.join(self.root, name))
+                    results.append((name, st.st_size, st.st_mtime))
+                except OSError:
+                    results.append((name, 0, 0.0))
+                if len(results) >= self.chunk:
+                    self.channel.statReady.emit(self.generation, results, self.bulk)
+                    results = []
+            if results and not self.cancelled:
+                self.channel.statReady.emit(self.generation, results, self.bulk)
+        except RuntimeError: # 受け手のモデルが破棄済み
+            pass
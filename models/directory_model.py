@@ -0,0 +1,1174 @@
+import os
+import shutil
+import sys
+from collections import OrderedDict
+from PySide6.QtGui import QStandardItemModel
+from PySide6.QtCore import (Qt, QModelIndex, QMimeData, QUrl,
+                            QDateTime, QLocale, QFileInfo, QTimer, Signal)
+
+from models.dir_loader import DirectoryLoader, LoaderChannel, StatJob, io_thread_pool
+from models.entry_store import EntryStore, FLAG_DIR, FLAG_STAT, FLAG_HIDDEN, FLAG_DELETED
+from models.folder_sizes import shared_folder_size_service
+from models.fuzzy import FuzzyMatcher
+from models.change_coalescer import shared_change_coalescer
+from models.icon_cache import shared_icon_cache
+from models.io_policy import LOCAL_PROFILE
+from models.listing_cache import shared_listing_cache
+from models.sort_keys import SortKeys
+from models.stat_service import shared_stat_service
+from models.watch_service import WatchHandle
+
+
+class FlatDirectoryModel(QStandardItemModel):
+    """
+    v12.2 レーンビュー専用の軽量フラットモデル。
+    レーンのビューはサブツリーを展開しないため、QFileSystemModel の階層構造は不要。
+    os.scandir の結果を1ディレクトリ分だけ保持し、QFileSystemModel と同じ
+    Name/Size/Type/Date の4カラム・編集・ドラッグ＆ドロップを提供する。
+
+    v12.3 列挙はワーカースレッドで行い、届いたバッチから順に行を挿入する。
+    未反映のバッチは canFetchMore/fetchMore で即座に取り込める。
+
+    v12.6 lazy_stat=True のときは列挙時に stat せず（d_type のみ）、Size/Date は
+    ビューが実際に描画した行（data() が呼ばれた行）の分だけワーカーでまとめて取得する。
+    サイズ/日付でソートする間は setFullStat(True) で全件を一括取得する。
+
+    v12.7 行データは EntryStore（列指向の配列）に持つ。
+
+    v12.8 並び替えと絞り込み（隠しファイル・表示モード・名前検索）もモデル自身が行う。
+    SortKeys が事前計算したキーで全件を並べた _all と、それを絞り込んだ _order を持ち、
+    モデルの行番号は _order の添字（値は EntryStore の行番号）。
+    QSortFilterProxyModel の Python 版 lessThan/filterAcceptsRow は行数に比例して
+    仮想関数呼び出しが発生するため、ビューとの間には FlatProxyModel（恒等Proxy）を挟む。
+
+    基底クラスを QStandardItemModel にしているのは、アイテムを作らずに行数だけを持たせると
+    index()/flags()/rowCount() が C++ 側で完結するため。QTreeView は並び替えなどの再レイアウトの
+    たびに全行の index() と flags() を呼ぶので、これらが Python にあると10万行で数秒かかる。
+    Python で実装するのは data()/setData() などビューが表示中の行にしか呼ばないものだけにし、
+    行の増減は insertRows/removeRows、並び替えは layoutChanged、移動は beginMoveRows で通知する
+    （アイテムは常に空なので内部の並びを入れ替える必要はない）。
+
+    v12.9 監視で見つかった追加・削除や stat 結果による値の変化は、差分が小さければ
+    キーの二分探索で1件ずつ挿入/削除/移動し、全体の並べ直しや layoutChanged は出さない。
+
+    v12.13 io_profile（IoProfile）で列挙のバッチ件数と監視方式（変更通知/定期確認）を決める。
+    プロファイルが lazy_stat を求める場合は引数に関わらず遅延statにする。
+
+    v12.15 名前検索は nameFilterJob() でワーカーに照合させ、applyNameMatch() で一度に反映できる。
+
+    v12.16 照合結果はクエリごとに覚えておく。クエリが前のクエリを含む（"rep" → "repo"）場合、
+    結果は前の結果の部分集合なので、前の結果の行だけを照合し直す。同じクエリに戻った
+    （バックスペース）場合は覚えた結果をそのまま使う。結果を使える間は表示順も全件を
+    走査せず、一致した行だけをキーで並べて作るので、1回の絞り込みは一致件数に比例する。
+
+    v12.18 setFuzzyMatching(True) で名前検索を fzf 風のあいまい照合（models/fuzzy.py）にする。
+    照合結果は行 -> 点数を持ち、表示は点数の高い順（同点はキーの順）に並ぶ。
+    その間は表示順がキーの順ではないので、差分の反映は二分探索を使わず全体を作り直す。
+
+    v12.23 setFolderSizes(True) の間は Size 列にフォルダ以下の合計（FolderSizeService）を出す。
+    並びに使う値は SortKeys.dir_sizes に写しておき、合計が届くたびに stat 結果と同じく
+    1行ずつ位置を付け直す（読み込みが終わったときはキャッシュにある分をまとめて写す）。
+    """
+    COLUMNS = ("Name", "Size", "Type", "Date Modified")
+    FIRST_SCREEN_ROWS = 200
+    # 行の挿入/削除を区間ごとに通知する上限（超えたらレイアウト変更1回にまとめる）
+    MAX_NOTIFY_RANGES = 16
+    # v12.9 この件数（かつ全体の 1/64）以下の差分は、並べ直さずに1件ずつ二分探索で反映する
+    MAX_INCREMENTAL = 64
+    # v12.16 名前検索の結果をクエリごとに覚えておく件数
+    MAX_MATCH_CACHE = 32
+
+    loadingProgress = Signal(int)   # 読み込み済み件数
+    loadingFinished = Signal(str)   # エラーメッセージ（成功時は空）
+    statProgress = Signal(int, int) # 一括stat: 取得済み件数, 対象件数
+
+    def __init__(self, path, parent=None, lazy_stat=False, natural_sort=True, io_profile=None):
+        super().__init__(0, len(self.COLUMNS), parent)
+        self._io_profile = io_profile or LOCAL_PROFILE
+        self.setHorizontalHeaderLabels(list(self.COLUMNS))
+        self._root_path = ""
+        self._store = EntryStore()
+        self._read_only = False
+
+        # v12.8 並び順と絞り込み
+        self._keys = SortKeys(self._store, natural=natural_sort)
+        self._all = []    # 生存中の全エントリ（ストア行番号）を現在の順に並べたもの
+        self._order = []  # 表示中のエントリ。モデルの行番号 = この添字
+        self._show_hidden = False
+        self._display_mode = 0 # 0: All, 1: Dirs Only, 2: Files Only
+        self._name_filter = ""
+        self._order_stale = False # v12.9 キーの変更がまだ並びに反映されていない（一括stat中など）
+        self._order_ranked = False # v12.18 _order が点数順になっている
+        # v12.15 ワーカーで照合済みの名前検索の結果（_NameMatch）。ストア行番号が変わると無効
+        self._name_match = None
+        self._store_epoch = 0
+        self._match_cache = OrderedDict() # v12.16 クエリ -> _NameMatch（絞り込みの再利用用）
+        self._fuzzy = False          # v12.18 あいまい照合で検索し、点数順に並べる
+        self._name_matcher = None    # あいまい照合中の FuzzyMatcher
+        self._folder_sizes = None    # v12.23 サイズ列にフォルダの合計を出すときの FolderSizeService
+
+        # v12.6 遅延statの状態
+        self._lazy_stat = lazy_stat or self._io_profile.lazy_stat
+        self._full_stat = False
+        self._stat_generation = 0
+        self._stat_wanted = set()
+        self._stat_inflight = set()
+        # キャッシュ（や先読み）から返した行のうち、まだ stat を取り直していないものの名前。
+        # 表示されたときに1件ずつ裏で取り直す（一覧全体は読み直さない）
+        self._restat = set()
+        self._bulk_total = 0
+        self._bulk_done = 0
+        self._stat_timer = QTimer(self)
+        self._stat_timer.setSingleShot(True)
+        self._stat_timer.timeout.connect(self._flush_stat_requests)
+
+        # 非同期列挙の状態
+        self._generation = 0
+        self._loader = None
+        self._pending = []
+        self._loading = False
+        self._refresh_requested = False
+        self._channel = LoaderChannel()
+        self._channel.batchReady.connect(self._on_batch_ready)
+        self._channel.finished.connect(self._on_loader_finished)
+        self._channel.statReady.connect(self._on_stat_ready)
+        # モデル破棄時は走行中の列挙も止める（selfではなくchannelだけを束縛）
+        self.destroyed.connect(lambda *_, ch=self._channel: ch.cancel())
+
+        # v12.11 監視は共有サービスから参照カウントで借りる（破棄時に必ず返す）
+        self._watch = WatchHandle()
+        self.destroyed.connect(lambda *_, w=self._watch: w.release())
+        # v12.10 変更通知のバーストはまとめてから1回の再スキャンにする
+        shared_change_coalescer().directoryChanged.connect(self._on_directory_settled)
+        # v12.14 ファイルごとのアイコンが揃ったら、その行だけ描き直す
+        shared_icon_cache().iconReady.connect(self._on_icon_ready)
+
+        self.setRootPath(path)
+
+    # --- QFileSystemModel 互換API ---
+
+    def rootPath(self):
+        return self._root_path
+
+    def setRootPath(self, path):
+        path = os.path.abspath(path)
+        if path == self._root_path:
+            return
+        self._watch.release()
+        self._root_path = path
+
+        if self._order:
+            self.removeRows(0, len(self._order))
+        self._store = EntryStore()
+        self._store_epoch += 1
+        self._match_cache.clear()
+        self._keys.attach(self._store)
+        self._all = []
+        self._order = []
+        self._order_stale = False
+        self._order_ranked = False
+        self._pending = []
+        self._reset_stat_state()
+
+        self._start_loader(stream=True)
+        self._watch_root()
+
+    def isLoading(self):
+        return self._loading
+
+    def loadedCount(self):
+        return self._store.live_count() + len(self._pending)
+
+    def cancelLoading(self):
+        self._channel.cancel_loader()
+        self._loader = None
+        self._loading = False
+
+    def stopWatching(self):
+        """v12.11 ディレクトリ監視を返す（ビューを外すときに、破棄を待たずに呼ぶ）"""
+        self._watch.release()
+
+    def ioProfile(self):
+        return self._io_profile
+
+    def isLazyStat(self):
+        return self._lazy_stat
+
+    def setFullStat(self, enabled):
+        """
+        v12.6 True の間は全エントリの stat を揃える（サイズ/日付ソート用）。
+        読み込み中なら完了後に一括取得を始める。
+        """
+        self._full_stat = enabled
+        if enabled and not self._loading:
+            self._start_bulk_stat()
+
+    def statProgressInfo(self):
+        """一括stat中なら (取得済み, 対象件数)、それ以外は None"""
+        if self._bulk_total and self._bulk_done < self._bulk_total:
+            return (self._bulk_done, self._bulk_total)
+        return None
+
+    def setFolderSizes(self, enabled):
+        """v12.23 Size 列にフォルダ以下の合計（サイズ・項目数）を出し、サイズ順の並びにも使う"""
+        if enabled == (self._folder_sizes is not None):
+            return
+        if enabled:
+            self._folder_sizes = shared_folder_size_service()
+            self._folder_sizes.sizeReady.connect(self._on_folder_size)
+            self._keys.dir_sizes = {}
+            self._sync_dir_sizes()
+        else:
+            self._folder_sizes.sizeReady.disconnect(self._on_folder_size)
+            self._folder_sizes = None
+            self._keys.dir_sizes = None
+            if self._keys.column == 1:
+                self._resort()
+        if self._order:
+            self.dataChanged.emit(self.index(0, 1), self.index(len(self._order) - 1, 1))
+
+    def setReadOnly(self, read_only):
+        self._read_only = read_only
+
+    def index_for_path(self, path):
+        """パスから Index を返す。ルート自身は無効Index（＝ビューのルート）"""
+        path = os.path.abspath(path)
+        if path == self._root_path:
+            return QModelIndex()
+        if os.path.dirname(path) == self._root_path:
+            i = self._store.row_of(os.path.basename(path))
+            if i is not None:
+                row = self._row_of_store_row(i)
+                if row is not None:
+                    return self.index(row, 0)
+        return QModelIndex()
+
+    def entryStore(self):
+        """v12.7 行データの列指向ストア（読み取り専用として扱うこと）"""
+        return self._store
+
+    def storeRow(self, row):
+        """v12.8 モデルの行番号 -> EntryStore の行番号"""
+        return self._order[row]
+
+    def emitStoreRowsChanged(self, store_rows, roles=(), max_ranges=64):
+        """
+        v12.25 ストア行の集合のうち表示中の行の全列について dataChanged を出す（マーク色の変更など）。
+        連続区間が max_ranges を超えるほど散らばっていれば、最初から最後の行までを1回で出す
+        """
+        rows = self._rows_of_store_rows(store_rows)
+        if not rows:
+            return
+        ranges = _contiguous_ranges(rows)
+        if len(ranges) > max_ranges:
+            ranges = [(rows[0], rows[-1])]
+        last_col = self.columnCount() - 1
+        for first, last in ranges:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, last_col), list(roles))
+
+    def storeEpoch(self):
+        """v12.24 EntryStore の行番号が付け替わる（ルート変更・リネーム・詰め直し）たびに増える番号"""
+        return self._store_epoch
+
+    def entry(self, row):
+        return self._store.entry(self._order[row])
+
+    def filePath(self, index):
+        if not index.isValid():
+            return self._root_path
+        return os.path.join(self._root_path, self._store.names[self._order[index.row()]])
+
+    def fileName(self, index):
+        if not index.isValid():
+            return os.path.basename(self._root_path)
+        return self._store.names[self._order[index.row()]]
+
+    def isDir(self, index):
+        if not index.isValid():
+            return True
+        return self._store.is_dir(self._order[index.row()])
+
+    def fileInfo(self, index):
+        return QFileInfo(self.filePath(index))
+
+    def remove(self, index):
+        """ファイル/フォルダを削除（QFileSystemModel.remove 互換）"""
+        path = self.filePath(index)
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except OSError as e:
+            print(f"Remove Error ({path}): {e}", file=sys.stderr)
+            return False
+        self._remove_names({os.path.basename(path)})
+        return True
+
+    def mkdir(self, parent, name):
+        """フォルダを作成（QFileSystemModel.mkdir 互換）"""
+        target = os.path.join(self.filePath(parent), name)
+        try:
+            os.mkdir(target)
+        except OSError as e:
+            print(f"Mkdir Error ({target}): {e}", file=sys.stderr)
+            return QModelIndex()
+        if os.path.dirname(target) == self._root_path:
+            # 作ったフォルダ1つだけを stat する（大きなフォルダでも親を列挙し直さない）
+            try:
+                st = os.stat(target)
+            except OSError:
+                pass # 直後に消された。監視からの通知に任せる
+            else:
+                self._insert_rows([(name, True, st.st_size, st.st_mtime)])
+        return self.index_for_path(target)
+
+    def refresh(self):
+        """ディレクトリをワーカーで再スキャンし、差分だけをモデルに反映する"""
+        if self._loading or self._loader is not None:
+            # 読み込み中・再スキャン中なら完了後にもう一度スキャンする
+            # （走行中のスキャンを止めて始め直すと、変更が続く間いつまでも反映されない）
+            self._refresh_requested = True
+            return
+        self._start_loader(stream=False)
+
+    def apply_snapshot(self, new_rows):
+        """再スキャン結果 (行タプルのリスト) と現在の内容を比較し、差分だけを反映する"""
+        store = self._store
+        new_by_name = {r[0]: r for r in new_rows}
+
+        # 1. 消えたエントリを削除
+        self._remove_names({store.names[i] for i in self._all if store.names[i] not in new_by_name})
+
+        # 2. 既存エントリの更新
+        updates = []
+        moves = self._keys.column in (1, 3)
+        for i in self._all:
+            new = new_by_name[store.names[i]]
+            if new[3] is None and new[1] == store.is_dir(i):
+                continue # stat省略の再スキャン。既知の値はそのまま使い、下で取り直す
+            if new != store.row_tuple(i):
+                moves = moves or new[1] != store.is_dir(i)
+                updates.append((i, new))
+        self._update_rows(updates, store.set_row, moves, 0)
+
+        # 3. 新規エントリを追加
+        self._insert_rows([r for r in new_rows if r[0] not in store])
+
+        # 4. v12.6 取得済みだった stat を取り直す（変化した行だけ dataChanged になる）
+        if self._lazy_stat:
+            self._request_stats([store.names[i] for i in self._all if store.flags[i] & FLAG_STAT])
+            if self._full_stat:
+                self._start_bulk_stat()
+
+    # --- v12.8 並び替え・絞り込み ---
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """事前計算したキーで並び替える（同じ列の昇順/降順の切り替えは反転だけで済ませる）"""
+        descending = order == Qt.DescendingOrder
+        keys = self._keys
+        # v12.6 遅延statの場合、サイズ/日付ソートの間だけ全件の stat を揃える
+        self.setFullStat(column in (1, 3))
+        if column == keys.column and descending == keys.descending:
+            return
+        if column == keys.column:
+            keys.descending = descending
+            self._all = keys.reversed_rows(self._all)
+            # 表示中の行も同じ規則で反転すれば良い（絞り込み直しは不要）。点数順なら同点の中だけが変わる
+            self._set_order(self._visible_rows() if self._ranked() else keys.reversed_rows(self._order))
+        else:
+            keys.column = column
+            keys.descending = descending
+            self._resort()
+
+    def sortColumn(self):
+        return self._keys.column
+
+    def naturalSort(self):
+        return self._keys.natural
+
+    def setNaturalSort(self, enabled):
+        """名前を自然順 ("file2" < "file10") で比較するか"""
+        if enabled == self._keys.natural:
+            return
+        self._keys.set_natural(enabled)
+        self._resort()
+
+    def setShowHidden(self, show):
+        self._show_hidden = show
+        self._refilter()
+
+    def setDisplayMode(self, mode):
+        self._display_mode = mode
+        self._refilter()
+
+    def setNameFilter(self, text):
+        """名前の部分一致（大文字小文字を区別しない）で絞り込む"""
+        self._set_name_filter(text.casefold())
+        self._name_match = self._cached_match(self._name_filter)
+        self._refilter()
+
+    def fuzzyMatching(self):
+        return self._fuzzy
+
+    def setFuzzyMatching(self, enabled):
+        """v12.18 名前検索をあいまい照合（点数順の表示）にするか"""
+        if enabled == self._fuzzy:
+            return
+        self._fuzzy = enabled
+        self._match_cache.clear()
+        self.setNameFilter(self._name_filter)
+
+    def nameFilterJob(self, text):
+        """
+        v12.15 text の照合をワーカーで行う関数を返す（NameSearch 用）。
+        GUI スレッドでは行番号と名前のリストを写す（C レベルのコピー）だけで、
+        casefold と部分一致はワーカーで行う。結果は applyNameMatch() でまとめて反映する
+        """
+        folded = text.casefold()
+        cached = self._cached_match(folded)
+        if cached is not None:
+            return lambda job: cached
+        matcher = FuzzyMatcher(folded) if self._fuzzy else None
+        names = list(self._store.names)
+        epoch = self._store_epoch
+        base = self._narrowing_base(folded)
+        if base is not None:
+            # v12.16 前の結果 + その後に増えた行だけが候補
+            flags = self._store.flags
+            rows = list(base.rows)
+            rows.extend(i for i in range(base.limit, len(names)) if not flags[i] & FLAG_DELETED)
+        else:
+            rows = list(self._all)
+
+        def run(job):
+            if matcher is not None:
+                scores = matcher.match_many(names, rows, job)
+                return _NameMatch(folded, epoch, len(names), scores) if scores is not None else None
+            matched = set()
+            for start in range(0, len(rows), 4096):
+                if job.cancelled:
+                    return None
+                matched.update(i for i in rows[start:start + 4096] if folded in names[i].casefold())
+            return _NameMatch(folded, epoch, len(names), matched)
+        return run
+
+    def applyNameMatch(self, match):
+        """nameFilterJob() の結果で絞り込みを1回で入れ替える"""
+        if match is None:
+            return
+        if match.epoch != self._store_epoch:
+            # 照合中にストアの行番号が変わった（ルート変更・詰め直し・リネーム）
+            self.setNameFilter(match.text)
+            return
+        self._set_name_filter(match.text)
+        self._name_match = match
+        self._match_cache[match.text] = match
+        self._match_cache.move_to_end(match.text)
+        while len(self._match_cache) > self.MAX_MATCH_CACHE:
+            self._match_cache.popitem(last=False)
+        self._refilter()
+
+    def cachedNameMatch(self, text):
+        """v12.16 text の照合結果を覚えていれば返す（無ければ None）"""
+        return self._cached_match(text.casefold())
+
+    # --- 遅延取り込み (fetchMore) ---
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and bool(self._pending)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """ワーカーから届いているが未反映のバッチを行として取り込む"""
+        if parent.isValid() or not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._insert_rows(pending)
+
+    # --- QAbstractItemModel ---
+    # index()/rowCount()/columnCount()/flags()/headerData() は基底クラス（C++）のものを使う
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        store = self._store
+        i = self._order[index.row()]
+        col = index.column()
+
+        if role == Qt.DisplayRole or role == Qt.EditRole:
+            if col == 0:
+                return store.names[i]
+            if col == 2:
+                return store.type_name(i)
+            f = store.flags[i]
+            if self._restat and store.names[i] in self._restat:
+                self._restat.discard(store.names[i])
+                self._want_stat(store.names[i]) # 古いかもしれない値を出しつつ裏で取り直す
+            if col == 1:
+                if f & FLAG_DIR:
+                    if self._folder_sizes is not None:
+                        return self._folder_sizes.displayText(os.path.join(self._root_path, store.names[i]))
+                    return ""
+                if not f & FLAG_STAT:
+                    self._want_stat(store.names[i])
+                    return ""
+                return QLocale.system().formattedDataSize(store.sizes[i], 1, QLocale.DataSizeTraditionalFormat)
+            if col == 3:
+                if not f & FLAG_STAT:
+                    self._want_stat(store.names[i])
+                    return ""
+                dt = QDateTime.fromMSecsSinceEpoch(int(store.mtimes[i] * 1000))
+                return QLocale.system().toString(dt, QLocale.ShortFormat)
+        elif role == Qt.DecorationRole and col == 0:
+            # v12.14 種類ごとのキャッシュ（.exe などファイルごとに違うものは裏で解決して後から描き直す）
+            return shared_icon_cache().icon(self._root_path, store.names[i],
+                                            bool(store.flags[i] & FLAG_DIR), store.ext(i))
+        elif role == Qt.TextAlignmentRole and col == 1:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """リネーム"""
+        if role != Qt.EditRole or not index.isValid() or index.column() != 0 or self._read_only:
+            return False
+        new_name = str(value).strip()
+        i = self._order[index.row()]
+        old_name = self._store.names[i]
+        if not new_name or new_name == old_name or os.sep in new_name:
+            return False
+        old_path = os.path.join(self._root_path, old_name)
+        new_path = os.path.join(self._root_path, new_name)
+        if os.path.exists(new_path):
+            return False
+        try:
+            os.rename(old_path, new_path)
+        except OSError as err:
+            print(f"Rename Error ({old_path}): {err}", file=sys.stderr)
+            return False
+        # 名前キーが変わるので、変わる前の位置を控えてから正しい位置へ移す
+        all_pos, row = self._locate(i)
+        self._store.rename(i, new_name)
+        self._store_epoch += 1
+        self._keys.invalidate(i)
+        self._reposition(i, all_pos, row)
+        self._emit_rows_changed([i], 0, len(self.COLUMNS) - 1)
+        return True
+
+    # --- Drag & Drop ---
+
+    def supportedDragActions(self):
+        return Qt.CopyAction | Qt.MoveAction | Qt.LinkAction
+
+    def supportedDropActions(self):
+        return Qt.CopyAction | Qt.MoveAction | Qt.LinkAction
+
+    def mimeTypes(self):
+        return ["text/uri-list"]
+
+    def mimeData(self, indexes):
+        rows = sorted({idx.row() for idx in indexes if idx.isValid()})
+        mime = QMimeData()
+        mime.setUrls([QUrl.fromLocalFile(self.filePath(self.index(r, 0))) for r in rows])
+        return mime
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if not data.hasUrls() or self._read_only:
+            return False
+        # ファイルの上へのドロップは現在のフォルダへのドロップとして扱う
+        dest_dir = self.filePath(parent) if parent.isValid() and self.isDir(parent) else self._root_path
+        if not os.path.isdir(dest_dir):
+            return False
+
+        ok = True
+        for url in data.urls():
+            src = url.toLocalFile()
+            if not src:
+                continue
+            dest = os.path.join(dest_dir, os.path.basename(src))
+            if os.path.abspath(src) == os.path.abspath(dest):
+                continue
+            try:
+                if action == Qt.MoveAction:
+                    shutil.move(src, dest)
+                elif action == Qt.LinkAction:
+                    os.symlink(src, dest)
+                elif os.path.isdir(src):
+                    shutil.copytree(src, dest)
+                else:
+                    shutil.copy2(src, dest)
+            except OSError as e:
+                print(f"Drop Error ({src}): {e}", file=sys.stderr)
+                ok = False
+        self.refresh()
+        return ok
+
+    # --- internal ---
+
+    def _start_loader(self, stream):
+        self._channel.cancel_loader()
+        self._generation += 1
+        self._loading = stream
+        # v12.4 最近見たフォルダは共有キャッシュから即座に返る。
+        # 再スキャンはファイルの変更（フォルダの mtime は変わらない）を拾うため常に列挙し直す
+        self._loader = DirectoryLoader(self._channel, self._generation, self._root_path,
+                                       stream=stream, cache=shared_listing_cache(),
+                                       with_stat=not self._lazy_stat, reuse=stream,
+                                       batch_size=self._io_profile.batch_size)
+        self._channel.loader = self._loader
+        io_thread_pool().submit(self._loader.run)
+        if stream:
+            self.loadingProgress.emit(0)
+
+    def _on_batch_ready(self, generation, rows):
+        if generation != self._generation:
+            return # 古い（キャンセル済み）列挙の結果
+        self._pending.extend(rows)
+        # 最初の1画面分は即座に、それ以降は既存行数に比例した量が溜まってから反映する。
+        # ビューの再レイアウトは行数に比例するため、毎バッチ反映すると全体で O(n^2) になる。
+        n = len(self._all)
+        if n < self.FIRST_SCREEN_ROWS or len(self._pending) >= n // 4:
+            self.fetchMore()
+        self.loadingProgress.emit(self.loadedCount())
+
+    def _on_loader_finished(self, generation, rows, error):
+        if generation != self._generation:
+            return
+        from_cache = self._loader is not None and self._loader.from_cache
+        self._loader = None
+        if error:
+            print(f"Scan Error ({self._root_path}): {error}", file=sys.stderr)
+        if self._loading:
+            self.fetchMore()
+            if from_cache:
+                # キャッシュ（や先読み）の行のサイズ・日付は古いかもしれない（フォルダの mtime は
+                # ファイルの書き換えでは変わらない）。表示された行だけ裏で stat し直す
+                store = self._store
+                self._restat = {store.names[i] for i in self._all if store.flags[i] & FLAG_STAT}
+            self._loading = False
+            self._sync_dir_sizes()
+            self.loadingFinished.emit(error)
+            if self._full_stat:
+                self._start_bulk_stat()
+            if self._refresh_requested:
+                self._refresh_requested = False
+                self.refresh()
+        else:
+            if not error:
+                self.apply_snapshot(rows)
+                self._sync_dir_sizes()
+            if self._refresh_requested:
+                self._refresh_requested = False
+                self.refresh()
+
+    # --- v12.23 フォルダのサイズ列 ---
+
+    def _set_dir_size(self, i, nbytes):
+        self._keys.dir_sizes[self._store.names[i]] = nbytes
+
+    def _sync_dir_sizes(self):
+        """キャッシュにあるフォルダの合計を並びのキーに写す（変わった行だけ位置を付け直す）"""
+        if self._folder_sizes is None:
+            return
+        cache = self._folder_sizes.cache()
+        store = self._store
+        sizes = self._keys.dir_sizes
+        updates = []
+        for i in self._all:
+            if store.flags[i] & FLAG_DIR:
+                entry = cache.get(os.path.join(self._root_path, store.names[i]))
+                nbytes = -1 if entry is None else entry.bytes
+                if sizes.get(store.names[i], -1) != nbytes:
+                    updates.append((i, nbytes))
+        self._update_rows(updates, self._set_dir_size, self._keys.column == 1, 1)
+
+    def _on_folder_size(self, path):
+        """直下のフォルダの合計が届いた"""
+        folder, name = os.path.split(os.path.abspath(path))
+        if os.path.normcase(folder) != os.path.normcase(self._root_path):
+            return
+        i = self._store.row_of(name)
+        if i is None or not self._store.flags[i] & FLAG_DIR:
+            return
+        entry = self._folder_sizes.cache().get(path)
+        nbytes = -1 if entry is None else entry.bytes
+        if self._keys.dir_sizes.get(name, -1) == nbytes:
+            self._emit_rows_changed([i], 1, 1) # 項目数だけが変わった
+            return
+        self._update_rows([(i, nbytes)], self._set_dir_size, self._keys.column == 1, 1)
+
+    # --- v12.6 遅延stat ---
+
+    def _reset_stat_state(self):
+        """ルート変更時。走行中の stat 結果はすべて捨てる"""
+        self._channel.cancel_stat()
+        self._stat_generation += 1
+        self._stat_wanted.clear()
+        self._stat_inflight.clear()
+        self._restat.clear()
+        self._bulk_total = 0
+        self._bulk_done = 0
+
+    def _want_stat(self, name):
+        """data() から呼ばれる。同じイベントループ内の要求をまとめて1ジョブにする"""
+        if name in self._stat_inflight:
+            return
+        self._stat_wanted.add(name)
+        if not self._stat_timer.isActive():
+            self._stat_timer.start(0)
+
+    def _flush_stat_requests(self):
+        names, self._stat_wanted = list(self._stat_wanted), set()
+        self._request_stats(names)
+
+    def _request_stats(self, names):
+        names = [n for n in names if n not in self._stat_inflight]
+        if not names:
+            return
+        self._stat_inflight.update(names)
+        job = StatJob(self._channel, self._stat_generation, self._root_path, names)
+        io_thread_pool().submit(job.run)
+
+    def _start_bulk_stat(self):
+        """未取得の全エントリを一括で stat する（完了時にまとめて再ソートさせる）"""
+        if not self._lazy_stat or self._channel.stat_job:
+            return
+        store = self._store
+        inflight = self._stat_inflight
+        names = [store.names[i] for i in self._all
+                 if not store.flags[i] & FLAG_STAT and store.names[i] not in inflight]
+        if not names:
+            return
+        self._stat_inflight.update(names)
+        self._bulk_total = len(names)
+        self._bulk_done = 0
+        job = StatJob(self._channel, self._stat_generation, self._root_path, names, bulk=True)
+        self._channel.stat_job = job
+        io_thread_pool().submit(job.run)
+        self.statProgress.emit(0, self._bulk_total)
+
+    def _on_stat_ready(self, generation, results, bulk):
+        if generation != self._stat_generation:
+            return
+        store = self._store
+        updates = []
+        for name, size, mtime in results:
+            self._stat_inflight.discard(name)
+            i = store.row_of(name)
+            if i is None:
+                continue # 取得中に消えた
+            if not store.flags[i] & FLAG_STAT or store.sizes[i] != size or store.mtimes[i] != mtime:
+                updates.append((i, (size, mtime)))
+        sort_affected = self._keys.column in (1, 3)
+
+        if not bulk:
+            self._update_rows(updates, lambda i, v: store.set_stat(i, *v), sort_affected, 1)
+            return
+
+        # 一括取得は行ごとに通知せず、最後に1回だけ並び替え（または全行の更新通知）を出す。
+        # それまでの間はキーと並びがずれるので、二分探索ではなく線形探索に切り替える。
+        # v12.9 監視で増えた数件分などの小さな一括取得は、通常の結果と同じく1行ずつ移動する
+        if sort_affected and self._is_small_delta(len(updates)):
+            self._update_rows(updates, lambda i, v: store.set_stat(i, *v), True, 1)
+        else:
+            for i, (size, mtime) in updates:
+                store.set_stat(i, size, mtime)
+            if updates and sort_affected:
+                self._order_stale = True
+        self._bulk_done += len(results)
+        self.statProgress.emit(self._bulk_done, self._bulk_total)
+        if self._bulk_done >= self._bulk_total:
+            self._channel.stat_job = None
+            self._bulk_total = self._bulk_done = 0
+            if self._order_stale:
+                self._resort()
+            elif self._order:
+                self.dataChanged.emit(self.index(0, 1), self.index(len(self._order) - 1, 3))
+            self.statProgress.emit(0, 0)
+            if self._full_stat:
+                self._start_bulk_stat() # 取得中に増えたエントリの分
+
+    # --- v12.8 表示順の管理 ---
+
+    def _accepts(self, i):
+        """ストア行 i が現在の絞り込み条件で表示されるか"""
+        store = self._store
+        f = store.flags[i]
+        if f & FLAG_HIDDEN and not self._show_hidden:
+            return False
+        if self._display_mode == 1 and not f & FLAG_DIR:
+            return False
+        if self._display_mode == 2 and f & FLAG_DIR:
+            return False
+        return not self._name_filter or self._name_matches(store.names[i])
+
+    def _set_name_filter(self, folded):
+        self._name_filter = folded
+        self._name_matcher = FuzzyMatcher(folded) if self._fuzzy and folded else None
+
+    def _name_matches(self, name):
+        if self._name_matcher is not None:
+            return self._name_matcher.matches(name)
+        return self._name_filter in name.casefold()
+
+    def _ranked(self):
+        """v12.18 表示順が点数順（キーの順ではない）か"""
+        return self._name_matcher is not None
+
+    def _filter_rows(self, rows, names_matched=False):
+        """並び済みのストア行リストを絞り込み条件で間引く（順序は保つ。常に新しいリストを返す）"""
+        flags = self._store.flags
+        source = rows
+        if not self._show_hidden:
+            rows = [i for i in rows if not flags[i] & FLAG_HIDDEN]
+        if self._display_mode == 1:
+            rows = [i for i in rows if flags[i] & FLAG_DIR]
+        elif self._display_mode == 2:
+            rows = [i for i in rows if not flags[i] & FLAG_DIR]
+        if self._name_filter and not names_matched:
+            names = self._store.names
+            text = self._name_filter
+            match = self._name_match
+            if match is not None and match.text == text and match.epoch == self._store_epoch:
+                # v12.15 照合済みの行は集合で判定し、照合後に増えた行だけ名前を見る
+                matched, limit = match.rows, match.limit
+                test = self._name_matches
+                rows = [i for i in rows if (i in matched if i < limit else test(names[i]))]
+            elif self._name_matcher is not None:
+                test = self._name_matcher.matches
+                rows = [i for i in rows if test(names[i])]
+            else:
+                rows = [i for i in rows if text in names[i].casefold()]
+        # _all と _order が同じリストを共有すると、片方への挿入/削除がもう片方に漏れる
+        return list(rows) if rows is source else rows
+
+    def _visible_rows(self):
+        """
+        _all を絞り込んだ表示順を返す。
+        v12.16 照合済みの名前検索の結果があり一致が少なければ、全件を走査せず一致した行だけを並べて作る
+        """
+        match = self._name_match
+        if self._ranked():
+            if match is None or match.text != self._name_filter or match.epoch != self._store_epoch:
+                # 点数が無いと並べられないので、その場で照合する（ワーカーを待たない経路）
+                match = self._name_match = _NameMatch(
+                    self._name_filter, self._store_epoch, len(self._store.names),
+                    self._name_matcher.match_many(self._store.names, self._all))
+            return self._ranked_rows(match)
+        if (match is None or match.text != self._name_filter or match.epoch != self._store_epoch
+                or self._order_stale or len(match.rows) * 8 > len(self._all)):
+            # 一致が多いときは、並べ直すより全件を順に間引く方が速い
+            return self._filter_rows(self._all)
+        store = self._store
+        flags = store.flags
+        names = store.names
+        text = match.text
+        rows = [i for i in match.rows if not flags[i] & FLAG_DELETED]
+        rows.extend(i for i in range(match.limit, len(names))
+                    if not flags[i] & FLAG_DELETED and text in names[i].casefold())
+        # 名前は一致済みなので、残りの条件（隠しファイル・表示モード）だけを掛ける
+        return self._filter_rows(self._keys.sorted_rows(rows), names_matched=True)
+
+    def _ranked_rows(self, match):
+        """v12.18 あいまい照合の結果を点数の高い順（同点はキーの順）に並べた表示順"""
+        store = self._store
+        flags = store.flags
+        names = store.names
+        scores = match.rows
+        rows = [i for i in scores if not flags[i] & FLAG_DELETED]
+        score = self._name_matcher.score
+        newer = {}
+        for i in range(match.limit, len(names)):
+            if not flags[i] & FLAG_DELETED:
+                s = score(names[i])
+                if s is not None:
+                    newer[i] = s
+        if newer:
+            rows.extend(newer)
+            scores = {**scores, **newer}
+        rows = self._keys.sorted_rows(rows)
+        rows.sort(key=scores.__getitem__, reverse=True) # 安定ソートなので同点はキーの順のまま
+        return self._filter_rows(rows, names_matched=True)
+
+    def _cached_match(self, folded):
+        match = self._match_cache.get(folded)
+        if match is None or match.epoch != self._store_epoch:
+            return None
+        self._match_cache.move_to_end(folded)
+        return match
+
+    def _narrowing_base(self, folded):
+        """folded を含む前のクエリのうち、一致が最も少ない結果（無ければ None）"""
+        best = None
+        for text, match in self._match_cache.items():
+            if match.epoch == self._store_epoch and text in folded:
+                if best is None or len(match.rows) < len(best.rows):
+                    best = match
+        return best
+
+    def _row_of_store_row(self, i):
+        """ストア行 i の表示行（表示されていなければ None）。キーが並びと一致していれば二分探索する"""
+        if self._order_stale or self._ranked():
+            try:
+                return self._order.index(i)
+            except ValueError:
+                return None
+        row = self._keys.bisect(self._order, i)
+        if row < len(self._order) and self._order[row] == i:
+            return row
+        return None
+
+    def _locate(self, i):
+        """ストア行 i の (_all 内の位置, 表示行 or None)。キーを書き換える前に呼ぶこと"""
+        if self._order_stale:
+            return self._all.index(i), self._row_of_store_row(i)
+        return self._keys.bisect(self._all, i), self._row_of_store_row(i)
+
+    def _is_small_delta(self, count):
+        """v12.9 差分を1件ずつ反映する方が、全体を並べ直すより安いか"""
+        return (not self._order_stale and not self._ranked() and count <= self.MAX_INCREMENTAL
+                and count * 64 <= len(self._all))
+
+    def _emit_rows_changed(self, store_rows, first_col, last_col):
+        """ストア行の集合について、表示中の行の dataChanged を連続区間ごとに出す"""
+        for first, last in _contiguous_ranges(self._rows_of_store_rows(store_rows)):
+            self.dataChanged.emit(self.index(first, first_col), self.index(last, last_col))
+
+    def _rows_of_store_rows(self, store_rows):
+        """ストア行の集合のうち表示中のものの表示行（昇順）"""
+        if not store_rows:
+            return []
+        if len(store_rows) > 64:
+            wanted = set(store_rows)
+            return [r for r, i in enumerate(self._order) if i in wanted]
+        return sorted(r for r in map(self._row_of_store_row, store_rows) if r is not None)
+
+    def _resort(self):
+        """全件をキーで並べ直す（表示行数は変わらないのでレイアウト変更として通知）"""
+        self._all = self._keys.sorted_rows(self._all)
+        self._order_stale = False
+        self._set_order(self._visible_rows())
+
+    def _refilter(self):
+        self._apply_visible(self._visible_rows())
+
+    def _set_order(self, new_order):
+        """表示中の集合は同じまま順序だけを変える。永続Index（選択など）は行を追従させる"""
+        self.layoutAboutToBeChanged.emit()
+        old_persistent = self.persistentIndexList()
+        if old_persistent:
+            wanted = {self._order[idx.row()] for idx in old_persistent}
+            if len(wanted) <= 16:
+                # 選択・カレント程度なら C 実装の list.index で探す方が全件の走査より速い
+                pos = {i: new_order.index(i) for i in wanted}
+            else:
+                pos = {i: r for r, i in enumerate(new_order) if i in wanted}
+            new_persistent = [self.createIndex(pos[self._order[idx.row()]], idx.column())
+                              for idx in old_persistent]
+        self._order = new_order
+        self._order_ranked = self._ranked()
+        if old_persistent:
+            self.changePersistentIndexList(old_persistent, new_persistent)
+        self.layoutChanged.emit()
+
+    def _apply_visible(self, new_order):
+        """
+        表示集合の変更（絞り込み・追加・削除）を最小限の行削除/挿入として通知する。
+        new_order と現在の _order は同じ並び順の部分列である前提。
+        行数は基底クラスが持つので、_order は「削除は通知の後・挿入は通知の前」に更新する
+        （通知中も rowCount() <= len(_order) が保たれ、data() が範囲外を読まない）。
+
+        区間が多い場合（名前順に届く列挙バッチや検索の絞り込み）は、区間ごとの通知のたびに
+        ビューが全行を再レイアウトすることになるので、末尾へのまとめた削除/挿入と
+        1回のレイアウト変更に置き換える。
+        v12.18 点数順の表示が絡む（点数順とキーの順の切り替え、クエリごとの点数順）と残る行の
+        並び順も変わるので、先に残る行を新しい順へ並べ替えるレイアウト変更を出しておく。
+        """
+        was_ranked = self._order_ranked
+        self._order_ranked = self._ranked()
+        if new_order == self._order:
+            return
+        if was_ranked or self._order_ranked:
+            pos = {i: r for r, i in enumerate(new_order)}
+            arranged = sorted((i for i in self._order if i in pos), key=pos.__getitem__)
+            arranged += [i for i in self._order if i not in pos]
+            if arranged != self._order:
+                self._set_order(arranged)
+        new_set = set(new_order)
+        removed = [r for r, i in enumerate(self._order) if i not in new_set]
+        ranges = _contiguous_ranges(removed)
+        if len(ranges) > self.MAX_NOTIFY_RANGES:
+            # 残す行を前に詰めた並びにしてから、末尾をまとめて削除する
+            gone = [self._order[r] for r in removed]
+            self._set_order([i for i in self._order if i in new_set] + gone)
+            ranges = [(len(self._order) - len(gone), len(self._order) - 1)]
+        for first, last in reversed(ranges):
+            self.removeRows(first, last - first + 1)
+            del self._order[first:last + 1]
+
+        old_set = set(self._order)
+        added = [r for r, i in enumerate(new_order) if i not in old_set]
+        ranges = _contiguous_ranges(added)
+        if len(ranges) > self.MAX_NOTIFY_RANGES:
+            # 末尾にまとめて挿入してから、正しい並びへのレイアウト変更にする
+            n = len(self._order)
+            self._order.extend(new_order[r] for r in added)
+            self.insertRows(n, len(added))
+            self._set_order(new_order)
+            return
+        for first, last in ranges:
+            self._order[first:first] = new_order[first:last + 1]
+            self.insertRows(first, last - first + 1)
+
+    def _update_rows(self, updates, apply, moves, first_col):
+        """
+        v12.9 (ストア行, 値) の組を apply(ストア行, 値) でストアへ書き込み、表示に反映する。
+        moves が真（並びに効く値の変更）なら、差分が小さいうちは1行ずつ正しい位置へ移し、
+        多ければ全体を並べ直す。
+        """
+        if not updates:
+            return
+        if moves and not self._is_small_delta(len(updates)):
+            for i, value in updates:
+                apply(i, value)
+            self._resort()
+            return
+        for i, value in updates:
+            if moves:
+                all_pos, row = self._locate(i)
+                apply(i, value)
+                self._reposition(i, all_pos, row)
+            else:
+                apply(i, value)
+        self._emit_rows_changed([i for i, _ in updates], first_col, len(self.COLUMNS) - 1)
+
+    def _reposition(self, i, all_pos, row):
+        """
+        キーが変わったストア行 i を正しい位置へ移す。all_pos/row は変更前の位置（_locate() の結果）。
+        絞り込みの結果が変わった場合は行の削除/挿入になる。
+        """
+        keys = self._keys
+        del self._all[all_pos]
+        self._all.insert(keys.bisect(self._all, i), i)
+        if self._ranked():
+            self._refilter() # v12.18 点数順の中の位置は二分探索では求まらない
+            return
+        if row is None:
+            if self._accepts(i):
+                self._insert_visible(i)
+            return
+        if not self._accepts(i):
+            self.removeRows(row, 1)
+            del self._order[row]
+            return
+        del self._order[row]
+        dest = keys.bisect(self._order, i)
+        self._order.insert(row, i)
+        if dest == row:
+            return
+        # beginMoveRows の移動先は「移動前」の行番号で指定する
+        self.beginMoveRows(QModelIndex(), row, row, QModelIndex(), dest + 1 if dest > row else dest)
+        del self._order[row]
+        self._order.insert(dest, i)
+        self.endMoveRows()
+
+    def _insert_visible(self, i):
+        """ストア行 i を表示中の並びの正しい位置に1行挿入する"""
+        row = self._keys.bisect(self._order, i)
+        self._order.insert(row, i)
+        self.insertRows(row, 1)
+
+    def _insert_rows(self, rows):
+        """
+        行タプルをストアに追加し、並び順の正しい位置に挿入する。
+        v12.9 件数が少なければ（監視による追加など）1件ずつ二分探索で挿入し、並べ直しは行わない。
+        """
+        store = self._store
+        rows = [r for r in rows if r[0] not in store]
+        if not rows:
+            return
+        added = store.extend(rows)
+        if self._is_small_delta(len(added)):
+            for i in added:
+                self._all.insert(self._keys.bisect(self._all, i), i)
+                if self._accepts(i):
+                    self._insert_visible(i)
+            return
+        self._all = self._keys.sorted_rows(self._all + list(added))
+        self._order_stale = False
+        self._apply_visible(self._visible_rows())
+
+    def _remove_names(self, names):
+        """
+        指定名の行を削除（表示中の行は連続区間ごとにまとめて通知）。
+        v12.9 件数が少なければ二分探索で位置を求め、全件の走査はしない。
+        """
+        store = self._store
+        gone = {store.row_of(n) for n in names if n in store}
+        if not gone:
+            return
+        if self._is_small_delta(len(gone)):
+            for i in gone:
+                all_pos, row = self._locate(i)
+                del self._all[all_pos]
+                if row is not None:
+                    self.removeRows(row, 1)
+                    del self._order[row]
+        else:
+            self._all = [i for i in self._all if i not in gone]
+            self._apply_visible([i for i in self._order if i not in gone])
+        for i in gone:
+            store.delete(i)
+        if store.needs_compaction():
+            self._compact()
+
+    def _compact(self):
+        """削除済みの行を詰める（表示行番号は変わらないので通知は不要）"""
+        kept, remap = self._store.compact()
+        self._store_epoch += 1
+        self._keys.remap(kept)
+        self._all = [remap[i] for i in self._all]
+        self._order = [remap[i] for i in self._order]
+
+    def _watch_root(self):
+        """v12.13 プロファイルに従ってルートを監視する"""
+        profile = self._io_profile
+        if profile.watch == "notify":
+            # v12.12 GUI スレッドでの確認はタイムアウト付き（応答のないマウントは監視しない）
+            if shared_stat_service().is_dir(self._root_path):
+                self._watch.watch(self._root_path)
+        elif profile.watch == "poll":
+            # 定期確認はワーカーで stat するので、応答がなくても監視しておけば戻ったときに拾える
+            self._watch.watch(self._root_path, poll_interval_ms=profile.poll_interval_ms)
+
+    def _on_directory_settled(self, path):
+        if path == self._root_path:
+            self.refresh()
+
+    def _on_icon_ready(self, path):
+        if os.path.dirname(path) != self._root_path:
+            return
+        index = self.index_for_path(path)
+        if index.isValid():
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class _NameMatch:
+    """v12.15 名前検索の照合結果。limit 未満のストア行について、一致した行の集合を持つ"""
+    __slots__ = ("text", "epoch", "limit", "rows")
+
+    def __init__(self, text, epoch, limit, rows):
+        self.text = text
+        self.epoch = epoch
+        self.limit = limit
+        self.rows = rows
+
+
+def _contiguous_ranges(rows):
+    """昇順の行番号リストを (first, last) の連続区間リストにまとめる"""
+    ranges = []
+    for r in rows:
+        if ranges and ranges[-1][1] == r - 1:
+            ranges[-1][1] = r
+        else:
+            ranges.append([r, r])
+    return [tuple(x) for x in ranges]
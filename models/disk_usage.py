@@ -0,0 +1,300 @@
+import heapq
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from models.folder_sizes import FolderSize, shared_folder_sizes
+from models.mounts import virtual_mount_points
+from models.prefetcher import lower_thread_priority
+from models.tree_walk import list_dir, walk_parallel
+
+TOP_N = 100
+
+
+class _Dir:
+    """
+    集計中のフォルダ。bytes/files/dirs は子孫の分も含み、列挙が進むたびに増える。
+    listing は列挙したときの直下の ([(名前, サイズ, 更新日時, link)], [子フォルダのパス])（内訳の表示用）
+    """
+    __slots__ = ("path", "parent", "bytes", "files", "dirs", "pending", "mtime", "complete", "listing")
+
+    def __init__(self, path, parent):
+        self.path = path
+        self.parent = parent
+        self.bytes = 0
+        self.files = 0
+        self.dirs = 0
+        self.pending = 1 # 自身の列挙 + 集計中の子フォルダ
+        self.mtime = None
+        self.complete = False
+        self.listing = None
+
+
+class UsageJob:
+    def __init__(self, token, root, reuse):
+        self.token = token
+        self.root = root
+        self.reuse = reuse
+        self.cancelled = False
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.nodes = {}        # パス -> _Dir（GUI スレッドからは読むだけ）
+        self.top_files = []    # (サイズ, パス) の最小ヒープ（TOP_N 件）
+        self.top_dirs = []
+        self.scanned_dirs = 0
+        self.reused_dirs = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+
+def _push_top(heap, item):
+    if len(heap) < TOP_N:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+class DiskUsage(QObject):
+    """
+    v12.22 フォルダ以下の使用量を並列に集計する。
+    `models/tree_walk.py` の walk_parallel() で並列に列挙し、各フォルダのファイルの合計を
+    祖先すべてに足していくので、集計の途中でも usage(パス) で途中の合計を読める。
+    ハードリンクは同じ inode を1回だけ数える。大きいファイル・フォルダは TOP_N 件のヒープで持つ。
+    子孫まで数え終えたフォルダは FolderSizeCache に入れ、次の集計では（変わっていなければ）潜らずに使う。
+    進捗は PROGRESS_MS ごとに progress(番号, フォルダ数, ファイル数, バイト数, 経過秒)。
+    フォルダの直下の一覧は集計の列挙を使い回し（listing()）、無ければ requestListing() でワーカーに列挙させて
+    listingReady(パス) で知らせる（内訳の画面は GUI スレッドで列挙しない）。
+    """
+    progress = Signal(int, int, int, object, float)
+    finished = Signal(int, bool)  # 番号, 中断したか
+    listingReady = Signal(str)
+    _done = Signal(object)        # ワーカー -> GUI スレッド
+    _listed = Signal(str, object)
+
+    WORKERS = min(8, (os.cpu_count() or 2) * 2)
+    MAX_PENDING = WORKERS * 4
+    PROGRESS_MS = 300
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._job = None
+        self._last = None # 最後に終わった集計（結果を読み続けられるように残す）
+        self._token = 0
+        self._cache = shared_folder_sizes()
+        self._pool = ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix="cff-du",
+                                        initializer=lower_thread_priority)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._emit_progress)
+        self._done.connect(self._on_done)
+        self._listings = {}    # requestListing() で列挙したフォルダ -> DirListing
+        self._listing_pending = set()
+        self._listed.connect(self._on_listed)
+
+    def start(self, root, reuse=True):
+        """root の集計を始めて番号を返す。reuse=False ならキャッシュを使わずに全部数え直す"""
+        self.cancel()
+        self._token += 1
+        job = self._job = self._last = UsageJob(self._token, os.path.normpath(root), reuse)
+        self._listings.clear()
+        threading.Thread(target=self._run, args=(job,), name="cff-du-main", daemon=True).start()
+        self._timer.start(self.PROGRESS_MS)
+        return job.token
+
+    def cancel(self):
+        if self._job:
+            self._job.cancel()
+
+    def isRunning(self):
+        return self._job is not None
+
+    def close(self):
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def usage(self, path):
+        """path 以下の (バイト数, ファイル数, フォルダ数, 数え終えたか)。分からなければ None"""
+        job = self._last
+        node = job.nodes.get(os.path.normpath(path)) if job else None
+        if node is not None:
+            return node.bytes, node.files, node.dirs, node.complete
+        entry = self._cache.get(path)
+        if entry is not None:
+            return entry.bytes, entry.files, entry.dirs, True
+        return None
+
+    def listing(self, path):
+        """
+        path の直下の ([(名前, サイズ)], [子フォルダのパス], エラー or None)。
+        集計でも requestListing() でもまだ列挙していなければ None
+        """
+        path = os.path.normpath(path)
+        job = self._last
+        node = job.nodes.get(path) if job else None
+        if node is not None and node.listing is not None:
+            files, dirs = node.listing
+            return [(f[0], f[1]) for f in files], dirs, None
+        listing = self._listings.get(path)
+        if listing is not None:
+            return [(f[0], f[1]) for f in listing.files], listing.dirs, listing.error
+        return None
+
+    def requestListing(self, path):
+        """path の直下をワーカーで列挙する（終わったら listingReady(path)）"""
+        path = os.path.normpath(path)
+        if path in self._listing_pending:
+            return
+        self._listing_pending.add(path)
+        try:
+            self._pool.submit(self._list, path)
+        except RuntimeError: # close() 済み
+            self._listing_pending.discard(path)
+
+    def topFiles(self):
+        """大きいファイル [(サイズ, パス)]（大きい順）"""
+        return self._top(lambda job: job.top_files)
+
+    def topDirs(self):
+        """数え終えたフォルダのうち大きいもの [(サイズ, パス)]（大きい順、ルートは除く）"""
+        return self._top(lambda job: job.top_dirs)
+
+    def _top(self, heap_of):
+        job = self._last
+        if job is None:
+            return []
+        with job.lock:
+            return sorted(heap_of(job), reverse=True)
+
+    # --- internal ---
+
+    def _list(self, path):
+        listing = list_dir(path)
+        skip = virtual_mount_points()
+        if skip:
+            listing.dirs[:] = [d for d in listing.dirs if d not in skip]
+        try:
+            self._listed.emit(path, listing)
+        except RuntimeError: # 画面が既に破棄済み
+            pass
+
+    def _on_listed(self, path, listing):
+        self._listing_pending.discard(path)
+        self._listings[path] = listing
+        self.listingReady.emit(path)
+
+    def _run(self, job):
+        try:
+            self._scan(job)
+        except RuntimeError: # close() 済みのプール
+            job.cancel()
+        finally:
+            try:
+                self._done.emit(job)
+            except RuntimeError: # 画面が既に破棄済み
+                pass
+
+    def _scan(self, job):
+        root = job.root
+        nodes = job.nodes
+        nodes[root] = _Dir(root, None)
+        seen_links = set()
+        skip = virtual_mount_points() # v12.23 /proc などには潜らない
+        # 前回の集計で覚えた大きいファイル・フォルダ（再利用したフォルダの中の分）
+        previous_files, previous_dirs = self._cache.topsUnder(root) if job.reuse else ([], [])
+        for listing in walk_parallel([root], self._pool, job, max_pending=self.MAX_PENDING, stat_dir=True):
+            node = nodes[listing.path]
+            node.mtime = listing.mtime
+            if skip:
+                listing.dirs[:] = [d for d in listing.dirs if d not in skip]
+            node.listing = (listing.files, list(listing.dirs))
+            own_bytes = 0
+            own_files = 0
+            with job.lock:
+                for name, size, _mtime, link in listing.files:
+                    if link is not None:
+                        if link in seen_links:
+                            continue
+                        seen_links.add(link)
+                    own_bytes += size
+                    own_files += 1
+                    _push_top(job.top_files, (size, os.path.join(listing.path, name)))
+            self._add(node, own_bytes, own_files, len(listing.dirs))
+            descend = []
+            for path in listing.dirs:
+                child = nodes[path] = _Dir(path, node)
+                node.pending += 1
+                entry = self._reusable(job, path)
+                if entry is None:
+                    descend.append(path)
+                    continue
+                self._add(child, entry.bytes, entry.files, entry.dirs)
+                child.mtime = entry.mtime
+                job.reused_dirs += 1
+                prefix = path.rstrip(os.sep) + os.sep
+                with job.lock:
+                    for heap, previous in ((job.top_files, previous_files), (job.top_dirs, previous_dirs)):
+                        for item in previous:
+                            if item[1].startswith(prefix):
+                                _push_top(heap, item)
+                self._complete(job, child, cache=False)
+            listing.dirs[:] = descend # 再利用したフォルダには潜らない
+            job.scanned_dirs += 1
+            if listing.error is None:
+                self._complete(job, node)
+            else:
+                node.mtime = None # 読めなかったフォルダ（とその祖先）はキャッシュしない
+                self._complete(job, node, cache=False)
+        if not job.cancelled:
+            with job.lock:
+                self._cache.setTops(root, job.top_files, job.top_dirs)
+
+    def _reusable(self, job, path):
+        if not job.reuse:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        return self._cache.reusable(path, mtime)
+
+    def _add(self, node, nbytes, files, dirs):
+        """node と祖先すべての合計に足す"""
+        while node is not None:
+            node.bytes += nbytes
+            node.files += files
+            node.dirs += dirs
+            node = node.parent
+
+    def _complete(self, job, node, cache=True):
+        """node の列挙（または子フォルダ1つの集計）が終わった。子孫まで数え終えたら親へ伝える"""
+        node.pending -= 1
+        while node is not None and node.pending == 0:
+            node.complete = True
+            if cache and node.mtime is not None:
+                self._cache.put(node.path, FolderSize(node.bytes, node.files, node.dirs, node.mtime))
+            if node.parent is not None:
+                with job.lock:
+                    _push_top(job.top_dirs, (node.bytes, node.path))
+                if node.mtime is None:
+                    node.parent.mtime = None # 読めなかった部分を含むのでキャッシュしない
+            node = node.parent
+            if node is not None:
+                node.pending -= 1
+            cache = True
+
+    def _emit_progress(self):
+        job = self._job
+        if job is not None:
+            root = job.nodes.get(job.root)
+            self.progress.emit(job.token, root.dirs if root else 0, root.files if root else 0,
+                               root.bytes if root else 0, time.monotonic() - job.started)
+
+    def _on_done(self, job):
+        if job is not self._job:
+            return
+        self._emit_progress()
+        self._job = None
+        self._timer.stop()
+        self.finished.emit(job.token, job.cancelled)
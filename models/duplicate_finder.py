@@ -0,0 +1,327 @@
+import hashlib
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from models.prefetcher import lower_thread_priority
+from models.tree_walk import outermost_roots, walk_parallel
+
+# 2段目で読む先頭・末尾の大きさ。これ以下の2倍までのファイルは2段目でファイル全体を読み終える
+PARTIAL_BYTES = 64 * 1024
+# 3段目で1回に読む大きさ（ファイル全体をメモリに載せない）
+CHUNK_BYTES = 1024 * 1024
+
+STAGE_SCAN = "Scanning"
+STAGE_PARTIAL = "Comparing heads/tails"
+STAGE_FULL = "Hashing"
+
+
+def _digest():
+    return hashlib.blake2b(digest_size=16) # 大きな update() では GIL を離す
+
+
+def partial_hash(path, size):
+    """先頭と末尾 PARTIAL_BYTES ずつのハッシュ（size が 2 * PARTIAL_BYTES 以下ならファイル全体）"""
+    h = _digest()
+    with open(path, "rb", buffering=0) as f:
+        h.update(f.read(PARTIAL_BYTES))
+        if size > 2 * PARTIAL_BYTES:
+            f.seek(size - PARTIAL_BYTES)
+        h.update(f.read(PARTIAL_BYTES))
+    return h.digest()
+
+
+def full_hash(path, job=None):
+    """ファイル全体のハッシュ。CHUNK_BYTES ずつ読み、読んだ量を job に足す（打ち切られたら None）"""
+    h = _digest()
+    buf = bytearray(CHUNK_BYTES)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            if job is not None and job.cancelled:
+                return None
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+            if job is not None:
+                job.add_bytes(n)
+    return h.digest()
+
+
+class DuplicateJob:
+    """1回分の重複検索の状態（GUI スレッドはタイマーで数値だけを読む）"""
+
+    def __init__(self, token, roots, min_size):
+        self.token = token
+        self.roots = roots
+        self.min_size = min_size
+        self.cancelled = False
+        self.started = time.monotonic() # 今の段を始めた時刻
+        self.lock = threading.Lock()
+        self.stage = STAGE_SCAN
+        self.done = 0         # この段で処理したファイル数
+        self.total = 0        # この段のファイル数（列挙中は 0）
+        self.bytes = 0        # この段で読んだ（列挙中は見つけた）バイト数
+        self.total_bytes = 0
+        self.groups = 0
+        self.wasted = 0       # 重複を1つずつ残して消せば空く容量
+        self.mtimes = {}      # 候補のパス -> 列挙時の更新日時（結果画面で古い順に並べる）
+
+    def cancel(self):
+        self.cancelled = True
+
+    def begin(self, stage, total, total_bytes):
+        with self.lock:
+            self.stage = stage
+            self.started = time.monotonic()
+            self.done = 0
+            self.total = total
+            self.bytes = 0
+            self.total_bytes = total_bytes
+
+    def add_bytes(self, n):
+        with self.lock:
+            self.bytes += n
+
+
+class DuplicateFinder(QObject):
+    """
+    v12.21 フォルダ（とファイル）以下の、中身が同じファイルを探す。3段で候補を絞る:
+      1. 並列に列挙してサイズでまとめる（同じ inode のハードリンクは1つに数える）
+      2. 同じサイズのファイルを、先頭と末尾 PARTIAL_BYTES のハッシュでまとめる
+      3. それでも同じものを、ファイル全体を CHUNK_BYTES ずつ読むハッシュで確かめる
+    2・3段目はワーカーでファイルごとに並列に読み、グループの全員が読み終わった時点で
+    groupFound(番号, サイズ, [(更新日時, パス)]) を古い順で流す（大きいファイルから）。
+    更新日時は列挙のときのものを使い、GUI スレッドでは stat しない。
+    進捗は PROGRESS_MS ごとに progress(番号, 段, 済み, 総数, バイト, 総バイト, 段の経過秒)。
+    """
+    # サイズ・バイト数は 2GB を超えるので object
+    groupFound = Signal(int, object, list)
+    progress = Signal(int, str, int, int, object, object, float)
+    finished = Signal(int, int, object, bool) # 番号, グループ数, 空く容量, 中断したか
+    _group = Signal(object, object, list)     # ワーカー -> GUI スレッド
+    _done = Signal(object)
+
+    WORKERS = min(8, (os.cpu_count() or 2) * 2)
+    MAX_PENDING = WORKERS * 2
+    PROGRESS_MS = 250
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._job = None
+        self._token = 0
+        self._pool = ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix="cff-dupes",
+                                        initializer=lower_thread_priority)
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._emit_progress)
+        self._group.connect(self._on_group)
+        self._done.connect(self._on_done)
+
+    def start(self, roots, min_size=1):
+        """検索を始めて番号を返す（走行中の検索は打ち切る）。min_size 未満のファイルは見ない"""
+        self.cancel()
+        self._token += 1
+        job = self._job = DuplicateJob(self._token, outermost_roots(roots), max(1, min_size))
+        threading.Thread(target=self._run, args=(job,), name="cff-dupes-main", daemon=True).start()
+        self._timer.start(self.PROGRESS_MS)
+        return job.token
+
+    def cancel(self):
+        if self._job:
+            self._job.cancel()
+
+    def isRunning(self):
+        return self._job is not None
+
+    def close(self):
+        """打ち切ってワーカーを片付ける（結果画面を閉じるとき）"""
+        self.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    # --- internal ---
+
+    def _run(self, job):
+        try:
+            by_size = self._collect(job)
+            if job.cancelled:
+                return
+            candidates = self._dedupe_links(job, by_size)
+            if job.cancelled:
+                return
+            suspects = self._partial_stage(job, candidates)
+            if job.cancelled:
+                return
+            self._full_stage(job, suspects)
+        except RuntimeError: # close() 済みのプール
+            job.cancel()
+        finally:
+            self._notify(self._done, job)
+
+    def _collect(self, job):
+        """1段目: サイズ -> [(パス, ハードリンクの (デバイス, inode) または None, 更新日時)]"""
+        by_size = defaultdict(list)
+        min_size = job.min_size
+        dirs = []
+        for root in job.roots:
+            if os.path.isdir(root):
+                dirs.append(root)
+                continue
+            try:
+                st = os.stat(root, follow_symlinks=False)
+            except OSError:
+                continue
+            if st.st_size >= min_size:
+                by_size[st.st_size].append((root, (st.st_dev, st.st_ino) if st.st_nlink > 1 else None,
+                                            st.st_mtime))
+        found = found_bytes = 0
+        for listing in walk_parallel(dirs, self._pool, job, max_pending=self.MAX_PENDING):
+            for name, size, mtime, link in listing.files:
+                if size >= min_size:
+                    by_size[size].append((os.path.join(listing.path, name), link, mtime))
+                    found += 1
+                    found_bytes += size
+            with job.lock:
+                job.done = found
+                job.bytes = found_bytes
+        return by_size
+
+    def _dedupe_links(self, job, by_size):
+        """
+        同じサイズが2つ以上あるものだけを、ハードリンクを1つにまとめて [(サイズ, パス)] で返す。
+        候補の更新日時は job.mtimes に控える
+        """
+        candidates = []
+        for size, entries in by_size.items():
+            if len(entries) < 2:
+                continue
+            seen = set()
+            paths = []
+            for path, link, mtime in entries:
+                if link is None and os.name == "nt":
+                    # Windows の DirEntry はリンク数を持たないので、候補だけ stat し直す
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    link = (st.st_dev, st.st_ino) if st.st_nlink > 1 else None
+                if link is not None:
+                    if link in seen:
+                        continue
+                    seen.add(link)
+                paths.append((path, mtime))
+            if len(paths) > 1:
+                candidates.extend((size, p) for p, _ in paths)
+                job.mtimes.update(paths)
+        return candidates
+
+    def _partial_stage(self, job, candidates):
+        """2段目: 先頭・末尾が同じグループ。小さいファイルはここで確定して流し、残りを [[(サイズ, パス)]] で返す"""
+        candidates.sort(key=lambda c: -c[0]) # 大きいものから
+        job.begin(STAGE_PARTIAL, len(candidates), sum(min(s, 2 * PARTIAL_BYTES) for s, _ in candidates))
+        remaining = defaultdict(int)
+        for size, _ in candidates:
+            remaining[size] += 1
+        pending = defaultdict(lambda: defaultdict(list)) # サイズ -> ハッシュ -> [パス]
+        suspects = []
+        for (size, path), digest in self._bounded_map(job, lambda c: partial_hash(c[1], c[0]), candidates):
+            with job.lock:
+                job.done += 1
+                job.bytes += min(size, 2 * PARTIAL_BYTES)
+            if digest is not None:
+                pending[size][digest].append(path)
+            remaining[size] -= 1
+            if remaining[size]:
+                continue
+            # このサイズは全員読み終えた
+            for paths in pending.pop(size, {}).values():
+                if len(paths) < 2:
+                    continue
+                if size <= 2 * PARTIAL_BYTES:
+                    self._emit_group(job, size, paths) # ファイル全体を読んだので確定
+                else:
+                    suspects.append([(size, p) for p in paths])
+        return suspects
+
+    def _full_stage(self, job, suspects):
+        """3段目: ファイル全体のハッシュで確かめ、グループの全員を読み終えるごとに流す"""
+        items = [(k, size, path) for k, group in enumerate(suspects) for size, path in group]
+        job.begin(STAGE_FULL, len(items), sum(size for _, size, _ in items))
+        remaining = [len(group) for group in suspects]
+        digests = [defaultdict(list) for _ in suspects]
+        for (k, size, path), digest in self._bounded_map(job, lambda i: full_hash(i[2], job), items):
+            with job.lock:
+                job.done += 1
+            if digest is not None:
+                digests[k][digest].append(path)
+            remaining[k] -= 1
+            if remaining[k]:
+                continue
+            for paths in digests[k].values():
+                if len(paths) > 1:
+                    self._emit_group(job, size, paths)
+            digests[k] = None
+
+    def _bounded_map(self, job, fn, items):
+        """
+        items をワーカーで fn にかけ、終わった順に (item, 結果) を返す（読めなければ結果は None）。
+        同時に渡すのは MAX_PENDING 件まで
+        """
+        items = iter(items)
+        running = {}
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(running) < self.MAX_PENDING and not job.cancelled:
+                    item = next(items, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    running[self._pool.submit(fn, item)] = item
+                if not running or job.cancelled:
+                    return
+                done, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = running.pop(future)
+                    try:
+                        result = future.result()
+                    except (OSError, ValueError):
+                        result = None # 読めない・途中で消えた
+                    yield item, result
+        finally:
+            for future in running:
+                future.cancel()
+
+    def _emit_group(self, job, size, paths):
+        with job.lock:
+            job.groups += 1
+            job.wasted += size * (len(paths) - 1)
+        mtimes = job.mtimes
+        self._notify(self._group, job, size, sorted((mtimes.get(p, 0), p) for p in paths))
+
+    def _notify(self, signal, *args):
+        try:
+            signal.emit(*args)
+        except RuntimeError: # 結果画面が既に破棄済み
+            pass
+
+    def _on_group(self, job, size, paths):
+        if job is self._job:
+            self.groupFound.emit(job.token, size, paths)
+
+    def _emit_progress(self):
+        job = self._job
+        if job is not None:
+            self.progress.emit(job.token, job.stage, job.done, job.total, job.bytes, job.total_bytes,
+                               time.monotonic() - job.started)
+
+    def _on_done(self, job):
+        if job is not self._job:
+            return
+        self._emit_progress()
+        self._job = None
+        self._timer.stop()
+        self.finished.emit(job.token, job.groups, job.wasted, job.cancelled)
@@ -0,0 +1,206 @@
+from array import array
+
+# flags のビット
+FLAG_DIR = 0x01      # フォルダ
+FLAG_STAT = 0x02     # size/mtime 取得済み（v12.6 遅延stat）
+FLAG_HIDDEN = 0x04   # '.' 始まり
+FLAG_DELETED = 0x08  # v12.8 削除済み（compact() で詰めるまで行番号を保つ）
+
+
+class DirectoryEntry:
+    """1エントリ分のスナップショット（EntryStore.entry() が返す読み取り用の軽量オブジェクト）"""
+    __slots__ = ("name", "is_dir", "size", "mtime")
+
+    def __init__(self, name, is_dir, size, mtime):
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime = mtime
+
+
+class EntryStore:
+    """
+    v12.7 ディレクトリ一覧を列指向（struct-of-arrays）で保持する。
+    1行ごとに Python オブジェクト（QFileInfo やタプル、数値オブジェクト）を持つ代わりに、
+    名前のリストと size/mtime/flags/拡張子ID の配列を並べて持つ。
+    拡張子はテーブルに一度だけ登録し、行側は番号だけを持つ（種類名もここで作っておく）。
+
+    size/mtime は FLAG_STAT が立っていない行では意味を持たない（size()/mtime() は None を返す）。
+
+    v12.8 行 (row) はストア内の固定番号で、表示順とは別（表示順は FlatDirectoryModel が持つ）。
+    削除は印を付けるだけにして行番号をずらさず、削除済みが増えたら compact() でまとめて詰める。
+    """
+    __slots__ = ("names", "sizes", "mtimes", "flags", "ext_ids",
+                 "_ext_table", "_type_table", "_ext_index", "_row_of", "_deleted")
+
+    def __init__(self, rows=()):
+        self.names = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.flags = array("B")
+        self.ext_ids = array("I")
+        self._ext_table = [""]           # id -> 拡張子（大文字、ドットなし）
+        self._type_table = ["File"]      # id -> 種類名（Typeカラム）
+        self._ext_index = {"": 0}        # 拡張子 -> id
+        self._row_of = {}                # name -> row
+        self._deleted = 0
+        if rows:
+            self.extend(rows)
+
+    def __len__(self):
+        """削除済みを含む行数（行番号の上限）"""
+        return len(self.names)
+
+    def live_count(self):
+        return len(self.names) - self._deleted
+
+    def __contains__(self, name):
+        return name in self._row_of
+
+    # --- 追加・削除 ---
+
+    def extend(self, rows):
+        """
+        (name, is_dir, size, mtime) の並びを末尾に追加する。mtime が None なら stat 未取得。
+        追加した行の番号の range を返す。
+        """
+        names = self.names
+        sizes = self.sizes
+        mtimes = self.mtimes
+        flags = self.flags
+        ext_ids = self.ext_ids
+        row_of = self._row_of
+        ext_id = self._ext_id
+        first = row = len(names)
+        for name, is_dir, size, mtime in rows:
+            f = FLAG_DIR if is_dir else 0
+            if name.startswith('.'):
+                f |= FLAG_HIDDEN
+            if mtime is None:
+                sizes.append(0)
+                mtimes.append(0.0)
+            else:
+                f |= FLAG_STAT
+                sizes.append(size)
+                mtimes.append(mtime)
+            names.append(name)
+            flags.append(f)
+            ext_ids.append(0 if is_dir else ext_id(name))
+            row_of[name] = row
+            row += 1
+        return range(first, row)
+
+    def delete(self, row):
+        """行に削除済みの印を付ける（行番号は compact() まで変わらない）"""
+        if self.flags[row] & FLAG_DELETED:
+            return
+        del self._row_of[self.names[row]]
+        self.flags[row] = FLAG_DELETED
+        self._deleted += 1
+
+    def needs_compaction(self):
+        return self._deleted > 1024 and self._deleted * 2 > len(self.names)
+
+    def compact(self):
+        """
+        削除済みの行を詰める。(kept, remap) を返す。
+        kept[新行番号] = 旧行番号、remap[旧行番号] = 新行番号（削除済みは -1）。
+        """
+        flags = self.flags
+        kept = [i for i in range(len(self.names)) if not flags[i] & FLAG_DELETED]
+        remap = array("l", [-1]) * len(self.names)
+        for new, old in enumerate(kept):
+            remap[old] = new
+        self.names = [self.names[i] for i in kept]
+        self.sizes = array("q", map(self.sizes.__getitem__, kept))
+        self.mtimes = array("d", map(self.mtimes.__getitem__, kept))
+        self.flags = array("B", map(flags.__getitem__, kept))
+        self.ext_ids = array("I", map(self.ext_ids.__getitem__, kept))
+        self._row_of = {name: i for i, name in enumerate(self.names)}
+        self._deleted = 0
+        return kept, remap
+
+    def clear(self):
+        self.__init__()
+
+    def type_table(self):
+        """拡張子ID -> 種類名 のテーブル"""
+        return self._type_table
+
+    # --- 参照 ---
+
+    def row_of(self, name):
+        return self._row_of.get(name)
+
+    def name(self, row):
+        return self.names[row]
+
+    def is_dir(self, row):
+        return bool(self.flags[row] & FLAG_DIR)
+
+    def has_stat(self, row):
+        return bool(self.flags[row] & FLAG_STAT)
+
+    def size(self, row):
+        return self.sizes[row] if self.flags[row] & FLAG_STAT else None
+
+    def mtime(self, row):
+        return self.mtimes[row] if self.flags[row] & FLAG_STAT else None
+
+    def ext(self, row):
+        return self._ext_table[self.ext_ids[row]]
+
+    def type_name(self, row):
+        if self.flags[row] & FLAG_DIR:
+            return "Folder"
+        return self._type_table[self.ext_ids[row]]
+
+    def row_tuple(self, row):
+        return (self.names[row], self.is_dir(row), self.size(row), self.mtime(row))
+
+    def entry(self, row):
+        return DirectoryEntry(*self.row_tuple(row))
+
+    # --- 更新 ---
+
+    def set_row(self, row, values):
+        """(name, is_dir, size, mtime) で1行を上書きする（名前は同じ前提）"""
+        _, is_dir, size, mtime = values
+        f = self.flags[row] & FLAG_HIDDEN
+        if is_dir:
+            f |= FLAG_DIR
+        if mtime is not None:
+            f |= FLAG_STAT
+            self.sizes[row] = size
+            self.mtimes[row] = mtime
+        self.flags[row] = f
+        self.ext_ids[row] = 0 if is_dir else self._ext_id(self.names[row])
+
+    def set_stat(self, row, size, mtime):
+        self.sizes[row] = size
+        self.mtimes[row] = mtime
+        self.flags[row] |= FLAG_STAT
+
+    def rename(self, row, new_name):
+        del self._row_of[self.names[row]]
+        self.names[row] = new_name
+        self._row_of[new_name] = row
+        f = self.flags[row] & ~FLAG_HIDDEN
+        if new_name.startswith('.'):
+            f |= FLAG_HIDDEN
+        self.flags[row] = f
+        if not f & FLAG_DIR:
+            self.ext_ids[row] = self._ext_id(new_name)
+
+    # --- internal ---
+
+    def _ext_id(self, name):
+        dot = name.rfind('.')
+        ext = name[dot + 1:].upper() if dot > 0 else ""
+        i = self._ext_index.get(ext)
+        if i is None:
+            i = len(self._ext_table)
+            self._ext_table.append(ext)
+            self._type_table.append(f"{ext} File")
+            self._ext_index[ext] = i
+        return i
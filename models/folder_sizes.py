@@ -0,0 +1,333 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from PySide6.QtCore import QCoreApplication, QLocale, QObject, Signal
+
+from models.change_coalescer import shared_change_coalescer
+from models.io_policy import shared_io_policy
+from models.listing_cache import normalize_dir_key
+from models.mounts import shared_mount_table, virtual_mount_points, VIRTUAL_FSTYPES
+from models.path_index import index_settings_dir
+from models.prefetcher import lower_thread_priority
+from models.tree_walk import list_dir
+
+# v12.23 フォルダのサイズ列で、集計中の行に出す文字
+COMPUTING_TEXT = "computing…"
+
+
+class FolderSize:
+    """フォルダ以下の合計。mtime は集計したときのフォルダ自身の st_mtime_ns"""
+    __slots__ = ("bytes", "files", "dirs", "mtime", "scanned_at")
+
+    def __init__(self, nbytes, files, dirs, mtime, scanned_at=None):
+        self.bytes = nbytes
+        self.files = files
+        self.dirs = dirs
+        self.mtime = mtime
+        self.scanned_at = time.time() if scanned_at is None else scanned_at
+
+
+def format_folder_size(entry):
+    """v12.23 サイズ列の表示 ("1.2 GB · 3,456 items")"""
+    size = QLocale.system().formattedDataSize(entry.bytes, 1, QLocale.DataSizeTraditionalFormat)
+    items = entry.files + entry.dirs
+    return f"{size} · {items:,} item{'' if items == 1 else 's'}"
+
+
+class FolderSizeCache:
+    """
+    v12.22 集計し終えたフォルダ以下の合計（サイズ・ファイル数・フォルダ数）のキャッシュ（プロセス共有）。
+    フォルダの中身が変わるとそのフォルダと祖先すべての合計が変わるので、監視の変更通知
+    (ChangeCoalescer) を受けたら祖先ごと捨てる。監視していない深い階層の変更は通知されないので、
+    再利用は集計から MAX_AGE 秒以内で、フォルダ自身の mtime が変わっていないものに限る。
+    前回の集計での大きいファイル・フォルダの一覧もルートごとに覚え、再利用した部分の分として使う。
+    ワーカースレッドからも呼ばれるのでロックで保護する。
+
+    v12.23 settings_file があれば起動時に読み込み、終了時に新しいものから MAX_PERSIST 件を書き出す。
+    前回のセッションの合計はすぐに表示に使えるが、古い（MAX_AGE を過ぎた）ので数え直しの対象になる。
+    """
+    MAX_AGE = 15 * 60
+    MAX_PERSIST = 20000
+    SETTINGS_NAME = "folder_sizes.json"
+
+    def __init__(self, settings_file=None):
+        self._lock = threading.Lock()
+        self._entries = {}   # 正規化したパス -> FolderSize
+        self._tops = {}      # 集計したルート -> ([(サイズ, ファイルのパス)], [(サイズ, フォルダのパス)])
+        self.settings_file = settings_file
+        if settings_file:
+            self.load()
+        shared_change_coalescer().directoryChanged.connect(self.invalidate)
+
+    def get(self, path):
+        with self._lock:
+            return self._entries.get(normalize_dir_key(path))
+
+    def reusable(self, path, mtime):
+        """path の合計を集計し直さずに使えるなら返す（mtime はフォルダの今の st_mtime_ns）"""
+        entry = self.get(path)
+        if entry is None or entry.mtime != mtime or time.time() - entry.scanned_at > self.MAX_AGE:
+            return None
+        return entry
+
+    def put(self, path, entry):
+        with self._lock:
+            self._entries[normalize_dir_key(path)] = entry
+
+    def invalidate(self, path):
+        """path とその祖先の合計を捨てる"""
+        key = normalize_dir_key(path)
+        with self._lock:
+            while True:
+                self._entries.pop(key, None)
+                parent = os.path.dirname(key)
+                if parent == key:
+                    break
+                key = parent
+
+    def setTops(self, root, files, dirs):
+        with self._lock:
+            self._tops[normalize_dir_key(root)] = (list(files), list(dirs))
+
+    def topsUnder(self, root):
+        """前回までの集計で覚えた root の下の大きいファイルとフォルダ ([(サイズ, パス)], [(サイズ, パス)])"""
+        key = normalize_dir_key(root)
+        prefix = key.rstrip(os.sep) + os.sep
+        files, dirs = {}, {}
+        with self._lock:
+            for scanned_root, tops in self._tops.items():
+                if not (scanned_root == key or key.startswith(scanned_root.rstrip(os.sep) + os.sep)
+                        or scanned_root.startswith(prefix)):
+                    continue
+                for found, items in zip((files, dirs), tops):
+                    for size, path in items:
+                        if normalize_dir_key(path).startswith(prefix):
+                            found[path] = size
+        return ([(size, path) for path, size in files.items()],
+                [(size, path) for path, size in dirs.items()])
+
+    def load(self):
+        """v12.23 前回のセッションの合計を読み込む（無ければ空のまま）"""
+        if not self.settings_file or not os.path.exists(self.settings_file):
+            return
+        try:
+            with open(self.settings_file, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            entries = {key: FolderSize(*values) for key, values in saved.get("entries", {}).items()}
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"Folder Size Cache Error ({self.settings_file}): {e}", file=sys.stderr)
+            return
+        with self._lock:
+            for key, entry in entries.items():
+                self._entries.setdefault(key, entry)
+
+    def save(self):
+        """v12.23 新しいものから MAX_PERSIST 件を書き出す（アプリ終了時）"""
+        if not self.settings_file:
+            return
+        with self._lock:
+            items = sorted(self._entries.items(), key=lambda kv: kv[1].scanned_at, reverse=True)
+        entries = {key: [e.bytes, e.files, e.dirs, e.mtime, e.scanned_at] for key, e in items[:self.MAX_PERSIST]}
+        try:
+            with open(self.settings_file, "w", encoding="utf-8") as f:
+                json.dump({"entries": entries}, f)
+        except OSError as e:
+            print(f"Folder Size Cache Error ({self.settings_file}): {e}", file=sys.stderr)
+
+
+def measure_folder(path, cache, job=None):
+    """
+    v12.23 path 以下の合計を1本のスレッドで数えて FolderSize を返す（打ち切られたら None）。
+    子孫のフォルダで cache.reusable() なものは潜らずに使い、数え終えたフォルダは cache に入れる。
+    読めないフォルダを含む合計は、表示には使えるが再利用しないように mtime を None にして入れる。
+    ハードリンクは同じ (デバイス, inode) を1回だけ数える。疑似ファイルシステム (/proc など) には潜らない。
+    """
+    seen_links = set()
+    skip = virtual_mount_points()
+    stack = [] # [パス, mtime, バイト数, ファイル数, フォルダ数, 残りの子フォルダ, 読めたか]
+
+    def enter(folder):
+        listing = list_dir(folder, stat_dir=True)
+        nbytes = files = 0
+        for _name, size, _mtime, link in listing.files:
+            if link is not None:
+                if link in seen_links:
+                    continue
+                seen_links.add(link)
+            nbytes += size
+            files += 1
+        dirs = [d for d in listing.dirs if d not in skip]
+        stack.append([folder, listing.mtime, nbytes, files, len(dirs), dirs, listing.error is None])
+
+    enter(path)
+    while True:
+        if job is not None and job.cancelled:
+            return None
+        frame = stack[-1]
+        if frame[5]:
+            child = frame[5].pop()
+            try:
+                entry = cache.reusable(child, os.stat(child).st_mtime_ns)
+            except OSError:
+                entry = None
+            if entry is None:
+                enter(child)
+            else:
+                frame[2] += entry.bytes
+                frame[3] += entry.files
+                frame[4] += entry.dirs
+            continue
+        stack.pop()
+        folder, mtime, nbytes, files, dirs, _, complete = frame
+        entry = FolderSize(nbytes, files, dirs, mtime if complete else None)
+        cache.put(folder, entry)
+        if not stack:
+            return entry
+        parent = stack[-1]
+        parent[2] += nbytes
+        parent[3] += files
+        parent[4] += dirs
+        parent[6] = parent[6] and complete
+
+
+class FolderSizeService(QObject):
+    """
+    v12.23 ペインのサイズ列・Quick Look 用に、フォルダ以下の合計を裏で数える（プロセス共有）。
+    request(パス) は表示中の行の分だけ呼ばれる前提で、新しい依頼から順に（スクロールで見えた行を優先）
+    WORKERS 本のワーカーが measure_folder() で数え、終わったら sizeReady(パス) を出す。
+    キャッシュに新しい合計があれば数えずに済ませる。一度確かめたフォルダは、監視の変更通知で
+    そのフォルダか子孫が変わるまで依頼されても何もしない（変わったら数え直して sizeReady を出す）。
+    疑似ファイルシステムと、I/O ポリシーで先読みしないマウント（ネットワーク/FUSE）は数えない。
+    """
+    sizeReady = Signal(str)
+    _measured = Signal(str) # ワーカー -> GUI スレッド
+
+    WORKERS = 2
+    MAX_QUEUED = 256
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self._cache = cache or shared_folder_sizes()
+        self._lock = threading.Lock()
+        self._queue = OrderedDict() # 正規化したパス -> パス（後ろほど新しい依頼）
+        self._running = set()
+        self._checked = {}          # 確かめ済みの正規化したパス -> パス
+        self._job = SimpleNamespace(cancelled=False)
+        self._pool = ThreadPoolExecutor(max_workers=self.WORKERS, thread_name_prefix="cff-foldersize",
+                                        initializer=lower_thread_priority)
+        self._measured.connect(self.sizeReady)
+        # キャッシュ（先に接続済み）が祖先ごと捨てた後に、確かめ済みの分を数え直す
+        shared_change_coalescer().directoryChanged.connect(self._on_directory_changed)
+
+    def cache(self):
+        return self._cache
+
+    def eligible(self, path):
+        """path のサイズを裏で数えてよいか（マウントの判定だけで、path にはアクセスしない）"""
+        mount = shared_mount_table().mount_for(path)
+        return mount.fstype not in VIRTUAL_FSTYPES and shared_io_policy().profile_for_mount(mount).prefetch
+
+    def request(self, path):
+        """
+        path の合計を（無いか古ければ）数える依頼を出す。数えることになっている（済み・待ち・実行中）
+        なら True、数えない場所なら False
+        """
+        key = normalize_dir_key(path)
+        if key in self._checked:
+            return True
+        if self._job.cancelled or not self.eligible(path):
+            return False
+        with self._lock:
+            if key in self._running:
+                return True
+            if key in self._queue:
+                self._queue.move_to_end(key)
+                return True
+            self._queue[key] = path
+            if len(self._queue) > self.MAX_QUEUED:
+                self._queue.popitem(last=False) # 見えなくなった古い依頼（また見えたら依頼し直される）
+        try:
+            self._pool.submit(self._work)
+        except RuntimeError: # close() 済み
+            return False
+        return True
+
+    def displayText(self, path):
+        """サイズ列の表示（必要なら request() する）。数えない場所は空文字"""
+        requested = self.request(path)
+        entry = self._cache.get(path)
+        if entry is not None:
+            return format_folder_size(entry)
+        return COMPUTING_TEXT if requested else ""
+
+    def close(self):
+        self._job.cancelled = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _work(self):
+        with self._lock:
+            if not self._queue:
+                return
+            key, path = self._queue.popitem(last=True)
+            self._running.add(key)
+        try:
+            try:
+                entry = self._cache.reusable(path, os.stat(path).st_mtime_ns)
+            except OSError:
+                entry = None
+            if entry is None:
+                entry = measure_folder(path, self._cache, self._job)
+        finally:
+            with self._lock:
+                self._running.discard(key)
+        if entry is None:
+            return # 打ち切り
+        with self._lock:
+            self._checked[key] = path
+        try:
+            self._measured.emit(path)
+        except RuntimeError: # アプリ終了時に既に破棄済み
+            pass
+
+    def _on_directory_changed(self, path):
+        key = normalize_dir_key(path)
+        while True:
+            with self._lock:
+                checked = self._checked.pop(key, None)
+            if checked is not None:
+                self.request(checked)
+            parent = os.path.dirname(key)
+            if parent == key:
+                break
+            key = parent
+
+
+_shared_cache = None
+_shared_service = None
+
+
+def shared_folder_sizes():
+    """プロセス共有のキャッシュを返す（v12.23 folder_sizes.json に永続化する）"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = FolderSizeCache(os.path.join(index_settings_dir(), FolderSizeCache.SETTINGS_NAME))
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_shared_cache.save)
+    return _shared_cache
+
+
+def shared_folder_size_service():
+    """v12.23 プロセス共有のサイズ集計サービスを返す"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = FolderSizeService()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_shared_service.close)
+    return _shared_service
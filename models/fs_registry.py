@@ -0,0 +1,51 @@
+from PySide6.QtWidgets import QFileSystemModel
+from PySide6.QtCore import QDir
+
+
+class FileSystemModelRegistry:
+    """
+    v12.1 プロセス全体で1つの QFileSystemModel を共有するためのレジストリ。
+    ペインやサイドバーごとにモデルを作ると、同じディレクトリが何度も列挙・監視されるため、
+    参照カウント付きで1つのモデルを貸し出す。
+    """
+    def __init__(self):
+        self._model = None
+        self._refcount = 0
+
+    def acquire(self):
+        """共有モデルを取得し、参照カウントを1つ増やす"""
+        if self._model is None:
+            model = QFileSystemModel()
+            # Drivesを含めないとルート表示がおかしくなることがある
+            model.setFilter(QDir.AllEntries | QDir.NoDotAndDotDot | QDir.Hidden | QDir.Drives)
+            model.setRootPath(QDir.rootPath())
+            model.setReadOnly(False) # 右クリック操作（削除・リネーム）のために必要
+            self._model = model
+        self._refcount += 1
+        return self._model
+
+    def release(self):
+        """参照カウントを1つ減らし、誰も使っていなければモデルを破棄する"""
+        if self._refcount <= 0:
+            return
+        self._refcount -= 1
+        if self._refcount == 0 and self._model is not None:
+            try:
+                self._model.deleteLater()
+            except RuntimeError: # アプリ終了時に既に破棄済みの場合
+                pass
+            self._model = None
+
+    @property
+    def refcount(self):
+        return self._refcount
+
+
+_shared_registry = None
+
+def shared_model_registry():
+    """プロセス共有のレジストリを返す"""
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = FileSystemModelRegistry()
+    return _shared_registry
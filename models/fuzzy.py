@@ -0,0 +1,166 @@
+import heapq
+import re
+from bisect import bisect_right
+from itertools import accumulate, repeat
+from operator import add
+
+# fzf と同じ考え方の点数（v1 アルゴリズム: 前から最短で拾い、後ろから詰め直した位置で採点する）
+SCORE_MATCH = 16
+SCORE_GAP_START = -3
+SCORE_GAP_EXTENSION = -1
+BONUS_BOUNDARY_WHITE = 10     # 先頭・空白の直後
+BONUS_BOUNDARY_DELIMITER = 9  # パス区切りの直後
+BONUS_BOUNDARY = 8            # _ - . などの直後
+BONUS_CAMEL = 7               # camelCase の大文字、数字の始まり
+BONUS_CONSECUTIVE = 4         # 連続して一致した文字
+BONUS_FIRST_CHAR_MULTIPLIER = 2
+
+_DELIMITERS = "/\\"
+_PUNCTUATION = "_-.,:;()[]{}+~@#'"
+
+# 照合を1回の C 呼び出しで済ませる件数（これごとに job.cancelled を見る）
+CHUNK = 8192
+
+
+def _bonus(text, pos):
+    """text[pos] に一致したときの境界ボーナス"""
+    if pos == 0:
+        return BONUS_BOUNDARY_WHITE
+    prev = text[pos - 1]
+    if prev == " ":
+        return BONUS_BOUNDARY_WHITE
+    if prev in _DELIMITERS:
+        return BONUS_BOUNDARY_DELIMITER
+    if prev in _PUNCTUATION:
+        return BONUS_BOUNDARY
+    cur = text[pos]
+    if prev.islower() and cur.isupper():
+        return BONUS_CAMEL
+    if cur.isdigit() and not prev.isdigit():
+        return BONUS_CAMEL
+    return 0
+
+
+class FuzzyMatcher:
+    """
+    v12.18 fzf 風のあいまい照合。pattern の文字が順に（飛び飛びでよい）含まれる名前に一致し、
+    単語の頭・区切りの直後・camelCase の大文字・連続した一致に加点、間の隙間に減点して採点する。
+    大文字小文字は区別しない（ボーナスの判定には元の大文字小文字を使う）。
+
+    大量の候補（50万件など）は rank()/match_many() で CHUNK 件ずつまとめて照合する。
+    まず改行で連結した名前に対して部分列の正規表現を1回だけ走らせ（C 実装）、
+    一致した名前だけを Python で採点するので、一致しない大多数に Python のループは回らない。
+    """
+    __slots__ = ("pattern", "_chars", "_regex")
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self._chars = [c for c in pattern.lower() if not c.isspace()]
+        # a[^b\\n]*b[^c\\n]*c... は後戻りせずに部分列の有無を判定できる。行頭に錨を付けないので、
+        # 正規表現エンジンは先頭の文字を C の文字列検索で探し、一致しない行はほぼ素通りになる
+        parts = [re.escape(c) if k == 0 else f"[^{re.escape(c)}\\n]*{re.escape(c)}"
+                 for k, c in enumerate(self._chars)]
+        self._regex = re.compile("".join(parts), re.IGNORECASE)
+
+    def __bool__(self):
+        return bool(self._chars)
+
+    def matches(self, text):
+        return self._regex.search(text) is not None if self else True
+
+    def score(self, text):
+        """text の点数（一致しなければ None）"""
+        if not self:
+            return 0
+        if self._regex.search(text) is None:
+            return None
+        return self._score(text)
+
+    def match_many(self, names, rows=None, job=None):
+        """
+        names[i]（rows 省略時はすべての i）のうち一致するものの {i: 点数} を返す。
+        job.cancelled が立ったら None を返して打ち切る
+        """
+        if rows is None:
+            rows = range(len(names))
+        if not self:
+            return {i: 0 for i in rows}
+        scores = {}
+        regex = self._regex
+        score = self._score
+        for start in range(0, len(rows), CHUNK):
+            if job is not None and job.cancelled:
+                return None
+            chunk = rows[start:start + CHUNK]
+            chunk_names = [names[i] for i in chunk]
+            joined = "\n".join(chunk_names)
+            if joined.count("\n") != len(chunk_names) - 1:
+                # 改行を含む名前があると行がずれるので1件ずつ照合する
+                for i, name in zip(chunk, chunk_names):
+                    if regex.search(name) is not None:
+                        s = score(name)
+                        if s is not None:
+                            scores[i] = s
+                continue
+            search = regex.search
+            m = search(joined)
+            if m is not None:
+                # 各行の終わりの位置。一致したら次の行の頭から探し直す（同じ行の2つ目以降の一致は見ない）
+                ends = list(accumulate(map(add, map(len, chunk_names), repeat(1))))
+            while m is not None:
+                k = bisect_right(ends, m.start())
+                s = score(chunk_names[k])
+                if s is not None: # 大文字小文字の対応が lower() と違う文字
+                    scores[chunk[k]] = s
+                m = search(joined, ends[k])
+        return scores
+
+    def rank(self, candidates, limit=None, key=None, job=None):
+        """candidates を点数の高い順に並べた [(点数, 候補)] を返す（同点は短い方・元の順）"""
+        texts = [key(c) for c in candidates] if key else candidates
+        scores = self.match_many(texts, job=job)
+        if scores is None:
+            return None
+        order = ((-s, len(texts[i]), i) for i, s in scores.items())
+        order = heapq.nsmallest(limit, order) if limit else sorted(order)
+        return [(-neg, candidates[i]) for neg, _, i in order]
+
+    def _score(self, text):
+        folded = text.lower()
+        if len(folded) != len(text):
+            folded = text # 小文字にすると長さが変わる文字（İ など）を含む名前は位置がずれるのでそのまま
+        chars = self._chars
+        # 前から最短で拾って終わりの位置を決め、そこから後ろへ詰め直して始まりを決める
+        pos = -1
+        for c in chars:
+            pos = folded.find(c, pos + 1)
+            if pos < 0:
+                return None
+        positions = [pos]
+        for c in reversed(chars[:-1]):
+            positions.append(folded.rfind(c, 0, positions[-1]))
+        positions.reverse()
+
+        score = 0
+        prev = -2
+        first_bonus = 0
+        for k, pos in enumerate(positions):
+            bonus = _bonus(text, pos)
+            if pos == prev + 1:
+                # 連続した一致は、塊の最初の文字のボーナスを引き継ぐ
+                bonus = max(bonus, first_bonus, BONUS_CONSECUTIVE)
+            else:
+                if k:
+                    gap = pos - prev - 1
+                    score += SCORE_GAP_START + SCORE_GAP_EXTENSION * (gap - 1)
+                first_bonus = bonus
+            if k == 0:
+                bonus *= BONUS_FIRST_CHAR_MULTIPLIER
+            score += SCORE_MATCH + bonus
+            prev = pos
+        return score
+
+
+def fuzzy_rank(pattern, candidates, limit=None, key=None):
+    """pattern で candidates を照合し、点数の高い順の候補のリストを返す"""
+    return [c for _, c in FuzzyMatcher(pattern).rank(candidates, limit=limit, key=key)]
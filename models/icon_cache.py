@@ -0,0 +1,250 @@
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtWidgets import QFileIconProvider
+from PySide6.QtGui import QIcon, QImage, QPixmap
+from PySide6.QtCore import QObject, QFileInfo, QMimeDatabase, QStandardPaths, Signal
+
+# アイコンがファイルごとに違う種類（拡張子は EntryStore と同じ大文字・ドットなし）。
+# Windows は実行ファイルやショートカットに埋め込まれたアイコン、それ以外は .desktop の Icon=
+if sys.platform.startswith("win"):
+    PER_FILE_EXTS = {"EXE", "LNK", "URL", "ICO"}
+else:
+    PER_FILE_EXTS = {"DESKTOP"}
+
+# 特別なフォルダ -> テーマのアイコン名（Linux のアイコンテーマ用）
+_SPECIAL_FOLDERS = (
+    (QStandardPaths.HomeLocation, "user-home"),
+    (QStandardPaths.DesktopLocation, "user-desktop"),
+    (QStandardPaths.DocumentsLocation, "folder-documents"),
+    (QStandardPaths.DownloadLocation, "folder-download"),
+    (QStandardPaths.PicturesLocation, "folder-pictures"),
+    (QStandardPaths.MusicLocation, "folder-music"),
+    (QStandardPaths.MoviesLocation, "folder-videos"),
+)
+
+
+def _read_desktop_icon(path):
+    """.desktop ファイルの Icon= を返す（[Desktop Entry] の分だけ見る）"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        in_entry = False
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                if in_entry:
+                    break
+                in_entry = line == "[Desktop Entry]"
+            elif in_entry and line.startswith("Icon="):
+                return line[5:].strip()
+    return ""
+
+
+def _init_shell_worker():
+    """Windows: シェルのアイコン取得（SHGetFileInfo）は COM を初期化したスレッドで行う"""
+    import ctypes
+    ctypes.windll.ole32.CoInitializeEx(None, 0x2) # COINIT_APARTMENTTHREADED
+
+
+def _shell_icon_image(path):
+    """
+    Windows: SHGetFileInfo でファイルのアイコン（.exe の埋め込み、.lnk のリンク先など）を取り、
+    QImage に写して返す（HICON は破棄する）。取れなければ None
+    """
+    import ctypes
+    from ctypes import wintypes
+
+    class SHFILEINFOW(ctypes.Structure):
+        _fields_ = [("hIcon", wintypes.HANDLE), ("iIcon", ctypes.c_int), ("dwAttributes", wintypes.DWORD),
+                    ("szDisplayName", wintypes.WCHAR * 260), ("szTypeName", wintypes.WCHAR * 80)]
+
+    SHGFI_ICON = 0x100 # 大きいアイコン（SHGFI_LARGEICON = 0）
+    info = SHFILEINFOW()
+    if not ctypes.windll.shell32.SHGetFileInfoW(path, 0, ctypes.byref(info), ctypes.sizeof(info), SHGFI_ICON):
+        return None
+    if not info.hIcon:
+        return None
+    try:
+        image = QImage.fromHICON(info.hIcon)
+    finally:
+        ctypes.windll.user32.DestroyIcon(info.hIcon)
+    return None if image.isNull() else image
+
+
+def _resolve_file(path, ext):
+    """
+    ワーカーでファイルごとのアイコンの材料を集める（ファイルを読むのはここだけ）。
+    ("image", QImage) / ("theme", アイコン名) / ("info", stat 済みの QFileInfo) / None を返す。
+    Windows の .exe/.lnk/.url もシェルのアイコンをここで QImage にしておき、GUI スレッドでは包むだけにする。
+    QIcon/QPixmap は GUI スレッドでしか作れないので、ここでは作らない。
+    """
+    try:
+        if ext == "ICO":
+            image = QImage(path)
+            return ("image", image) if not image.isNull() else None
+        if ext == "DESKTOP":
+            name = _read_desktop_icon(path)
+            if not name:
+                return None
+            if os.path.isabs(name):
+                image = QImage(name)
+                return ("image", image) if not image.isNull() else None
+            return ("theme", name)
+        if sys.platform.startswith("win") and hasattr(QImage, "fromHICON"):
+            if not os.path.exists(path):
+                return None
+            image = _shell_icon_image(path)
+            return ("image", image) if image is not None else None
+        # それ以外はプラットフォームのアイコンプロバイダーに任せる。
+        # stat（.lnk ならリンク先の解決も）を済ませた QFileInfo を渡して、GUI スレッドではキャッシュだけを使わせる
+        info = QFileInfo(path)
+        if not info.exists():
+            return None
+        info.isSymLink()
+        info.symLinkTarget()
+        return ("info", info)
+    except OSError:
+        return None
+
+
+class IconCache(QObject):
+    """
+    v12.14 ファイル一覧のアイコンを種類ごとに1つだけ引いて使い回すキャッシュ。
+    キーは (フォルダか, 拡張子, 特別なフォルダ) で、QFileIconProvider を引くのは種類ごとに1回。
+    10万件のファイルをスクロールしても、引くのは出てきた拡張子の数だけになる。
+
+    ファイルごとにアイコンが違う種類（.exe/.lnk/.desktop など、PER_FILE_EXTS）だけは
+    ファイル単位で引く。その材料（ファイルの読み込みや stat）はワーカーで集め、揃うまでは
+    種類のアイコンを返しておき、揃ったら iconReady(path) で知らせる（受け手が描き直す）。
+    ファイル単位の分は MAX_PER_FILE 件の LRU で持つ。
+    """
+    iconReady = Signal(str)
+    _resolved = Signal(str, object) # ワーカー -> GUI スレッド
+
+    MAX_PER_FILE = 2048
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._provider = QFileIconProvider()
+        self._mime_db = QMimeDatabase()
+        self._windows = sys.platform.startswith("win")
+        self._type_icons = {}              # (is_dir, ext, special) -> QIcon
+        self._file_icons = OrderedDict()   # path -> QIcon（解決できなかったものは種類のアイコン）
+        self._pending = set()              # 解決中のパス
+        self._special = None               # パス -> テーマのアイコン名
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cff-icon",
+                                            initializer=_init_shell_worker if self._windows else None)
+        self._resolved.connect(self._on_resolved)
+        self.lookups = 0      # 種類のアイコンを引いた回数（計測用）
+        self.file_lookups = 0 # ファイル単位のアイコンを作った回数（計測用）
+
+    def icon(self, directory, name, is_dir, ext):
+        """
+        directory 内の name のアイコンを返す（ext は大文字・ドットなし）。
+        ファイル単位のアイコンがまだなければ種類のアイコンを返し、裏で解決する
+        """
+        if is_dir:
+            return self._type_icon(True, "", self._special_name(os.path.join(directory, name)))
+        if ext in PER_FILE_EXTS:
+            path = os.path.join(directory, name)
+            icon = self._file_icons.get(path)
+            if icon is not None:
+                self._file_icons.move_to_end(path)
+                return icon
+            if path not in self._pending:
+                self._pending.add(path)
+                self._executor.submit(self._run, path, ext)
+        return self._type_icon(False, ext, "")
+
+    def folder_icon(self, path):
+        """フォルダ単体のアイコン（サイドバーの項目など）"""
+        return self._type_icon(True, "", self._special_name(os.path.abspath(path)))
+
+    def invalidate(self, path=None):
+        """ファイル単位のアイコンを捨てる（path 省略時はすべて）"""
+        if path is None:
+            self._file_icons.clear()
+        else:
+            self._file_icons.pop(path, None)
+
+    # --- internal ---
+
+    def _special_folders(self):
+        if self._special is None:
+            self._special = {}
+            for location, theme_name in _SPECIAL_FOLDERS:
+                path = QStandardPaths.writableLocation(location)
+                if path:
+                    self._special.setdefault(os.path.abspath(path), theme_name)
+        return self._special
+
+    def _special_name(self, path):
+        return self._special_folders().get(path, "")
+
+    def _type_icon(self, is_dir, ext, special):
+        key = (is_dir, ext, special)
+        icon = self._type_icons.get(key)
+        if icon is None:
+            icon = self._type_icons[key] = self._lookup_type(is_dir, ext, special)
+        return icon
+
+    def _lookup_type(self, is_dir, ext, special):
+        self.lookups += 1
+        if is_dir:
+            folder = self._provider.icon(QFileIconProvider.Folder)
+            if special and not self._windows:
+                return QIcon.fromTheme(special, folder)
+            if special:
+                # Windows はシェルのアイコンが特別なフォルダごとに違う（数件だけなので実パスで引く）
+                for path, name in self._special.items():
+                    if name == special:
+                        return self._provider.icon(QFileInfo(path))
+            return folder
+        generic = self._provider.icon(QFileIconProvider.File)
+        if not ext:
+            return generic
+        if self._windows:
+            # 存在しない名前を渡すと、シェルは拡張子だけで種類のアイコンを返す
+            return self._provider.icon(QFileInfo(f"__cff_icon__.{ext.lower()}"))
+        # QFileIconProvider と同じく MIME タイプのテーマアイコンを使う。
+        # 拡張子だけで判定し、ファイルの中身は読まない
+        mime = self._mime_db.mimeTypeForFile(f"x.{ext.lower()}", QMimeDatabase.MatchExtension)
+        return QIcon.fromTheme(mime.iconName(), QIcon.fromTheme(mime.genericIconName(), generic))
+
+    def _run(self, path, ext):
+        result = _resolve_file(path, ext)
+        try:
+            self._resolved.emit(path, result)
+        except RuntimeError: # アプリ終了時に既に破棄済みの場合
+            pass
+
+    def _on_resolved(self, path, result):
+        self._pending.discard(path)
+        fallback = self._type_icon(False, os.path.splitext(path)[1][1:].upper(), "")
+        if result is None:
+            # 種類のアイコンのままにする（次に表示されたときも引き直さない）
+            icon = fallback
+        else:
+            kind, value = result
+            self.file_lookups += 1
+            if kind == "image":
+                icon = QIcon(QPixmap.fromImage(value))
+            elif kind == "theme":
+                icon = QIcon.fromTheme(value, fallback)
+            else:
+                icon = self._provider.icon(value)
+        self._file_icons[path] = icon
+        while len(self._file_icons) > self.MAX_PER_FILE:
+            self._file_icons.popitem(last=False)
+        if result is not None:
+            self.iconReady.emit(path)
+
+
+_shared_cache = None
+
+def shared_icon_cache():
+    """プロセス共有のアイコンキャッシュを返す"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = IconCache()
+    return _shared_cache
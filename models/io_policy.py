@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+
+from models.mounts import shared_mount_table, FS_LOCAL, FS_NETWORK, FS_FUSE
+
+
+class IoProfile:
+    """
+    v12.13 ビュー1つ分の I/O の振る舞い。
+    lazy_stat: 列挙時に stat しない（表示中の行だけ後から取る）
+    prefetch: カーソル下のフォルダを先読みする
+    watch: "notify" = inotify 等の変更通知, "poll" = poll_interval_ms ごとに mtime を確認, "none" = 監視しない
+    batch_size: 非同期列挙で1回に送る件数
+    stat_timeout_ms: GUI スレッドが stat の結果を待つ上限（StatService のマウント別タイムアウト）
+    force_flat: QFileSystemModel を使わずフラットモデルで表示する
+    """
+    __slots__ = ("name", "lazy_stat", "prefetch", "watch", "poll_interval_ms",
+                 "batch_size", "stat_timeout_ms", "force_flat")
+
+    FIELDS = __slots__[1:]
+
+    def __init__(self, name, lazy_stat=False, prefetch=True, watch="notify", poll_interval_ms=0,
+                 batch_size=2000, stat_timeout_ms=300, force_flat=False):
+        self.name = name
+        self.lazy_stat = lazy_stat
+        self.prefetch = prefetch
+        self.watch = watch
+        self.poll_interval_ms = poll_interval_ms
+        self.batch_size = batch_size
+        self.stat_timeout_ms = stat_timeout_ms
+        self.force_flat = force_flat
+
+    def derive(self, name, overrides):
+        """overrides（設定ファイルの辞書）で一部の項目を差し替えた写しを返す"""
+        values = {f: getattr(self, f) for f in self.FIELDS}
+        for key, value in overrides.items():
+            if key in values:
+                values[key] = value
+        return IoProfile(name, **values)
+
+    def __repr__(self):
+        fields = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.FIELDS)
+        return f"IoProfile({self.name!r}, {fields})"
+
+
+# ローカルディスク: これまで通りの積極的な振る舞い（lazy_stat はペインの設定に従う）
+LOCAL_PROFILE = IoProfile("local")
+# ネットワーク/FUSE: 1回のシステムコールが数百 ms かかる前提で、余計な I/O をしない。
+# inotify はリモート側の変更を拾えない（NFS/SMB）か、対応していない（多くの FUSE）ので定期確認にする。
+CONSERVATIVE_PROFILE = IoProfile("conservative", lazy_stat=True, prefetch=False, watch="poll",
+                                 poll_interval_ms=5000, batch_size=256, stat_timeout_ms=1500,
+                                 force_flat=True)
+
+PROFILES = {"local": LOCAL_PROFILE, "conservative": CONSERVATIVE_PROFILE}
+CLASS_PROFILES = {FS_LOCAL: LOCAL_PROFILE, FS_NETWORK: CONSERVATIVE_PROFILE, FS_FUSE: CONSERVATIVE_PROFILE}
+
+
+class IoPolicy:
+    """
+    v12.13 パスのマウントの種類（/proc/self/mountinfo）から IoProfile を選ぶ。
+    ネットワーク (nfs/cifs など) と FUSE (sshfs など) は控えめなプロファイルにする。
+
+    設定ファイル (io_policy.json) でマウントごとに上書きできる:
+        {
+          "mounts": {
+            "/mnt/nas": {"profile": "local"},
+            "/mnt/slow": {"poll_interval_ms": 30000, "batch_size": 64}
+          }
+        }
+    "profile" で基になるプロファイルを選び、残りの項目で個別に差し替える。
+    判定は文字列の照合だけで、対象パスにはアクセスしない。
+    """
+    SETTINGS_NAME = "io_policy.json"
+
+    def __init__(self, settings_file=None, mounts=None):
+        self.mounts = mounts or shared_mount_table()
+        self.settings_file = settings_file
+        self._overrides = {} # マウントポイント -> 設定の辞書
+        self._resolved = {}  # マウントポイント -> IoProfile
+        if settings_file:
+            self.load()
+
+    def load(self):
+        """設定ファイルを読み直す（無ければ上書きなし）"""
+        self._overrides = {}
+        self._resolved = {}
+        if not self.settings_file or not os.path.exists(self.settings_file):
+            return
+        try:
+            with open(self.settings_file, "r", encoding="utf-8") as f:
+                settings = json.load(f)
+            mounts = settings.get("mounts", {})
+            self._overrides = {os.path.abspath(mp): v for mp, v in mounts.items() if isinstance(v, dict)}
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"IO Policy Error ({self.settings_file}): {e}", file=sys.stderr)
+
+    def mount_for(self, path):
+        return self.mounts.mount_for(path)
+
+    def profile_for(self, path):
+        """path のマウントに適用する IoProfile を返す"""
+        return self.profile_for_mount(self.mounts.mount_for(path))
+
+    def profile_for_mount(self, mount):
+        profile = self._resolved.get(mount.mount_point)
+        if profile is None:
+            profile = CLASS_PROFILES[mount.fs_class]
+            overrides = self._overrides.get(mount.mount_point)
+            if overrides:
+                base = PROFILES.get(overrides.get("profile"), profile)
+                profile = base.derive(f"{base.name}*", overrides)
+            self._resolved[mount.mount_point] = profile
+        return profile
+
+
+_shared_policy = None
+
+def shared_io_policy():
+    """プロセス共有の I/O ポリシーを返す（設定は実行ファイル/アプリと同じ階層の io_policy.json）"""
+    global _shared_policy
+    if _shared_policy is None:
+        if getattr(sys, 'frozen', False):
+            base_dir = os.path.dirname(sys.executable)
+        else:
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        _shared_policy = IoPolicy(os.path.join(base_dir, IoPolicy.SETTINGS_NAME))
+    return _shared_policy
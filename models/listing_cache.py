@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+
+def normalize_dir_key(path):
+    """キャッシュのキー（正規化した絶対パス）"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def dir_signature(path):
+    """ディレクトリの同一性と更新を判定するための (mtime_ns, inode, device)"""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_ino, st.st_dev)
+
+
+class _CachedListing:
+    __slots__ = ("signature", "rows", "nbytes")
+
+    def __init__(self, signature, rows, nbytes):
+        self.signature = signature
+        self.rows = rows
+        self.nbytes = nbytes
+
+
+class ListingCache:
+    """
+    v12.4 ディレクトリ一覧のLRUキャッシュ（全ペイン・全タブで共有）。
+    キーは正規化したディレクトリパス。取得時にディレクトリの mtime/inode を見て
+    変わっていれば破棄する。件数とおおよそのバイト数の上限を超えたら古いものから捨てる。
+
+    rows は (name, is_dir, size, mtime) のタプルのリストで、呼び出し側から変更されない前提。
+    ワーカースレッドからも呼ばれるのでロックで保護する。
+    """
+    # 1行あたりのおおよそのオーバーヘッド（タプル + 数値オブジェクト）
+    _ROW_OVERHEAD = 120
+
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def configure(self, max_entries=None, max_bytes=None):
+        """上限を変更し、超過分があれば追い出す"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._evict()
+
+    def get(self, path, count_stats=True):
+        """
+        有効なキャッシュがあれば rows を返す。なければ None。
+        先読みなど統計に含めたくない問い合わせは count_stats=False で呼ぶ。
+        """
+        key = normalize_dir_key(path)
+        with self._lock:
+            item = self._items.get(key)
+        if item is None:
+            if count_stats:
+                with self._lock:
+                    self.misses += 1
+            return None
+
+        # 再検証（ロック外で stat する）
+        try:
+            valid = dir_signature(path) == item.signature
+        except OSError:
+            valid = False
+
+        with self._lock:
+            if not valid:
+                if count_stats:
+                    self.stale += 1
+                    self.misses += 1
+                if self._items.get(key) is item:
+                    self._drop(key)
+                return None
+            if count_stats:
+                self.hits += 1
+            if key in self._items:
+                self._items.move_to_end(key)
+            return item.rows
+
+    def put(self, path, rows, signature):
+        """
+        一覧を登録する。signature は列挙を始める前に dir_signature() で取っておくこと
+        （列挙中に変更があった場合に、次回の取得で確実に無効化されるように）。
+        """
+        key = normalize_dir_key(path)
+        nbytes = sum(sys.getsizeof(r[0]) for r in rows) + len(rows) * self._ROW_OVERHEAD
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            if nbytes > self.max_bytes:
+                return # 1件で予算を超えるものは持たない
+            self._items[key] = _CachedListing(signature, rows, nbytes)
+            self._bytes += nbytes
+            self._evict()
+
+    def invalidate(self, path):
+        key = normalize_dir_key(path)
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """チューニング用の統計"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    # --- internal (ロック保持中に呼ぶ) ---
+
+    def _drop(self, key):
+        item = self._items.pop(key)
+        self._bytes -= item.nbytes
+
+    def _evict(self):
+        while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._items))
+            self._drop(key)
+            self.evictions += 1
+
+
+_shared_cache = None
+
+def shared_listing_cache():
+    """プロセス共有のキャッシュを返す"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ListingCache()
+    return _shared_cache
@@ -0,0 +1,155 @@
+import os
+import sys
+import threading
+import time
+
+# v12.13 ファイルシステムの分類（I/O ポリシーの選択に使う）
+FS_LOCAL = "local"
+FS_NETWORK = "network"
+FS_FUSE = "fuse"
+
+_NETWORK_FSTYPES = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "ncpfs", "afs", "9p", "ceph",
+                    "glusterfs", "lustre", "davfs", "coda", "remote"} # remote は Windows のネットワークドライブ
+# FUSE でもブロックデバイス上のもの（ntfs-3g など）はローカル扱い
+_LOCAL_FUSE_FSTYPES = {"fuseblk"}
+# v12.23 カーネルの疑似ファイルシステム（中身はファイルではないので、サイズの集計などで辿らない）
+VIRTUAL_FSTYPES = {"proc", "sysfs", "devtmpfs", "devpts", "cgroup", "cgroup2", "securityfs",
+                   "debugfs", "tracefs", "pstore", "bpf", "mqueue", "hugetlbfs", "configfs",
+                   "fusectl", "autofs", "binfmt_misc", "efivarfs", "nsfs", "rpc_pipefs"}
+
+
+def classify_fstype(fstype):
+    """マウントの種類名を FS_LOCAL / FS_NETWORK / FS_FUSE に分類する"""
+    if fstype in _NETWORK_FSTYPES:
+        return FS_NETWORK
+    if fstype.startswith("fuse") and fstype not in _LOCAL_FUSE_FSTYPES:
+        # fuse.sshfs, fuse.rclone など。sshfs はネットワークだが、遅さの扱いは同じ
+        return FS_FUSE
+    return FS_LOCAL
+
+
+class MountInfo:
+    """マウント1つ分の情報"""
+    __slots__ = ("mount_point", "fstype", "source")
+
+    def __init__(self, mount_point, fstype, source=""):
+        self.mount_point = mount_point
+        self.fstype = fstype
+        self.source = source
+
+    def __repr__(self):
+        return f"MountInfo({self.mount_point!r}, {self.fstype!r}, {self.source!r})"
+
+    @property
+    def fs_class(self):
+        return classify_fstype(self.fstype)
+
+
+def _unescape(field):
+    """mountinfo のパスは空白などが \\040 の形で8進エスケープされている"""
+    if "\\" not in field:
+        return field
+    out = []
+    i = 0
+    while i < len(field):
+        if field[i] == "\\" and field[i + 1:i + 4].isdigit():
+            out.append(chr(int(field[i + 1:i + 4], 8)))
+            i += 4
+        else:
+            out.append(field[i])
+            i += 1
+    return "".join(out)
+
+
+def _read_linux_mounts():
+    """/proc/self/mountinfo を読む（procfs なので遅いマウントがあってもブロックしない）"""
+    mounts = []
+    with open("/proc/self/mountinfo", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            # "36 35 98:0 /mnt1 /mnt2 rw,noatime master:1 - ext3 /dev/root rw,errors=continue"
+            left, sep, right = line.partition(" - ")
+            if not sep:
+                continue
+            fields = left.split()
+            rest = right.split()
+            if len(fields) < 5 or not rest:
+                continue
+            mounts.append(MountInfo(_unescape(fields[4]), rest[0], _unescape(rest[1]) if len(rest) > 1 else ""))
+    return mounts
+
+
+def _windows_mount_for(path):
+    """Windows はドライブ（UNC は \\\\server\\share）単位。種類は GetDriveTypeW で判定する"""
+    drive, _ = os.path.splitdrive(path)
+    root = drive + "\\" if drive else "\\"
+    if drive.startswith("\\\\"):
+        return MountInfo(root, "remote", drive)
+    fstype = "fixed"
+    try:
+        import ctypes
+        kind = ctypes.windll.kernel32.GetDriveTypeW(root)
+        fstype = {2: "removable", 3: "fixed", 4: "remote", 5: "cdrom", 6: "ramdisk"}.get(kind, "unknown")
+    except (ImportError, AttributeError, OSError):
+        pass
+    return MountInfo(root, fstype, drive)
+
+
+class MountTable:
+    """
+    v12.12 パスがどのマウントに属するかを返す。
+    判定は文字列の最長一致だけで行い、対象パスへのシステムコールは一切しない
+    （固まったネットワークドライブ上のパスでも即座に答えられる）。
+    マウント表は RELOAD_INTERVAL 秒ごとに読み直す。
+    """
+    RELOAD_INTERVAL = 10.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mounts = []
+        self._loaded_at = 0.0
+        self._windows = sys.platform.startswith("win")
+
+    def mount_for(self, path):
+        path = os.path.abspath(path)
+        if self._windows:
+            return _windows_mount_for(path)
+        best = None
+        for m in self._table():
+            mp = m.mount_point
+            if path == mp or path.startswith(mp if mp.endswith("/") else mp + "/"):
+                if best is None or len(mp) >= len(best.mount_point):
+                    best = m # 後から重ねてマウントされたものを優先
+        return best or MountInfo("/", "unknown")
+
+    def mounts(self):
+        return list(self._table())
+
+    def reload(self):
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def _table(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._loaded_at > self.RELOAD_INTERVAL:
+                try:
+                    self._mounts = _read_linux_mounts()
+                except OSError:
+                    self._mounts = []
+                self._loaded_at = now
+            return self._mounts
+
+
+_shared_table = None
+
+def shared_mount_table():
+    """プロセス共有のマウント表を返す"""
+    global _shared_table
+    if _shared_table is None:
+        _shared_table = MountTable()
+    return _shared_table
+
+
+def virtual_mount_points():
+    """v12.23 疑似ファイルシステムのマウントポイント（フォルダ以下の合計を数えるときに潜らない）"""
+    return {m.mount_point for m in shared_mount_table().mounts() if m.fstype in VIRTUAL_FSTYPES}
@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class SearchJob:
+    """1回分の検索。新しい入力が来たら cancelled が立ち、ワーカー側は途中で打ち切る"""
+    __slots__ = ("token", "text", "tasks", "cancelled")
+
+    def __init__(self, token, text, tasks):
+        self.token = token
+        self.text = text
+        self.tasks = tasks # [(key, ワーカーで呼ぶ関数)]
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class NameSearch(QObject):
+    """
+    v12.15 ペインの検索ボックス用。入力を DEBOUNCE_MS だけ待ってから、
+    各 Proxy の searchJob(text) が返す関数（一覧のスナップショットに対する照合）をワーカーで実行し、
+    結果を resultsReady(text, [(key, result)]) でまとめて返す。
+    入力が続いた場合、待機中・実行中の古い検索は捨てる（結果は届かない）。
+    照合関数は job を受け取り、job.cancelled が立ったら None を返して打ち切ってよい。
+    """
+    resultsReady = Signal(str, list)
+    _finished = Signal(object, list) # ワーカー -> GUI スレッド
+
+    DEBOUNCE_MS = 150
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._text = ""
+        self._tasks_factory = None
+        self._job = None
+        self._token = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._dispatch)
+        self._finished.connect(self._on_finished)
+
+    def request(self, text, tasks_factory):
+        """
+        text の検索を予約する。tasks_factory() は発火時に [(key, 照合関数)] を返す
+        （待っている間にビューが入れ替わっても、その時点のビューを対象にするため）
+        """
+        self.cancel()
+        self._text = text
+        self._tasks_factory = tasks_factory
+        self._timer.start(self.DEBOUNCE_MS)
+
+    def cancel(self):
+        """待機中・実行中の検索を捨てる"""
+        self._timer.stop()
+        self._tasks_factory = None
+        if self._job:
+            self._job.cancel()
+            self._job = None
+
+    def isPending(self):
+        return self._timer.isActive() or self._job is not None
+
+    # --- internal ---
+
+    def _dispatch(self):
+        if self._tasks_factory is None:
+            return
+        self._token += 1
+        self._job = SearchJob(self._token, self._text, self._tasks_factory())
+        self._tasks_factory = None
+        _search_pool().submit(self._run, self._job)
+
+    def _run(self, job):
+        results = []
+        for key, task in job.tasks:
+            if job.cancelled:
+                return
+            results.append((key, task(job)))
+        if job.cancelled:
+            return
+        try:
+            self._finished.emit(job, results)
+        except RuntimeError: # ペインが破棄済み
+            pass
+
+    def _on_finished(self, job, results):
+        if job is not self._job or job.cancelled:
+            return
+        self._job = None
+        self.resultsReady.emit(job.text, results)
+
+
+_pool = None
+
+def _search_pool():
+    """検索の照合は1本ずつで十分（古い検索はすぐ打ち切られる）"""
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cff-search")
+    return _pool
@@ -0,0 +1,436 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QCoreApplication, QObject, QTimer, Signal
+
+from models.change_coalescer import shared_change_coalescer
+from models.mounts import shared_mount_table, FS_LOCAL, VIRTUAL_FSTYPES
+from models.prefetcher import lower_thread_priority
+
+# 索引中に潜らない疑似ファイルシステム（"/" を索引対象にしても /proc などは辿らない）
+_PSEUDO_FSTYPES = VIRTUAL_FSTYPES | {"tmpfs"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS roots (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    gen INTEGER NOT NULL DEFAULT 0,
+    scanned_at REAL,
+    entries INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    parent TEXT NOT NULL,
+    name TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    root INTEGER NOT NULL,
+    gen INTEGER NOT NULL,
+    UNIQUE (parent, name)
+);
+"""
+
+# 名前の三つ組（trigram）の全文索引。entries を外部コンテンツにして、名前の分だけを持つ
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(name, content='entries', content_rowid='id', tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO names(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO names(names, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+_UPSERT = ("INSERT INTO entries (parent, name, is_dir, root, gen) VALUES (?, ?, ?, ?, ?) "
+           "ON CONFLICT (parent, name) DO UPDATE SET is_dir = excluded.is_dir, root = excluded.root, "
+           "gen = excluded.gen")
+
+
+def _subtree_range(path):
+    """path 配下の親パスが入る範囲 [lo, hi)（UNIQUE (parent, name) の索引で引ける）"""
+    prefix = path if path.endswith(os.sep) else path + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _like_escape(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _rank(folded, name, parent):
+    """一致の質で並べるキー: 名前と完全一致 < 前方一致 < 単語の頭 < 途中、次に短い名前"""
+    name_f = name.casefold()
+    pos = name_f.find(folded)
+    if name_f == folded:
+        grade = 0
+    elif pos == 0:
+        grade = 1
+    elif pos > 0 and not name_f[pos - 1].isalnum():
+        grade = 2
+    else:
+        grade = 3
+    return (grade, len(name), parent.casefold(), name_f)
+
+
+class PathIndex(QObject):
+    """
+    v12.17 指定したルート（既定はお気に入り）以下のパス名の永続索引（SQLite, path_index.db）。
+    名前は FTS5 の trigram で索引するので、数百万件でも部分一致をミリ秒で引ける
+    （trigram が使えない SQLite では LIKE の全件走査に落ちる）。RAM に持つのは
+    走査中のフォルダの積み残しと書き込み待ちの BATCH_SIZE 件だけで、件数に比例しない。
+
+    索引はワーカー（1本, 低優先度）で作る。ルートごとに世代を持ち、全走査で見つかった行に
+    新しい世代を付け、最後に古い世代の行を消す。以後は次の2つで追従する:
+      - 監視中のフォルダの変更（ChangeCoalescer.directoryChanged）: そのフォルダだけ読み直す
+      - REINDEX_INTERVAL ごとの全走査（監視していないフォルダの変更を拾う）
+    シンボリックリンクのフォルダ、疑似ファイルシステム、ルートと違うマウントのネットワーク/FUSE は辿らない。
+
+    検索は別のワーカーで行い、query(text) の番号付きで resultsReady(番号, [(パス, フォルダか)]) を返す。
+    空白区切りの語はすべて含むもの（AND）を探す。
+    """
+    indexProgress = Signal(str, int) # ルート, 索引した件数
+    indexFinished = Signal(str, int) # ルート, 索引の件数
+    resultsReady = Signal(int, list) # query() の番号, [(パス, フォルダか)]
+    _scanned = Signal(str, int, bool) # ワーカー -> GUI スレッド: ルート, 件数, 完了したか
+    _found = Signal(int, list)
+
+    DB_NAME = "path_index.db"
+    SETTINGS_NAME = "index_roots.json"
+    BATCH_SIZE = 5000
+    MAX_CANDIDATES = 5000
+    MAX_RESULTS = 200
+    REINDEX_INTERVAL = 6 * 3600
+    CHECK_INTERVAL_MS = 10 * 60 * 1000
+
+    def __init__(self, db_path, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self._roots = []            # 索引するルート（入れ子は外側だけ）
+        self._counts = {}           # ルート -> 索引の件数
+        self._stopped = False
+        self._query_token = 0
+        self._local = threading.local()
+        self._fts = self._create_schema()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cff-index",
+                                          initializer=lower_thread_priority)
+        self._reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cff-index-query")
+        self._scanned.connect(self._on_scanned)
+        self._found.connect(self._on_found)
+        shared_change_coalescer().directoryChanged.connect(self._on_directory_changed)
+        self._check_timer = QTimer(self)
+        self._check_timer.timeout.connect(self._reindex_stale)
+        self._check_timer.start(self.CHECK_INTERVAL_MS)
+
+    # --- ルート ---
+
+    def roots(self):
+        return list(self._roots)
+
+    def setRoots(self, paths):
+        """索引するルートを差し替える。外れたルートの行は消し、新しいルートと古いルートは走査する"""
+        roots = []
+        for p in sorted({os.path.abspath(p) for p in paths if p}, key=len):
+            if not any(p == r or p.startswith(r if r.endswith(os.sep) else r + os.sep) for r in roots):
+                roots.append(p)
+        if roots == self._roots:
+            return
+        self._roots = roots
+        self._writer.submit(self._sync_roots, list(roots))
+        self._reindex_stale()
+
+    def reindex(self, root=None):
+        """root（省略時はすべて）を今すぐ全走査する"""
+        for r in ([root] if root else self._roots):
+            self._writer.submit(self._scan_root, r)
+
+    def entryCount(self):
+        return sum(self._counts.get(r, 0) for r in self._roots)
+
+    def close(self):
+        """走査を打ち切り、ワーカーを止める（アプリ終了時）"""
+        self._stopped = True
+        self._check_timer.stop()
+        self._writer.shutdown(wait=False, cancel_futures=True)
+        self._reader.shutdown(wait=False, cancel_futures=True)
+
+    # --- 検索 ---
+
+    def query(self, text, limit=None):
+        """text の検索をワーカーに出し、番号を返す（結果は resultsReady で届く。古い検索は捨てる）"""
+        self._query_token += 1
+        token = self._query_token
+        if not self._stopped:
+            self._reader.submit(self._run_query, token, text, limit or self.MAX_RESULTS)
+        return token
+
+    def search(self, text, limit=None):
+        """text に一致するパスを一致の質の順で返す（呼んだスレッドで実行する）"""
+        terms = text.casefold().split()
+        if not terms:
+            return []
+        long_terms = [t for t in terms if len(t) >= 3]
+        params = []
+        if self._fts and long_terms:
+            sql = ("SELECT e.parent, e.name, e.is_dir FROM names JOIN entries e ON e.id = names.rowid "
+                   "WHERE names MATCH ?")
+            params.append(" AND ".join('"%s"' % t.replace('"', '""') for t in long_terms))
+            like_terms = [t for t in terms if len(t) < 3]
+            column = "e.name"
+        else:
+            sql = "SELECT parent, name, is_dir FROM entries WHERE 1"
+            like_terms = terms
+            column = "name"
+        for t in like_terms:
+            sql += f" AND {column} LIKE ? ESCAPE '\\'"
+            params.append(f"%{_like_escape(t)}%")
+        sql += " LIMIT ?"
+        params.append(self.MAX_CANDIDATES)
+        try:
+            rows = self._connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Path Index Query Error: {e}", file=sys.stderr)
+            return []
+        key = max(terms, key=len)
+        rows.sort(key=lambda r: _rank(key, r[1], r[0]))
+        return [(os.path.join(parent, name), bool(is_dir)) for parent, name, is_dir in rows[:limit or self.MAX_RESULTS]]
+
+    # --- internal ---
+
+    def _create_schema(self):
+        """表を用意し、trigram の全文索引が使えるかを返す"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+        except sqlite3.Error as e:
+            # 置き場所に書けない（読み取り専用のメディアなど）ときは一時フォルダに作る
+            print(f"Path Index Error ({self.db_path}): {e}", file=sys.stderr)
+            self.db_path = os.path.join(tempfile.gettempdir(), self.DB_NAME)
+            conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                return True
+            except sqlite3.OperationalError:
+                return False # SQLite 3.34 より前は trigram が無い
+        finally:
+            conn.close()
+
+    def _connection(self):
+        """スレッドごとの接続（書き込みと検索はそれぞれ1本のワーカーで行う）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-8000") # 8MB
+        return conn
+
+    def _root_of(self, path):
+        for r in self._roots:
+            if path == r or path.startswith(r if r.endswith(os.sep) else r + os.sep):
+                return r
+        return None
+
+    def _reindex_stale(self):
+        if not self._stopped:
+            self._writer.submit(self._scan_stale)
+
+    def _on_directory_changed(self, path):
+        if not self._stopped and self._root_of(path):
+            self._writer.submit(self._update_dir, path)
+
+    def _on_scanned(self, root, count, finished):
+        self._counts[root] = count
+        if finished:
+            self.indexFinished.emit(root, count)
+        else:
+            self.indexProgress.emit(root, count)
+
+    def _on_found(self, token, results):
+        if token == self._query_token:
+            self.resultsReady.emit(token, results)
+
+    def _notify(self, signal, *args):
+        try:
+            signal.emit(*args)
+        except RuntimeError: # アプリ終了時に既に破棄済みの場合
+            pass
+
+    def _run_query(self, token, text, limit):
+        if token != self._query_token:
+            return # 入力が続いている
+        self._notify(self._found, token, self.search(text, limit))
+
+    # --- ワーカー（書き込み） ---
+
+    def _sync_roots(self, roots):
+        conn = self._connection()
+        with conn:
+            known = dict(conn.execute("SELECT path, id FROM roots").fetchall())
+            for path, rid in known.items():
+                if path in roots:
+                    continue
+                outer = self._root_of(path)
+                if outer is not None and outer != path:
+                    # 新しい外側のルートに行を引き継ぐ（次の走査で世代が揃う）
+                    conn.execute("INSERT OR IGNORE INTO roots (path) VALUES (?)", (outer,))
+                    outer_id = conn.execute("SELECT id FROM roots WHERE path = ?", (outer,)).fetchone()[0]
+                    conn.execute("UPDATE entries SET root = ? WHERE root = ?", (outer_id, rid))
+                else:
+                    conn.execute("DELETE FROM entries WHERE root = ?", (rid,))
+                conn.execute("DELETE FROM roots WHERE id = ?", (rid,))
+            for path in roots:
+                conn.execute("INSERT OR IGNORE INTO roots (path) VALUES (?)", (path,))
+            counts = conn.execute("SELECT path, entries FROM roots").fetchall()
+        for path, count in counts:
+            self._notify(self._scanned, path, count, True)
+
+    def _scan_stale(self):
+        horizon = time.time() - self.REINDEX_INTERVAL
+        rows = self._connection().execute("SELECT path, scanned_at FROM roots").fetchall()
+        for path, scanned_at in rows:
+            if path in self._roots and (scanned_at is None or scanned_at < horizon):
+                self._writer.submit(self._scan_root, path)
+
+    def _skip_mounts(self, root):
+        """root の走査で潜らないマウントポイント"""
+        table = shared_mount_table()
+        root_mount = table.mount_for(root).mount_point
+        return {m.mount_point for m in table.mounts()
+                if m.mount_point != root_mount and (m.fs_class != FS_LOCAL or m.fstype in _PSEUDO_FSTYPES)}
+
+    def _walk(self, conn, start, rid, gen, skip, on_batch=None):
+        """start 配下を列挙して世代 gen で書き込む。書いた件数を返す（打ち切られたら None）"""
+        stack = [start]
+        batch = []
+        count = 0
+        while stack:
+            if self._stopped or self._root_of(start) is None:
+                conn.commit()
+                return None
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for e in it:
+                        try:
+                            is_dir = e.is_dir(follow_symlinks=False)
+                        except OSError:
+                            is_dir = False
+                        batch.append((directory, e.name, int(is_dir), rid, gen))
+                        if is_dir and e.path not in skip:
+                            stack.append(e.path)
+            except OSError:
+                pass # 権限が無い・途中で消えたフォルダは飛ばす
+            if len(batch) >= self.BATCH_SIZE:
+                conn.executemany(_UPSERT, batch)
+                conn.commit() # 索引中でも検索できるように書けた分から見せる
+                count += len(batch)
+                batch = []
+                if on_batch:
+                    on_batch(count)
+        if batch:
+            conn.executemany(_UPSERT, batch)
+            count += len(batch)
+        conn.commit()
+        return count
+
+    def _scan_root(self, root):
+        if self._stopped or root not in self._roots:
+            return
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO roots (path) VALUES (?)", (root,))
+            rid = conn.execute("SELECT id FROM roots WHERE path = ?", (root,)).fetchone()[0]
+            gen = conn.execute("SELECT COALESCE(MAX(gen), 0) + 1 FROM roots").fetchone()[0]
+        count = self._walk(conn, root, rid, gen, self._skip_mounts(root),
+                           lambda n: self._notify(self._scanned, root, n, False))
+        if count is None:
+            return # 打ち切り（古い世代の行は次の全走査で消える）
+        with conn:
+            conn.execute("DELETE FROM entries WHERE root = ? AND gen < ?", (rid, gen))
+            conn.execute("UPDATE roots SET gen = ?, scanned_at = ?, entries = ? WHERE id = ?",
+                         (gen, time.time(), count, rid))
+        self._notify(self._scanned, root, count, True)
+
+    def _delete_subtree(self, conn, path):
+        lo, hi = _subtree_range(path)
+        conn.execute("DELETE FROM entries WHERE parent = ? OR (parent >= ? AND parent < ?)", (path, lo, hi))
+
+    def _update_dir(self, path):
+        """監視中のフォルダが変わった: その直下だけを索引と突き合わせる"""
+        root = self._root_of(path)
+        if self._stopped or root is None:
+            return
+        conn = self._connection()
+        row = conn.execute("SELECT id, gen FROM roots WHERE path = ?", (root,)).fetchone()
+        if row is None:
+            return
+        rid, gen = row
+        try:
+            with os.scandir(path) as it:
+                current = {}
+                for e in it:
+                    try:
+                        current[e.name] = e.is_dir(follow_symlinks=False)
+                    except OSError:
+                        current[e.name] = False
+        except OSError:
+            return # フォルダ自体の削除は親フォルダの変更として届く
+        existing = {name: bool(is_dir) for name, is_dir in
+                    conn.execute("SELECT name, is_dir FROM entries WHERE parent = ?", (path,))}
+        added = []
+        with conn:
+            for name, is_dir in existing.items():
+                if current.get(name) != is_dir:
+                    conn.execute("DELETE FROM entries WHERE parent = ? AND name = ?", (path, name))
+                    if is_dir:
+                        self._delete_subtree(conn, os.path.join(path, name))
+            for name, is_dir in current.items():
+                if existing.get(name) != is_dir:
+                    added.append((path, name, int(is_dir), rid, gen))
+            conn.executemany(_UPSERT, added)
+        skip = None
+        for parent, name, is_dir, _, _ in added:
+            if is_dir:
+                # 移動してきたフォルダなどは中身ごと索引する
+                skip = skip if skip is not None else self._skip_mounts(root)
+                child = os.path.join(parent, name)
+                if child not in skip:
+                    self._walk(conn, child, rid, gen, skip)
+
+
+_shared_index = None
+
+def index_settings_dir():
+    """索引の DB と設定の置き場所（実行ファイル/アプリと同じ階層）"""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_index_roots():
+    """index_roots.json（パスのリスト）で指定されたルート。無ければ None（お気に入りを使う）"""
+    path = os.path.join(index_settings_dir(), PathIndex.SETTINGS_NAME)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            roots = json.load(f)
+        return [r for r in roots if isinstance(r, str)]
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Path Index Settings Error ({path}): {e}", file=sys.stderr)
+        return None
+
+
+def shared_path_index():
+    """プロセス共有のパス索引を返す"""
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = PathIndex(os.path.join(index_settings_dir(), PathIndex.DB_NAME))
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_shared_index.close)
+    return _shared_index
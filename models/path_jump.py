@@ -0,0 +1,82 @@
+import os
+
+from models.fuzzy import FuzzyMatcher
+from models.io_policy import shared_io_policy
+from models.listing_cache import shared_listing_cache
+from models.mounts import FS_LOCAL
+from models.stat_service import shared_stat_service
+
+_SEPARATORS = ("/", os.sep)
+
+
+def _child_dirs(path):
+    """
+    path の子フォルダ名。共有の一覧キャッシュにあればそれを使い、無ければ列挙する
+    （ネットワーク/FUSE 上はキャッシュにある分だけ。応答の遅いマウントで候補の照合を止めないため）
+    """
+    rows = shared_listing_cache().get(path, count_stats=False)
+    if rows is not None:
+        return [r[0] for r in rows if r[1]]
+    if shared_io_policy().mount_for(path).fs_class != FS_LOCAL:
+        return []
+    try:
+        with os.scandir(path) as it:
+            return [e.name for e in it if e.is_dir()]
+    except OSError:
+        return []
+
+
+def _resolve_segment(parent, segment):
+    """parent の子のうち segment そのもの、無ければ segment に最もよく一致する子フォルダ"""
+    exact = os.path.join(parent, segment)
+    if segment in (".", "..") or shared_stat_service().is_dir(exact):
+        return os.path.normpath(exact)
+    ranked = FuzzyMatcher(segment).rank(_child_dirs(parent), limit=1)
+    return os.path.join(parent, ranked[0][1]) if ranked else None
+
+
+def jump_candidates(text, favorites=(), base_dir=None, limit=50):
+    """
+    v12.18 アドレスバーの「移動先」候補を、あいまい照合（models/fuzzy.py）の点数の高い順に返す。
+    - 区切りを含む ("~/dv/prj"): 親の部分を1段ずつ、存在すればそのまま、無ければ最もよく一致する
+      子フォルダへ辿り、最後の語で子フォルダを照合する (~/dev/project など)。相対パスは base_dir から
+    - 区切りを含まない ("prj"): お気に入り（フォルダ名、だめならパス全体で照合）と base_dir の子フォルダ
+    """
+    text = os.path.expanduser(text.strip())
+    if not text:
+        return []
+    if any(sep in text for sep in _SEPARATORS):
+        head, _, last = text.replace(os.sep, "/").rpartition("/")
+        drive, head = os.path.splitdrive(head)
+        if os.path.isabs(text):
+            current = drive + os.sep
+        elif base_dir:
+            current = base_dir
+        else:
+            return []
+        for segment in head.split("/"):
+            if not segment:
+                continue
+            current = _resolve_segment(current, segment)
+            if current is None:
+                return []
+        if not last:
+            return [current]
+        ranked = FuzzyMatcher(last).rank(_child_dirs(current), limit=limit)
+        return [os.path.join(current, name) for _, name in ranked]
+
+    matcher = FuzzyMatcher(text)
+    scored = {}
+    for path in favorites:
+        score = matcher.score(os.path.basename(os.path.normpath(path)) or path)
+        if score is None:
+            score = matcher.score(path)
+            if score is not None:
+                score //= 2 # パスの途中での一致はフォルダ名での一致より下に
+        if score is not None:
+            scored[path] = score
+    if base_dir:
+        for score, name in matcher.rank(_child_dirs(base_dir), limit=limit):
+            scored.setdefault(os.path.join(base_dir, name), score)
+    ranked = sorted(scored.items(), key=lambda item: (-item[1], len(item[0])))
+    return [path for path, _ in ranked[:limit]]
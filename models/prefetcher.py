@@ -0,0 +1,116 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtCore import QObject, QTimer
+
+from models.dir_loader import make_row
+from models.listing_cache import shared_listing_cache, dir_signature
+
+
+def lower_thread_priority():
+    """裏方のスレッドの優先度を下げる（Linux ではスレッド単位で nice が効く）。先読み・索引用"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class _PrefetchJob:
+    __slots__ = ("path", "include_children", "with_stat", "cancelled")
+
+    def __init__(self, path, include_children, with_stat):
+        self.path = path
+        self.include_children = include_children
+        self.with_stat = with_stat
+        self.cancelled = False
+
+
+class DirectoryPrefetcher(QObject):
+    """
+    v12.5 カーソル（選択・ホバー）の下にあるフォルダを低優先度で先読みし、
+    共有の一覧キャッシュに入れておく。Miller Column では次に下流ペインへ
+    表示されるのはほぼ確実にこのフォルダなので、選択が確定した時点で即座に埋まる。
+    カーソルが別の行へ移ったら、走行中の先読みは中断する。
+    """
+    # マウスが行の上を素早く通過するたびに列挙しないための待ち時間
+    DELAY_MS = 80
+    # 子フォルダまで先読みする場合の上限
+    MAX_CHILDREN = 32
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache or shared_listing_cache()
+        self.enabled = True
+        self.include_children = False # True なら1階層下の子フォルダも先読み
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cff-prefetch",
+                                            initializer=lower_thread_priority)
+        self._job = None
+        self._next_path = None
+        self._next_with_stat = True
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._dispatch)
+
+    def request(self, path, with_stat=True):
+        """
+        path を先読み対象にする（以前の要求はキャンセル）。
+        with_stat は表示するモデルに合わせる（遅延statのモデル向けなら False）。
+        """
+        if not self.enabled:
+            return
+        if self._job and self._job.path == path and self._job.with_stat == with_stat and not self._job.cancelled:
+            return
+        self.cancel()
+        self._next_path = path
+        self._next_with_stat = with_stat
+        self._timer.start(self.DELAY_MS)
+
+    def cancel(self):
+        self._timer.stop()
+        self._next_path = None
+        if self._job:
+            self._job.cancelled = True
+            self._job = None
+
+    def _dispatch(self):
+        if not self._next_path:
+            return
+        self._job = _PrefetchJob(self._next_path, self.include_children, self._next_with_stat)
+        self._next_path = None
+        self._executor.submit(self._run, self._job)
+
+    def _run(self, job):
+        child_dirs = self._prefetch_dir(job, job.path)
+        if not job.include_children:
+            return
+        for child in child_dirs[:self.MAX_CHILDREN]:
+            if job.cancelled:
+                return
+            self._prefetch_dir(job, child)
+
+    def _prefetch_dir(self, job, path):
+        """1ディレクトリを列挙してキャッシュに入れ、子フォルダのパス一覧を返す"""
+        rows = self.cache.get(path, count_stats=False)
+        if rows is None:
+            rows = []
+            try:
+                signature = dir_signature(path)
+                with os.scandir(path) as it:
+                    for e in it:
+                        if job.cancelled:
+                            return []
+                        rows.append(make_row(e, job.with_stat))
+            except OSError:
+                return []
+            self.cache.put(path, rows, signature)
+        return [os.path.join(path, r[0]) for r in rows if r[1]]
+
+
+_shared_prefetcher = None
+
+def shared_prefetcher():
+    """プロセス共有の先読み器を返す"""
+    global _shared_prefetcher
+    if _shared_prefetcher is None:
+        _shared_prefetcher = DirectoryPrefetcher()
+    return _shared_prefetcher
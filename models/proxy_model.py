@@ -1,6 +1,20 @@
 import os
+from collections import OrderedDict
 from PySide6.QtWidgets import QFileSystemModel
-from PySide6.QtCore import Qt, QSortFilterProxyModel
+from PySide6.QtCore import Qt, QSortFilterProxyModel, QIdentityProxyModel, QTimer
+from PySide6.QtGui import QColor
+
+from models.folder_sizes import shared_folder_size_service
+from models.fuzzy import FuzzyMatcher
+from models.listing_cache import shared_listing_cache
+
+
+
+# マークされた行の背景色。落ち着いた深みのある赤 (ワインレッド系)
+MARKED_COLOR = QColor(80, 20, 20)
+# v12.25 マークの差分で出す dataChanged の区間数の上限（超えたら最初から最後の行までを1回で出す）
+MAX_MARK_RANGES = 64
+
 
 class SmartSortFilterProxyModel(QSortFilterProxyModel):
     """
@@ -11,19 +25,64 @@ class SmartSortFilterProxyModel(QSortFilterProxyModel):
         super().__init__(parent)
         self.setDynamicSortFilter(True)
         self.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        # 階層構造におけるフィルタリングを正しく行うため
-        self.setRecursiveFilteringEnabled(True)
+        # v12.20 Qt の再帰フィルタは読み込み済みの全ノード（これまでに開いた全フォルダ）を辿るので使わない。
+        # 判定はターゲット以下 _max_depth 段までに限り、それ以外はターゲットへの道筋だけを残す
+        self.setRecursiveFilteringEnabled(False)
         # 0: All, 1: Dirs Only, 2: Files Only
         self._display_mode = 0
         self._show_hidden = False
         self._search_text = ""
+        self._target_root = ""
         self._target_root_path = ""
         self._marked_paths_ref = None # set() の外部参照
+        # v12.24 マークされた行（ソースの内部ID）。マークか一覧が変わったら None にし、次の描画で解決し直す
+        self._marked_ids = None
+        # v12.15 ワーカーで照合済みの検索結果: (一致した名前, 照合した名前, ルートの内部ID)
+        self._search_match = None
+        # v12.16 クエリ -> searchJob() の結果（検索ボックスを空にするまで覚えておく）
+        self._search_cache = OrderedDict()
+        # v12.18 あいまい照合。結果の一致は 名前 -> 点数 になり、ターゲット直下は点数順に並ぶ
+        self._fuzzy = False
+        self._search_matcher = None
+        # v12.20 検索でターゲットの何段下まで見るか（0 = 直下だけ、None = 読み込み済みの全子孫）
+        self._max_depth = 0
+        self._scope = None # (ターゲットの内部ID, ターゲットとその祖先の内部IDの集合)
+        # v12.23 フォルダのサイズ列（None = 表示しない）。サイズ順の並べ直しは届いた合計をまとめて行う
+        self._folder_sizes = None
+        self._resort_timer = QTimer(self)
+        self._resort_timer.setSingleShot(True)
+        self._resort_timer.setInterval(self.RESORT_DELAY_MS)
+        self._resort_timer.timeout.connect(self.invalidate)
+
+    MAX_SEARCH_CACHE = 32
+    RESORT_DELAY_MS = 300
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.rowsAboutToBeRemoved.connect(self._on_source_rows_removed)
+        model.rowsInserted.connect(self._on_source_rows_inserted)
+        model.modelReset.connect(self._reset_scope)
 
     def setTargetRootPath(self, path):
-        self._target_root_path = os.path.abspath(path).lower()
+        self._target_root = os.path.abspath(path)
+        self._target_root_path = self._target_root.lower()
+        self._search_cache.clear()
+        self._scope = None
+        self._marked_ids = None
+        self.invalidateFilter()
+
+    def setSearchDepth(self, depth):
+        """v12.20 検索でターゲットの何段下まで見るか（0 = 直下だけ、None = 制限なし）"""
+        if depth == self._max_depth:
+            return
+        self._max_depth = depth
+        self._search_cache.clear()
+        self._marked_ids = None
         self.invalidateFilter()
 
+    def searchDepth(self):
+        return self._max_depth
+
     def setDisplayMode(self, mode):
         self._display_mode = mode
         self.invalidateFilter()
@@ -32,110 +91,520 @@ class SmartSortFilterProxyModel(QSortFilterProxyModel):
         self._show_hidden = show
         self.invalidateFilter()
         
+    def setFuzzyMatching(self, enabled):
+        """v12.18 検索をあいまい照合（点数順の表示）にするか"""
+        if enabled == self._fuzzy:
+            return
+        self._fuzzy = enabled
+        self._search_cache.clear()
+        self.setSearchText(self._search_text)
+
     def setSearchText(self, text):
+        """
+        行ごとに名前で照合して絞り込む（一覧は読まない）。ワーカーでの照合（searchJob）は
+        NameSearch からだけ行い、ここはその結果を待てない・得られないときの代わり
+        """
+        cached = self.cachedSearchResult(text) if text else None
+        if cached is not None:
+            self.applySearchResult(cached)
+            return
+        if not text:
+            # 検索が終わったら覚えた結果は捨てる（次の検索では一覧を取り直す）
+            self._search_cache.clear()
+        was_ranked = self._search_matcher is not None
         self._search_text = text.lower()
-        # 標準のフィルタ機能を使って再帰検索を有効にする
-        self.setFilterFixedString(text)
-        self.invalidateFilter()
+        self._search_match = None
+        # v12.18 あいまい照合は行ごとに採点して点数順に並べる
+        self._search_matcher = FuzzyMatcher(text) if text and self._fuzzy else None
+        if was_ranked or self._search_matcher is not None:
+            self.invalidate() # 点数順からキーの順へ戻す
+        else:
+            self.invalidateFilter()
+
+    def searchJob(self, text):
+        """
+        v12.15 ターゲットのフォルダの一覧（共有キャッシュ、無ければ列挙）に対して
+        text をワーカーで照合する関数を返す（NameSearch 用）
+        """
+        path = self._target_root
+        folded = text.casefold()
+        cached = self._search_cache.get(folded)
+        if cached is not None:
+            return lambda job: cached
+        matcher = FuzzyMatcher(folded) if self._fuzzy else None
+
+        def match(names, job):
+            if matcher is not None:
+                names = list(names)
+                scores = matcher.match_many(names, job=job)
+                return None if scores is None else {names[i]: s for i, s in scores.items()}
+            return frozenset(n for n in names if folded in n.casefold())
+
+        base = self._narrowing_base(folded)
+        if base is not None:
+            # v12.16 前のクエリを含むクエリの結果は、前の結果の部分集合（一覧は読み直さない）
+            _, base_matched, listed = base
+            return lambda job: (folded, match(base_matched, job), listed)
+
+        def run(job):
+            rows = shared_listing_cache().get(path, count_stats=False)
+            if rows is not None:
+                names = [r[0] for r in rows]
+            else:
+                names = []
+                try:
+                    with os.scandir(path) as it:
+                        for e in it:
+                            if job.cancelled:
+                                return None
+                            names.append(e.name)
+                except OSError:
+                    return None
+            matched = match(names, job)
+            if matched is None or job.cancelled:
+                return None
+            return (folded, matched, frozenset(names))
+        return run
+
+    def cachedSearchResult(self, text):
+        """v12.16 text の照合結果を覚えていれば返す（無ければ None）"""
+        return self._search_cache.get(text.casefold())
+
+    def _narrowing_base(self, folded):
+        """folded を含む前のクエリのうち、一致が最も少ない結果"""
+        best = None
+        for text, result in self._search_cache.items():
+            if text in folded and (best is None or len(result[1]) < len(best[1])):
+                best = result
+        return best
+
+    def applySearchResult(self, result):
+        """
+        searchJob() の結果を1回で反映する。ターゲット直下の行は結果の集合で判定する
+        （それより下の行は名前で照合する）
+        """
+        if result is None or result[1] is None:
+            return
+        text, matched, listed = result
+        self._search_cache[text] = result
+        self._search_cache.move_to_end(text)
+        while len(self._search_cache) > self.MAX_SEARCH_CACHE:
+            self._search_cache.popitem(last=False)
+        self._search_text = text.lower()
+        self._search_match = (matched, listed)
+        was_ranked = self._search_matcher is not None
+        self._search_matcher = FuzzyMatcher(text) if isinstance(matched, dict) else None
+        if self._search_matcher is not None or was_ranked:
+            self.invalidate() # v12.18 点数順に並べ直す
+        else:
+            self.invalidateFilter()
         
     def setMarkedPathsRef(self, marked_set):
         """マークされたパスのセット（外部参照）を設定"""
         self._marked_paths_ref = marked_set
+        self._marked_ids = None
+
+    def invalidateMarks(self):
+        """v12.24 マークの集合が変わった: 次の描画でマークされた行を解決し直す"""
+        self._marked_ids = None
+
+    def updateMarks(self, changed):
+        """
+        v12.25 マークを付け外ししたパス（フォルダ -> [パス]）のうち、このビューに出ている行だけ
+        解決済みの内部IDを直し、その行の dataChanged を出す
+        """
+        model = self.sourceModel()
+        root = self._target_root
+        if not root or not isinstance(model, QFileSystemModel):
+            return
+        prefix = root.rstrip(os.sep) + os.sep
+        ids = self._marked_ids
+        marked = self._marked_paths_ref or ()
+        last_col = self.columnCount() - 1
+        for folder, paths in changed.items():
+            if folder != root and (self._max_depth == 0 or not folder.startswith(prefix)):
+                continue
+            parent = None
+            rows = []
+            for path, idx in self._source_indexes(model, folder, paths):
+                if ids is not None:
+                    if path in marked:
+                        ids.add(idx.internalId())
+                    else:
+                        ids.discard(idx.internalId())
+                proxy_idx = self.mapFromSource(idx)
+                if proxy_idx.isValid():
+                    parent = proxy_idx.parent()
+                    rows.append(proxy_idx.row())
+            if not rows:
+                continue
+            rows.sort()
+            ranges = []
+            for r in rows:
+                if ranges and ranges[-1][1] >= r - 1:
+                    ranges[-1][1] = r
+                else:
+                    ranges.append([r, r])
+            if len(ranges) > MAX_MARK_RANGES:
+                ranges = [[rows[0], rows[-1]]]
+            for first, last in ranges:
+                self.dataChanged.emit(self.index(first, 0, parent), self.index(last, last_col, parent),
+                                      [Qt.BackgroundRole])
+
+    def _source_indexes(self, model, folder, paths):
+        """
+        v12.25 フォルダ内のパスの (パス, ソースの Index)。件数が多ければパスごとに model.index() で
+        分解せず、フォルダの子を1回なめて名前で引く
+        """
+        if len(paths) <= MAX_MARK_RANGES:
+            for path in paths:
+                idx = model.index(path)
+                if idx.isValid():
+                    yield path, idx
+            return
+        parent = model.index(folder)
+        if not parent.isValid():
+            return
+        wanted = {os.path.basename(p): p for p in paths}
+        for row in range(model.rowCount(parent)):
+            idx = model.index(row, 0, parent)
+            path = wanted.get(model.fileName(idx))
+            if path is not None:
+                yield path, idx
+
+    def _resolve_marked_ids(self):
+        """
+        v12.24 マークされたパスのうち、このビューに出る行（ターゲット直下、検索で深く見るなら
+        ターゲット以下）のソースの内部IDの集合。描画ではこの集合を引くだけにする
+        """
+        model = self.sourceModel()
+        ids = set()
+        root = self._target_root
+        if not root or not self._marked_paths_ref or not isinstance(model, QFileSystemModel):
+            return ids
+        prefix = root.rstrip(os.sep) + os.sep
+        by_folder = {}
+        for path in self._marked_paths_ref:
+            if path.startswith(prefix):
+                by_folder.setdefault(os.path.dirname(path), []).append(path)
+        for folder, paths in by_folder.items():
+            if self._max_depth == 0 and folder != root:
+                continue
+            ids.update(idx.internalId() for _, idx in self._source_indexes(model, folder, paths))
+        return ids
+
+    def setFolderSizes(self, enabled):
+        """v12.23 Size 列にフォルダ以下の合計（サイズ・項目数）を出し、サイズ順の並びにも使う"""
+        if enabled == (self._folder_sizes is not None):
+            return
+        if enabled:
+            self._folder_sizes = shared_folder_size_service()
+            self._folder_sizes.sizeReady.connect(self._on_folder_size)
+        else:
+            self._folder_sizes.sizeReady.disconnect(self._on_folder_size)
+            self._folder_sizes = None
+        if self.sortColumn() == 1:
+            self.invalidate()
+
+    def proxyIndexForPath(self, path):
+        """パスに対応するProxyインデックスを返す（ビューのルート設定用）"""
+        return self.mapFromSource(self.sourceModel().index(path))
 
     def data(self, index, role=Qt.DisplayRole):
         """見た目のカスタマイズ（マークされた行に色をつける）"""
         if role == Qt.BackgroundRole and self._marked_paths_ref:
-            # カラムに関わらず、行全体のパスを確認
-            col0_idx = index.siblingAtColumn(0)
-            source_idx = self.mapToSource(col0_idx)
+            # v12.24 行のパスは作らず、解決済みの内部IDを引く（内部IDは列に関わらず行で同じ）
+            ids = self._marked_ids
+            if ids is None:
+                ids = self._marked_ids = self._resolve_marked_ids()
+            if ids and self.mapToSource(index).internalId() in ids:
+                return MARKED_COLOR
+        if role == Qt.DisplayRole and index.column() == 1 and self._folder_sizes is not None:
             model = self.sourceModel()
-            if hasattr(model, 'filePath'):
-                path = os.path.abspath(model.filePath(source_idx))
-                if path in self._marked_paths_ref:
-                    # 落ち着いた深みのある赤 (ワインレッド系)
-                    from PySide6.QtGui import QColor
-                    return QColor(80, 20, 20)
-        
+            source_idx = self.mapToSource(index)
+            if model.isDir(source_idx):
+                return self._folder_sizes.displayText(model.filePath(source_idx))
+
         return super().data(index, role)
 
+    def _folder_bytes(self, path):
+        """v12.23 並べ替え用のフォルダの合計（まだ無ければ -1）"""
+        entry = self._folder_sizes.cache().get(path)
+        return -1 if entry is None else entry.bytes
+
+    def _on_folder_size(self, path):
+        """v12.23 ターゲット直下のフォルダの合計が届いた: その行を描き直し、サイズ順なら並べ直す"""
+        if os.path.normcase(os.path.dirname(os.path.abspath(path))) != os.path.normcase(self._target_root):
+            return
+        idx = self.mapFromSource(self.sourceModel().index(path, 1))
+        if not idx.isValid():
+            return
+        self.dataChanged.emit(idx, idx, [Qt.DisplayRole])
+        if self.sortColumn() == 1 and not self._resort_timer.isActive():
+            self._resort_timer.start()
+
+    # v12.20 _row_depth() の戻り値: ターゲットの範囲外 / ターゲットへの道筋（ターゲットとその祖先）
+    _OUT_OF_SCOPE = -2
+    _ON_PATH = -1
+
+    def _reset_scope(self, *args):
+        self._scope = None
+        self._marked_ids = None
+
+    def _on_source_rows_removed(self, parent, first, last):
+        # ターゲットやその祖先のノードが消えると内部IDが変わるので、次の判定で取り直す
+        self._on_source_rows_inserted(parent, first, last)
+        if self._scope is not None and parent.internalId() in self._scope[1]:
+            self._scope = None
+
+    def _on_source_rows_inserted(self, parent, first, last):
+        # v12.24 表示に出る行が増減した（消えたノードの内部IDは使い回されうる）: マークを解決し直す
+        if self._marked_ids is not None and (self._max_depth != 0 or parent.internalId() == self._scope_ids()[0]):
+            self._marked_ids = None
+
+    def _scope_ids(self):
+        if self._scope is None:
+            idx = self.sourceModel().index(self._target_root)
+            root_id = idx.internalId() if idx.isValid() else None
+            path_ids = set()
+            while idx.isValid():
+                path_ids.add(idx.internalId())
+                idx = idx.parent()
+            self._scope = (root_id, path_ids)
+        return self._scope
+
+    def _row_depth(self, source_row, source_parent):
+        """
+        v12.20 行がターゲットの何段下にあるか（直下 = 0）。親を _max_depth + 1 段まで辿るだけで決め、
+        範囲外なら _OUT_OF_SCOPE、ターゲットかその祖先なら _ON_PATH を返す
+        """
+        if not self._target_root:
+            return 0 # ターゲットが無い（ナビゲーションのツリー）: 全体が範囲
+        root_id, path_ids = self._scope_ids()
+        parent = source_parent
+        depth = 0
+        while parent.isValid():
+            parent_id = parent.internalId()
+            if parent_id == root_id:
+                return depth
+            if parent_id in path_ids:
+                break # 親がターゲットの祖先: 行は道筋上か、その兄弟
+            if self._max_depth is not None and depth >= self._max_depth:
+                return self._OUT_OF_SCOPE # 深すぎるか、ターゲットと無関係な枝
+            parent = parent.parent()
+            depth += 1
+        else:
+            if not path_ids:
+                return self._OUT_OF_SCOPE
+        row_id = self.sourceModel().index(source_row, 0, source_parent).internalId()
+        return self._ON_PATH if row_id in path_ids else self._OUT_OF_SCOPE
+
     def filterAcceptsRow(self, source_row, source_parent):
         """行を表示するかどうかの判定"""
-        # 親クラスの判定（標準の検索フィルタ + Recursive）をまず確認
-        if self._search_text:
-            if not super().filterAcceptsRow(source_row, source_parent):
-                return False
+        depth = self._row_depth(source_row, source_parent)
+        if depth == self._OUT_OF_SCOPE:
+            return False # 判定するまでもなく隠す
+        if depth == self._ON_PATH:
+            return True # ターゲットへの道筋は、検索・隠しファイル・モードに関わらず残す（ルートロスト防止）
+        return self._accepts(source_row, source_parent, depth)
+
+    def _name_hits(self, name):
+        if self._search_matcher is not None:
+            return self._search_matcher.matches(name)
+        return self._search_text in name.lower()
+
+    def _search_accepts(self, idx, depth):
+        """
+        v12.20 検索に一致するか。v12.15 の照合結果があればターゲット直下は集合で判定し、
+        一致しないフォルダでも _max_depth 段までの読み込み済みの子孫に一致があれば残す
+        """
+        model = self.sourceModel()
+        name = model.fileName(idx)
+        if self._search_match is not None and depth == 0:
+            matched, listed = self._search_match
+            hit = (name in matched) if name in listed else self._name_hits(name) # 照合後に増えたファイル
+        else:
+            hit = self._name_hits(name)
+        if hit:
+            return True
+        if self._max_depth is not None and depth >= self._max_depth:
+            return False
+        return any(self._accepts(row, idx, depth + 1) for row in range(model.rowCount(idx)))
+
+    def _accepts(self, source_row, source_parent, depth):
+        """範囲内（ターゲットの depth 段下）の行の判定"""
+        model = self.sourceModel()
+        idx = model.index(source_row, 0, source_parent)
+
+        if self._search_text and not self._search_accepts(idx, depth):
+            return False
         
         # ここから先は「検索にはヒットしている（またはヒットする子を持つ）」要素に対する
         # 追加のフィルタリング（Dotファイル隠し、モード別表示）
         
-        model = self.sourceModel()
-        idx = model.index(source_row, 0, source_parent)
-        
         if isinstance(model, QFileSystemModel):
             file_info = model.fileInfo(idx)
             name = file_info.fileName()
 
-            # 最適化 v9.1: 重い絶対パス取得とlower()は必要な時まで遅延させる
-
             # ドットファイルの処理 (.始まりかつ . と .. を除く)
-            # これは名前だけで判定できるので先にやる
             if name.startswith('.') and name not in ['.', '..']:
                 if not self._show_hidden:
                     return False
             
-            # 以下、パス比較が必要な場合の処理
-            # ターゲットルート維持確認は、表示除外されそうな時だけで良い。
-            
-            is_dir = file_info.isDir()
-            
             # モードによる弾き判定
-            should_hide_by_mode = False
+            # v12.20 ターゲットへの道筋は filterAcceptsRow で先に残すので、ここではパスを見なくてよい
             if self._display_mode == 1: # Dirs Only
-                if not is_dir: should_hide_by_mode = True
-            elif self._display_mode == 2: # Files Only
-                if is_dir: should_hide_by_mode = True
-
-            # 「隠さなくて良い」なら、重いパスチェックをするまでもなく True
-            if not should_hide_by_mode:
-                return True
-
-            # ここに来る = モード的には隠すべきアイテム（FilesOnlyモードでのフォルダなど）
-            # しかし、それがターゲットルートへの道筋なら表示する必要がある。ここで初めてパスを取得する。
-            if self._target_root_path:
-                file_path = file_info.absoluteFilePath().lower()
-                
-                # ターゲット自体
-                if file_path == self._target_root_path:
-                    return True
-                # ターゲットの親ディレクトリ群
-                if self._target_root_path.startswith(file_path + os.sep) or \
-                   (file_path.endswith(os.sep) and self._target_root_path.startswith(file_path)):
-                     return True
-
-            # 救済されなかったので隠す
-            return False
+                return file_info.isDir()
+            if self._display_mode == 2: # Files Only
+                return not file_info.isDir()
                 
-        return True # super()を通過し、ここまでの条件もクリアしたら表示
+        return True # ここまでの条件をクリアしたら表示
 
     def lessThan(self, left, right):
         """ソートロジックの強化"""
         model = self.sourceModel()
+        if self._search_matcher is not None and isinstance(model, QFileSystemModel):
+            # v12.18 あいまい照合中はターゲット直下を点数の高い順に（昇順/降順に関わらず）
+            scores = self._search_match[0] if self._search_match is not None else {}
+            left_score = scores.get(model.fileName(left))
+            right_score = scores.get(model.fileName(right))
+            if left_score is None:
+                left_score = self._search_matcher.score(model.fileName(left))
+            if right_score is None:
+                right_score = self._search_matcher.score(model.fileName(right))
+            if left_score != right_score and left_score is not None and right_score is not None:
+                return (left_score > right_score) == (self.sortOrder() == Qt.AscendingOrder)
         if isinstance(model, QFileSystemModel):
             left_info = model.fileInfo(left)
             right_info = model.fileInfo(right)
             
             # フォルダは常に上位に来るようにする (Explorerライク)
-            if left_info.isDir() and not right_info.isDir():
-                return self.sortOrder() == Qt.AscendingOrder
-            if not left_info.isDir() and right_info.isDir():
-                return self.sortOrder() != Qt.AscendingOrder
+            # v12.8 isDir() は1回ずつだけ呼ぶ
+            left_dir = left_info.isDir()
+            if left_dir != right_info.isDir():
+                return left_dir == (self.sortOrder() == Qt.AscendingOrder)
                 
             col = left.column()
             # 3: Date
             if col == 3:
                 return left_info.lastModified() < right_info.lastModified()
-            # 1: Size
+            # 1: Size（v12.23 フォルダは合計の分かっているものをその大きさで）
             if col == 1:
+                if left_dir and self._folder_sizes is not None:
+                    return self._folder_bytes(left_info.filePath()) < self._folder_bytes(right_info.filePath())
                 return left_info.size() < right_info.size()
                 
         return super().lessThan(left, right)
+
+
+class FlatProxyModel(QIdentityProxyModel):
+    """
+    v12.8 FlatDirectoryModel 用の薄い Proxy。
+    並び替え・絞り込みはモデル側が事前計算したキーで行うため、ここでは
+    SmartSortFilterProxyModel と同じ設定APIをモデルへ中継し、マーク色だけを付ける。
+    （Python の lessThan/filterAcceptsRow を持つ Proxy では、10万件のソートに
+    数十秒かかる。行数 x log(行数) 回の仮想関数呼び出しが Python を経由するため）
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._marked_paths_ref = None
+        # v12.24 EntryStore の行番号ごとのマーク (bytearray) と、解決したときのストアの番号
+        self._marked_rows = None
+        self._marked_epoch = -1
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.rowsInserted.connect(self.invalidateMarks)
+        model.modelReset.connect(self.invalidateMarks)
+
+    def setTargetRootPath(self, path):
+        pass # フラットモデルのルートが常にターゲット
+
+    def setSearchDepth(self, depth):
+        pass # v12.20 フラットモデルはターゲット直下しか持たない
+
+    def setDisplayMode(self, mode):
+        self.sourceModel().setDisplayMode(mode)
+
+    def setShowHidden(self, show):
+        self.sourceModel().setShowHidden(show)
+
+    def setSearchText(self, text):
+        self.sourceModel().setNameFilter(text)
+
+    def setFuzzyMatching(self, enabled):
+        self.sourceModel().setFuzzyMatching(enabled)
+
+    def searchJob(self, text):
+        """v12.15 NameSearch 用（照合はモデルのスナップショットに対して行う）"""
+        return self.sourceModel().nameFilterJob(text)
+
+    def applySearchResult(self, result):
+        self.sourceModel().applyNameMatch(result)
+
+    def cachedSearchResult(self, text):
+        return self.sourceModel().cachedNameMatch(text)
+
+    def setMarkedPathsRef(self, marked_set):
+        self._marked_paths_ref = marked_set
+        self._marked_rows = None
+
+    def invalidateMarks(self, *args):
+        """v12.24 マークの集合か一覧が変わった: 次の描画でマークされた行を解決し直す"""
+        self._marked_rows = None
+
+    def updateMarks(self, changed):
+        """v12.25 ルート直下でマークを付け外ししたパスだけ、ビット列を直してその行の dataChanged を出す"""
+        model = self.sourceModel()
+        paths = changed.get(model.rootPath())
+        if not paths:
+            return
+        store = model.entryStore()
+        marked = self._marked_rows
+        if marked is not None and self._marked_epoch != model.storeEpoch():
+            marked = self._marked_rows = None # 次の描画で作り直す
+        store_rows = []
+        for path in paths:
+            i = store.row_of(os.path.basename(path))
+            if i is None:
+                continue
+            store_rows.append(i)
+            if marked is not None and i < len(marked):
+                marked[i] = path in self._marked_paths_ref
+        model.emitStoreRowsChanged(store_rows, [Qt.BackgroundRole], MAX_MARK_RANGES)
+
+    def _resolve_marked_rows(self):
+        """v12.24 ルート直下のマークされたパスを、名前 -> ストア行番号の辞書でビット列にする"""
+        model = self.sourceModel()
+        store = model.entryStore()
+        marked = bytearray(len(store.names))
+        root = model.rootPath()
+        for path in self._marked_paths_ref:
+            folder, name = os.path.split(path)
+            if folder == root:
+                i = store.row_of(name)
+                if i is not None:
+                    marked[i] = 1
+        self._marked_epoch = model.storeEpoch()
+        return marked
+
+    def setFolderSizes(self, enabled):
+        self.sourceModel().setFolderSizes(enabled) # v12.23
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
+
+    def proxyIndexForPath(self, path):
+        return self.mapFromSource(self.sourceModel().index_for_path(path))
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.BackgroundRole and self._marked_paths_ref:
+            # v12.24 行のパスは作らず、ストア行番号でビット列を引く
+            model = self.sourceModel()
+            marked = self._marked_rows
+            if marked is None or self._marked_epoch != model.storeEpoch():
+                marked = self._marked_rows = self._resolve_marked_rows()
+            i = model.storeRow(index.row())
+            if i < len(marked) and marked[i]:
+                return MARKED_COLOR
+        return super().data(index, role)
@@ -0,0 +1,154 @@
+import re
+
+from models.entry_store import FLAG_DIR
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def natural_key(name):
+    """自然順 ("file2" < "file10") のキー。大文字小文字は区別せず、最後に元の名前で一意にする"""
+    parts = _DIGITS.split(name.casefold())
+    parts[1::2] = map(int, parts[1::2])
+    return (tuple(parts), name)
+
+
+def casefold_key(name):
+    """大文字小文字を区別しない名前キー（NUL はファイル名に現れないので区切りに使う）"""
+    return name.casefold() + "\0" + name
+
+
+class SortKeys:
+    """
+    v12.8 EntryStore の各エントリのソートキーを保持し、行番号の並びを作る。
+    名前キー（casefold または自然順）は1エントリにつき1回だけ計算してリストに持つ。
+    並び替えは「名前キーで argsort → フォルダ/ファイルに安定分割 → 必要なら数値列で安定ソート」
+    の数パスで、比較はすべて C 側（list.__getitem__ / array.__getitem__ をキーに使う）で行われる。
+
+    並び順の定義: フォルダが常に先頭。同じ種別の中では (列の値, 名前キー) の昇順/降順。
+    名前キーは一意なので、並びは全順序になり二分探索で位置を求められる。
+
+    v12.23 dir_sizes（名前 -> フォルダ以下の合計、None なら使わない）があれば、Size 列では
+    フォルダもその大きさで並べる（まだ分からないものは -1）。値を変えるときはモデルが
+    行の位置を付け直す（_update_rows）ので、キャッシュを直接は見ない。
+    """
+    __slots__ = ("store", "column", "descending", "natural", "dir_sizes", "_names")
+
+    def __init__(self, store, natural=True):
+        self.store = store
+        self.column = 0
+        self.descending = False
+        self.natural = natural
+        self.dir_sizes = None
+        self._names = []
+
+    def attach(self, store):
+        """別のストア（新しいディレクトリ）に付け替える。設定は引き継ぐ"""
+        self.store = store
+        self._names = []
+        if self.dir_sizes is not None:
+            self.dir_sizes = {}
+
+    def set_natural(self, natural):
+        if natural != self.natural:
+            self.natural = natural
+            self._names = []
+
+    # --- 名前キー ---
+
+    def sync(self):
+        """ストアに追加された行の名前キーを計算する"""
+        names = self.store.names
+        n = len(self._names)
+        if n < len(names):
+            func = natural_key if self.natural else casefold_key
+            self._names.extend(map(func, names[n:]))
+
+    def invalidate(self, row):
+        """リネームされた行の名前キーを作り直す"""
+        self.sync()
+        func = natural_key if self.natural else casefold_key
+        self._names[row] = func(self.store.names[row])
+
+    def remap(self, kept):
+        """ストアの詰め直し後に呼ぶ（kept[新行番号] = 旧行番号）"""
+        self._names = [self._names[i] for i in kept]
+
+    # --- 並び替え ---
+
+    def key(self, row):
+        """1行分の比較キー (種別, 列の値, 名前キー)"""
+        store = self.store
+        is_dir = store.flags[row] & FLAG_DIR
+        col = self.column
+        if col == 1:
+            if is_dir:
+                primary = 0 if self.dir_sizes is None else self.dir_sizes.get(store.names[row], -1)
+            else:
+                primary = store.sizes[row]
+        elif col == 2:
+            primary = "" if is_dir else store.type_name(row).casefold()
+        elif col == 3:
+            primary = store.mtimes[row]
+        else:
+            primary = 0
+        return (0 if is_dir else 1, primary, self._names[row])
+
+    def precedes(self, a, b):
+        """比較キー a の行が b の行より前に並ぶか"""
+        if a[0] != b[0]:
+            return a[0] < b[0]
+        return a[1:] > b[1:] if self.descending else a[1:] < b[1:]
+
+    def bisect(self, order, row):
+        """並び済みの行番号リスト order に row を挿入すべき位置"""
+        self.sync()
+        k = self.key(row)
+        key = self.key
+        precedes = self.precedes
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if precedes(key(order[mid]), k):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def sorted_rows(self, rows):
+        """行番号の集まりを現在の設定で並べたリストを返す"""
+        self.sync()
+        store = self.store
+        flags = store.flags
+        desc = self.descending
+        ordered = sorted(rows, key=self._names.__getitem__, reverse=desc)
+        dirs = [i for i in ordered if flags[i] & FLAG_DIR]
+        files = [i for i in ordered if not flags[i] & FLAG_DIR]
+
+        col = self.column
+        if col == 1:
+            if self.dir_sizes is not None:
+                names, sizes = store.names, self.dir_sizes
+                dirs.sort(key=lambda i: sizes.get(names[i], -1), reverse=desc)
+            files.sort(key=store.sizes.__getitem__, reverse=desc)
+        elif col == 2:
+            type_keys = [t.casefold() for t in store.type_table()]
+            ext_ids = store.ext_ids
+            files.sort(key=lambda i: type_keys[ext_ids[i]], reverse=desc)
+        elif col == 3:
+            dirs.sort(key=store.mtimes.__getitem__, reverse=desc)
+            files.sort(key=store.mtimes.__getitem__, reverse=desc)
+        dirs.extend(files)
+        return dirs
+
+    def reversed_rows(self, order):
+        """
+        並び済みリストの昇順/降順だけを反転したものを返す（再ソート不要）。
+        キーが一意なので、フォルダ群・ファイル群をそれぞれ逆順にすれば良い。
+        """
+        flags = self.store.flags
+        n_dirs = 0
+        for i in order:
+            if not flags[i] & FLAG_DIR:
+                break
+            n_dirs += 1
+        return order[n_dirs - 1::-1] + order[:n_dirs - 1:-1] if n_dirs else order[::-1]
@@ -0,0 +1,219 @@
+import errno
+import os
+import stat
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from PySide6.QtCore import QObject, Signal
+
+from models.mounts import FS_LOCAL, shared_mount_table
+
+# パスの状態
+PATH_MISSING = 0
+PATH_FILE = 1
+PATH_DIR = 2
+PATH_UNREACHABLE = 3 # マウントが応答しない（stat がタイムアウトした・接続が切れている）
+
+# 「存在しない」ではなく「今は確かめられない」ことを示すエラー
+_UNREACHABLE_ERRNOS = {errno.ENOTCONN, errno.ESTALE, errno.EIO, errno.ETIMEDOUT,
+                       getattr(errno, "EHOSTDOWN", errno.EIO), errno.EHOSTUNREACH}
+
+
+class StatService(QObject):
+    """
+    v12.12 GUI スレッドから存在確認・フォルダ判定をするための非同期 stat サービス。
+    stat はワーカーで行い、呼び出し側はマウントごとのタイムアウトまでしか待たない。
+    タイムアウトしたマウントは「応答なし」として覚え、その stat が戻ってくるまでは
+    同じマウント上のパスを待たずに PATH_UNREACHABLE と答える
+    （固まった NFS/SMB/FUSE に GUI スレッドを何度もつかまらせない）。
+    結果は CACHE_TTL 秒だけキャッシュする。
+    固まった stat はタイムアウト後もワーカーを握ったまま戻らないので、ローカルのパスは専用の
+    プールで、ネットワーク/FUSE はマウントごとの小さなプール（MOUNT_WORKERS 本）で stat する。
+    マウントごとの未完了の stat が MAX_MOUNT_PENDING 件に達したら、新しい stat は始めずに
+    PATH_UNREACHABLE（wait=False ならキャッシュの値か None）と答える。
+
+    state(path, wait=False) はキャッシュがなければ None を返して裏で取得し、
+    確定したら stateChanged(path, state) で知らせる（ラベルの後追い更新などに使う）。
+    """
+    stateChanged = Signal(str, int)
+    mountReachabilityChanged = Signal(str, bool) # マウントポイント, 応答するか
+
+    DEFAULT_TIMEOUT_MS = 300
+    CACHE_TTL = 2.0
+    MAX_CACHE = 4096
+    MOUNT_WORKERS = 2
+    MAX_MOUNT_PENDING = 8
+
+    def __init__(self, mounts=None, parent=None):
+        super().__init__(parent)
+        self.mounts = mounts or shared_mount_table()
+        # v12.12 ローカルのパス用。遅いマウントの stat とはワーカーを分ける
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cff-stat")
+        self._mount_executors = {}  # ネットワーク/FUSE のマウントポイント -> 専用のプール
+        self._mount_pending = {}    # ネットワーク/FUSE のマウントポイント -> 未完了の stat の数
+        self._lock = threading.Lock()
+        self._cache = OrderedDict() # path -> (state, 取得時刻)
+        self._inflight = {}         # path -> Future
+        self._hung = set()          # 応答のないマウントポイント
+        self._timeouts = {}         # マウントポイント -> ms
+
+    def set_mount_timeout(self, mount_point, timeout_ms):
+        """マウントごとの待ち時間を設定する（None で既定値に戻す）"""
+        if timeout_ms is None:
+            self._timeouts.pop(mount_point, None)
+        else:
+            self._timeouts[mount_point] = timeout_ms
+
+    def timeout_for(self, mount_point):
+        return self._timeouts.get(mount_point, self.DEFAULT_TIMEOUT_MS)
+
+    def state(self, path, wait=True):
+        """path の状態 (PATH_*) を返す。wait=False でキャッシュがなければ None"""
+        path = os.path.abspath(path)
+        mount = self.mounts.mount_for(path)
+        mount_point = mount.mount_point
+        with self._lock:
+            if mount_point in self._hung:
+                return PATH_UNREACHABLE
+            hit = self._cache.get(path)
+        if hit and time.monotonic() - hit[1] < self.CACHE_TTL:
+            return hit[0]
+        future = self._submit(path, mount_point, mount.fs_class != FS_LOCAL)
+        if future is None:
+            # このマウントの stat が詰まっている: 待たずに答える（遅いだけかもしれないので応答なしとは覚えない）
+            return PATH_UNREACHABLE if wait else (hit[0] if hit else None)
+        if not wait:
+            return hit[0] if hit else None
+        try:
+            return future.result(timeout=self.timeout_for(mount_point) / 1000)
+        except FutureTimeout:
+            self._mark_hung(mount_point)
+            return PATH_UNREACHABLE
+
+    def exists(self, path):
+        """存在するか（応答のないマウント上は False）"""
+        return self.state(path) in (PATH_FILE, PATH_DIR)
+
+    def is_dir(self, path):
+        return self.state(path) == PATH_DIR
+
+    def is_unreachable(self, path):
+        return self.state(path, wait=False) == PATH_UNREACHABLE
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(os.path.abspath(path), None)
+
+    # --- internal ---
+
+    def _submit(self, path, mount_point, remote):
+        """path の stat を始める（始めていればその Future）。マウントの未完了が上限なら None"""
+        with self._lock:
+            future = self._inflight.get(path)
+            if future is not None:
+                return future
+            executor = self._executor
+            if remote:
+                pending = self._mount_pending.get(mount_point, 0)
+                if pending >= self.MAX_MOUNT_PENDING:
+                    return None
+                self._mount_pending[mount_point] = pending + 1
+                executor = self._mount_executors.get(mount_point)
+                if executor is None:
+                    executor = self._mount_executors[mount_point] = ThreadPoolExecutor(
+                        max_workers=self.MOUNT_WORKERS, thread_name_prefix="cff-stat-mount")
+            future = executor.submit(self._probe, path, mount_point, remote)
+            self._inflight[path] = future
+            return future
+
+    def _mark_hung(self, mount_point):
+        with self._lock:
+            if mount_point in self._hung:
+                return
+            self._hung.add(mount_point)
+        print(f"Stat Timeout ({mount_point}): mount is not responding", file=sys.stderr)
+        self.mountReachabilityChanged.emit(mount_point, False)
+
+    def _probe(self, path, mount_point, remote=False):
+        """ワーカーで1パスを stat する"""
+        try:
+            st = os.stat(path)
+            state = PATH_DIR if stat.S_ISDIR(st.st_mode) else PATH_FILE
+        except OSError as e:
+            state = PATH_UNREACHABLE if e.errno in _UNREACHABLE_ERRNOS else PATH_MISSING
+        with self._lock:
+            self._inflight.pop(path, None)
+            if remote:
+                self._mount_pending[mount_point] -= 1
+            previous = self._cache.pop(path, None)
+            self._cache[path] = (state, time.monotonic())
+            while len(self._cache) > self.MAX_CACHE:
+                self._cache.popitem(last=False)
+            # 接続切れのエラーで戻った場合は、TTL 後に改めて確かめる
+            recovered = mount_point in self._hung and state != PATH_UNREACHABLE
+            self._hung.discard(mount_point)
+        # シグナルはワーカーから出すので、受け側（GUI スレッド）ではキュー経由で届く
+        if recovered:
+            self.mountReachabilityChanged.emit(mount_point, True)
+        if previous is None or previous[0] != state:
+            self.stateChanged.emit(path, state)
+        return state
+
+
+_shared_service = None
+
+def shared_stat_service():
+    """プロセス共有の stat サービスを返す"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = StatService()
+    return _shared_service
+
+
+# --- v12.12 デバッグ: GUI スレッドでのファイルシステム呼び出しを記録する ---
+
+_TRACED_OS_FUNCS = ("stat", "lstat", "scandir", "listdir", "access", "readlink")
+# 呼び出し元として報告しない標準ライブラリ（os.path.exists などの中継）
+_PASS_THROUGH_FILES = {"genericpath.py", "posixpath.py", "ntpath.py", "os.py", "shutil.py",
+                       "pathlib.py", "<frozen genericpath>", "<frozen posixpath>",
+                       "<frozen ntpath>", "<frozen os>", os.path.basename(__file__)}
+
+def _report_gui_io(name, arg):
+    if threading.current_thread() is not threading.main_thread():
+        return
+    # traceback はソースを読みに open() するので使わず、フレームを直接たどる
+    frame = sys._getframe(1)
+    while frame and os.path.basename(frame.f_code.co_filename) in _PASS_THROUGH_FILES:
+        frame = frame.f_back
+    where = f"{frame.f_code.co_filename}:{frame.f_lineno} ({frame.f_code.co_name})" if frame else "?"
+    print(f"[GUI I/O] {name}({arg!r}) at {where}", file=sys.stderr)
+
+
+def enable_gui_io_trace():
+    """
+    GUI（メイン）スレッドで行われた stat/scandir/open などを stderr に記録する。
+    os.path.exists/isdir などは内部で os.stat を呼ぶのでこれで拾える。
+    Qt（C++）側の呼び出しは対象外。環境変数 CFF_TRACE_GUI_IO=1 で起動時に有効になる。
+    """
+    for name in _TRACED_OS_FUNCS:
+        func = getattr(os, name, None)
+        if func is None or getattr(func, "_gui_io_traced", False):
+            continue
+
+        def traced(*args, _func=func, _name=name, **kwargs):
+            _report_gui_io(f"os.{_name}", args[0] if args else None)
+            return _func(*args, **kwargs)
+
+        traced._gui_io_traced = True
+        setattr(os, name, traced)
+
+    def audit(event, args):
+        if event == "open" and args and isinstance(args[0], (str, bytes)):
+            _report_gui_io("open", args[0])
+
+    sys.addaudithook(audit)
@@ -0,0 +1,82 @@
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class DirListing:
+    """
+    v12.21 1フォルダ分の列挙結果。
+    files は [(名前, サイズ, 更新日時, link)]、dirs は子フォルダのパス。
+    link はハードリンクが2つ以上あるファイルの (デバイス, inode)、それ以外は None
+    （Windows の DirEntry.stat() はリンク数を持たないので常に None）。
+    mtime は stat_dir=True で列挙したときのフォルダ自身の更新日時 (v12.22)
+    """
+    __slots__ = ("path", "files", "dirs", "error", "mtime")
+
+    def __init__(self, path, files, dirs, error=None, mtime=None):
+        self.path = path
+        self.files = files
+        self.dirs = dirs
+        self.error = error
+        self.mtime = mtime
+
+
+def outermost_roots(roots):
+    """重複と、他の root の中にある root を除く（同じファイルを2度数えない）"""
+    result = []
+    for root in sorted({os.path.normpath(r) for r in roots}):
+        if any(root.startswith(r.rstrip(os.sep) + os.sep) for r in result):
+            continue
+        result.append(root)
+    return result
+
+
+def list_dir(path, exclude=None, stat_dir=False):
+    """path の直下を列挙する（シンボリックリンクは辿らず、ファイル・フォルダ以外は除く）"""
+    files = []
+    dirs = []
+    mtime = None
+    try:
+        if stat_dir:
+            mtime = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            for e in it:
+                if exclude is not None and exclude(e.name):
+                    continue
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        dirs.append(e.path)
+                    elif e.is_file(follow_symlinks=False):
+                        st = e.stat(follow_symlinks=False)
+                        link = (st.st_dev, st.st_ino) if st.st_nlink > 1 else None
+                        files.append((e.name, st.st_size, st.st_mtime, link))
+                except OSError:
+                    continue
+    except OSError as e:
+        return DirListing(path, files, dirs, str(e), mtime)
+    return DirListing(path, files, dirs, mtime=mtime)
+
+
+def walk_parallel(roots, pool, job=None, max_pending=32, exclude=None, stat_dir=False):
+    """
+    v12.21 roots 以下のフォルダを pool で並列に列挙し、終わった順に DirListing を返すジェネレータ。
+    同時に列挙するフォルダは max_pending 個まで（未着手のフォルダはパスだけを持つ）。
+    受け取った側が listing.dirs から除いたフォルダには潜らない（os.walk と同じ。v12.22）。
+    job.cancelled が立ったら未着手の列挙を取り消して終わる
+    """
+    queue = deque(roots)
+    running = set()
+    try:
+        while queue or running:
+            while queue and len(running) < max_pending:
+                running.add(pool.submit(list_dir, queue.popleft(), exclude, stat_dir))
+            if job is not None and job.cancelled:
+                return
+            done, running = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+            for future in done:
+                listing = future.result()
+                yield listing
+                queue.extend(listing.dirs)
+    finally:
+        for future in running:
+            future.cancel()
@@ -0,0 +1,351 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+import time
+from PySide6.QtCore import QObject, QSocketNotifier, QFileSystemWatcher, QTimer, Signal
+
+from models.change_coalescer import shared_change_coalescer
+from models.dir_loader import io_thread_pool
+from models.listing_cache import dir_signature
+
+# <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# 一覧の表示に効く変化だけを受け取る（書き込み途中の IN_MODIFY は拾わず、閉じた時点で1回）
+_DIR_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+             | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII") # wd, mask, cookie, len
+
+
+class _Inotify:
+    """libc の inotify を ctypes で呼ぶ薄いラッパー。使えない環境では生成時に OSError"""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._add.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._rm = libc.inotify_rm_watch
+        self._rm.argtypes = (ctypes.c_int, ctypes.c_int)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask):
+        wd = self._add(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd):
+        self._rm(self.fd, wd)
+
+    def read_events(self):
+        """溜まっているイベントを (wd, mask, name) で返す（ノンブロッキング）"""
+        events = []
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            offset = 0
+            while offset + _EVENT_HEADER.size <= len(buf):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+
+class _PollState:
+    __slots__ = ("interval", "due", "signature", "checked", "inflight")
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.due = 0.0
+        self.signature = None
+        self.checked = False # 基準の mtime を取り終えたか
+        self.inflight = False
+
+
+class DirectoryWatchService(QObject):
+    """
+    v12.11 表示中のディレクトリの変更監視をプロセスで1つにまとめるサービス。
+    監視はディレクトリごとに1つで、ペインのビュー（FlatDirectoryModel）が acquire/release する
+    参照カウントで管理し、誰も表示していないディレクトリの監視はすぐに外す。
+    ペインやモデルごとに監視を持つと、一度開いたディレクトリの監視が残り続けて
+    fs.inotify.max_user_watches を使い切ってしまうため。
+
+    Linux では inotify を ctypes で直接使い、イベントは GUI スレッドの QSocketNotifier で読む。
+    キューがあふれた (IN_Q_OVERFLOW) 場合はどの変更が失われたか分からないので、
+    監視中（＝表示中）のディレクトリだけを再スキャンさせる。
+    それ以外の環境では QFileSystemWatcher で同じ参照カウントを行う。
+
+    変更は directoryChanged(path) で流し、共有の ChangeCoalescer がまとめてからモデルへ届く。
+
+    v12.13 acquire(path, poll_interval_ms) で変更通知の代わりに定期確認にできる
+    （ネットワーク/FUSE 向け。inotify ではリモート側の変更が届かない）。
+    ディレクトリの mtime をワーカーで取り、前回と違えば directoryChanged を出す。
+    """
+    directoryChanged = Signal(str)
+    _pollResult = Signal(str, object) # path, signature（取得できなければ None）
+    _fallbackChecked = Signal(str, bool) # path, ディレクトリか
+    _missingChecked = Signal(str, bool, int) # path, ディレクトリか, 確認した時点の wd
+
+    # 定期確認の時刻を見に行く間隔
+    POLL_TICK_MS = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._refcount = {}    # path -> 参照数
+        self._wd_of = {}       # path -> wd
+        self._paths_of = {}    # wd -> {path}（同じディレクトリを別名で監視すると wd が共有される）
+        self._inotify = None
+        self._notifier = None
+        self._fallback = None
+        self._polled = {}      # path -> _PollState
+        self._poll_timer = QTimer(self)
+        self._poll_timer.timeout.connect(self._poll_due)
+        self._pollResult.connect(self._on_poll_result)
+        self._fallbackChecked.connect(self._on_fallback_checked)
+        self._missingChecked.connect(self._on_missing_checked)
+        self.overflows = 0
+        try:
+            self._inotify = _Inotify()
+            self._notifier = QSocketNotifier(self._inotify.fd, QSocketNotifier.Read, self)
+            self._notifier.activated.connect(self._read_events)
+        except OSError:
+            self._fallback = QFileSystemWatcher(self)
+            self._fallback.directoryChanged.connect(self.directoryChanged)
+
+    def backendName(self):
+        return "inotify" if self._inotify else "qt"
+
+    def acquire(self, path, poll_interval_ms=None):
+        """
+        path の監視を1つ借りる（最初の1つで監視を始める）。
+        poll_interval_ms を指定すると変更通知ではなく定期確認で監視する（方式は最初の借り手で決まる）
+        """
+        path = os.path.abspath(path)
+        count = self._refcount.get(path, 0)
+        self._refcount[path] = count + 1
+        if count == 0:
+            if poll_interval_ms:
+                self._add_poll(path, poll_interval_ms)
+            else:
+                self._add(path)
+
+    def release(self, path):
+        """acquire() の対。誰も使っていなければ監視を外す"""
+        path = os.path.abspath(path)
+        count = self._refcount.get(path, 0)
+        if count <= 1:
+            self._refcount.pop(path, None)
+            if count == 1:
+                self._remove(path)
+        else:
+            self._refcount[path] = count - 1
+
+    def refcount(self, path):
+        return self._refcount.get(os.path.abspath(path), 0)
+
+    def watchedPaths(self):
+        return list(self._refcount)
+
+    def polledPaths(self):
+        return list(self._polled)
+
+    # --- internal ---
+
+    def _add(self, path):
+        if self._fallback is not None:
+            # 応答のないマウントで GUI スレッドが止まらないよう、ディレクトリかはワーカーで確かめる
+            io_thread_pool().submit(self._check_dir, self._fallbackChecked, path)
+            return
+        try:
+            wd = self._inotify.add_watch(path, _DIR_MASK)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                print(f"Watch Error ({path}): inotify watch limit reached "
+                      f"(fs.inotify.max_user_watches)", file=sys.stderr)
+            elif e.errno not in (errno.ENOENT, errno.ENOTDIR):
+                print(f"Watch Error ({path}): {e}", file=sys.stderr)
+            return
+        self._wd_of[path] = wd
+        self._paths_of.setdefault(wd, set()).add(path)
+
+    def _remove(self, path):
+        if self._polled.pop(path, None) is not None:
+            if not self._polled:
+                self._poll_timer.stop()
+            return
+        if self._fallback is not None:
+            if path in self._fallback.directories():
+                self._fallback.removePath(path)
+            return
+        wd = self._wd_of.pop(path, None)
+        if wd is None:
+            return
+        paths = self._paths_of.get(wd)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self._paths_of[wd]
+                self._inotify.rm_watch(wd)
+
+    def _forget_missing(self):
+        """
+        あふれで IN_IGNORED を取りこぼした場合に備え、消えたディレクトリの wd を忘れる。
+        存在確認はワーカーで行い、結果は _on_missing_checked で反映する
+        """
+        for path, wd in self._wd_of.items():
+            io_thread_pool().submit(self._check_dir, self._missingChecked, path, wd)
+
+    def _check_dir(self, signal, path, *args):
+        """ワーカーで path がディレクトリかを確かめ、signal(path, is_dir, *args) で返す"""
+        is_dir = os.path.isdir(path)
+        try:
+            signal.emit(path, is_dir, *args)
+        except RuntimeError: # アプリ終了時に既に破棄済みの場合
+            pass
+
+    def _on_fallback_checked(self, path, is_dir):
+        # 確認中に監視が外された・既に追加済みなら何もしない
+        if is_dir and path in self._refcount and path not in self._fallback.directories():
+            self._fallback.addPath(path)
+
+    def _on_missing_checked(self, path, is_dir, wd):
+        # 確認中に監視が外された・付け直された場合は、その時点の wd を残す
+        if is_dir or self._wd_of.get(path) != wd:
+            return
+        del self._wd_of[path]
+        paths = self._paths_of.get(wd)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self._paths_of[wd]
+
+    # --- v12.13 定期確認 ---
+
+    def _add_poll(self, path, interval_ms):
+        state = self._polled[path] = _PollState(interval_ms / 1000)
+        # 最初の1回で基準の mtime を取る（変更扱いにはしない）
+        self._submit_poll(path, state)
+        if not self._poll_timer.isActive():
+            self._poll_timer.start(self.POLL_TICK_MS)
+
+    def _poll_due(self):
+        now = time.monotonic()
+        for path, state in self._polled.items():
+            if not state.inflight and state.due <= now:
+                self._submit_poll(path, state)
+
+    def _submit_poll(self, path, state):
+        # 応答のないマウントで stat が戻らなくても、同じパスの確認は1つしか走らせない
+        state.inflight = True
+        io_thread_pool().submit(self._poll_one, path)
+
+    def _poll_one(self, path):
+        """ワーカーで1ディレクトリの mtime を取る"""
+        try:
+            signature = dir_signature(path)
+        except OSError:
+            signature = None
+        try:
+            self._pollResult.emit(path, signature)
+        except RuntimeError: # アプリ終了時に既に破棄済みの場合
+            pass
+
+    def _on_poll_result(self, path, signature):
+        state = self._polled.get(path)
+        if state is None:
+            return # 確認中に監視が外された
+        previous, checked = state.signature, state.checked
+        state.signature = signature
+        state.checked = True
+        state.inflight = False
+        state.due = time.monotonic() + state.interval
+        if checked and signature != previous:
+            self.directoryChanged.emit(path)
+
+    def _read_events(self, *_):
+        changed = set()
+        for wd, mask, _ in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                self.overflows += 1
+                changed.update(self._wd_of)
+                self._forget_missing()
+                continue
+            paths = self._paths_of.get(wd)
+            if not paths:
+                continue
+            changed.update(paths)
+            if mask & IN_IGNORED:
+                # ディレクトリ自体が消えた・アンマウントされた。カーネル側の監視は既にない
+                del self._paths_of[wd]
+                for p in paths:
+                    self._wd_of.pop(p, None)
+        for path in changed:
+            self.directoryChanged.emit(path)
+
+
+class WatchHandle:
+    """
+    利用者（モデル）1つ分の監視の借用。対象を付け替えると前の分は返す。
+    QObject ではないので、モデルの destroyed に束縛して後始末に使える。
+    """
+    __slots__ = ("service", "path")
+
+    def __init__(self, service=None):
+        self.service = service or shared_watch_service()
+        self.path = None
+
+    def watch(self, path, poll_interval_ms=None):
+        path = os.path.abspath(path)
+        if path == self.path:
+            return
+        self.release()
+        self.service.acquire(path, poll_interval_ms)
+        self.path = path
+
+    def release(self):
+        if self.path is None:
+            return
+        try:
+            self.service.release(self.path)
+        except RuntimeError: # アプリ終了時に既に破棄済みの場合
+            pass
+        self.path = None
+
+
+_shared_service = None
+
+def shared_watch_service():
+    """プロセス共有の監視サービスを返す（変更は共有の ChangeCoalescer に流れる）"""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = DirectoryWatchService()
+        _shared_service.directoryChanged.connect(shared_change_coalescer().notify)
+    return _shared_service
@@ -0,0 +1,173 @@
+import os
+import re
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QCheckBox, QPushButton,
+                               QTreeWidget, QTreeWidgetItem, QLabel, QHeaderView)
+from PySide6.QtCore import Qt
+
+from models.content_search import ContentSearch, GrepOptions
+
+
+def _format_rate(count, seconds, unit):
+    return f"{count / seconds:,.0f} {unit}/s" if seconds > 0 else f"- {unit}/s"
+
+
+class ContentSearchWindow(QWidget):
+    """
+    v12.19 ペインに表示中のフォルダ（またはマーク済みアイテム）以下のファイル内容を検索するウィンドウ。
+    一致は見つかった順に「パス / 行 / 抜粋」で流し込み、照合したファイル数・MB と毎秒の速さを表示する。
+    ダブルクリック / Enter で、一致したファイルのフォルダから表示し直す。
+    """
+
+    def __init__(self, main_window, roots, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.main_window = main_window
+        self.roots = list(roots)
+        self._token = 0
+        self.search = ContentSearch(self)
+        self.search.hitsFound.connect(self.on_hits)
+        self.search.progress.connect(self.on_progress)
+        self.search.finished.connect(self.on_finished)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle(f"Search in Files - {self._roots_label()}")
+        self.resize(900, 560)
+        self.setStyleSheet("""
+            QWidget { background-color: #1e1e1e; color: #ccc; }
+            QLineEdit { background-color: #3c3c3c; color: #fff; border: 1px solid #555;
+                        padding: 4px 8px; border-radius: 4px; }
+            QLineEdit:focus { border-color: #007acc; }
+            QPushButton { background-color: #0e639c; color: white; border: none; padding: 5px 14px; border-radius: 4px; }
+            QPushButton:disabled { background-color: #3a3a3a; color: #777; }
+            QTreeWidget { background-color: #252526; border: 1px solid #333; outline: none; }
+            QTreeWidget::item:selected { background-color: #094771; color: white; }
+            QHeaderView::section { background-color: #2d2d2d; color: #aaa; border: none; padding: 3px 6px; }
+            QLabel#Status { color: #888; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(6)
+
+        row = QHBoxLayout()
+        self.pattern_edit = QLineEdit()
+        self.pattern_edit.setPlaceholderText("Search text...")
+        self.pattern_edit.returnPressed.connect(self.start_search)
+        row.addWidget(self.pattern_edit, 1)
+        self.regex_check = QCheckBox("Regex")
+        self.case_check = QCheckBox("Match case")
+        row.addWidget(self.regex_check)
+        row.addWidget(self.case_check)
+        self.start_button = QPushButton("Search")
+        self.start_button.clicked.connect(self.start_search)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.search.cancel)
+        row.addWidget(self.start_button)
+        row.addWidget(self.stop_button)
+        layout.addLayout(row)
+
+        row = QHBoxLayout()
+        self.include_edit = QLineEdit()
+        self.include_edit.setPlaceholderText("Include files (e.g. *.py; *.txt)")
+        self.include_edit.returnPressed.connect(self.start_search)
+        self.exclude_edit = QLineEdit(".git; node_modules; __pycache__")
+        self.exclude_edit.setPlaceholderText("Exclude files/folders (e.g. .git; *.min.js)")
+        self.exclude_edit.returnPressed.connect(self.start_search)
+        row.addWidget(self.include_edit)
+        row.addWidget(self.exclude_edit)
+        layout.addLayout(row)
+
+        self.results = QTreeWidget()
+        self.results.setHeaderLabels(["Path", "Line", "Snippet"])
+        self.results.setRootIsDecorated(False)
+        self.results.setUniformRowHeights(True)
+        self.results.setAlternatingRowColors(False)
+        header = self.results.header()
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        header.setStretchLastSection(True)
+        self.results.setColumnWidth(0, 320)
+        self.results.itemActivated.connect(self.open_item)
+        layout.addWidget(self.results, 1)
+
+        self.status = QLabel(f"Search {len(self.roots)} location(s): {self._roots_label()}")
+        self.status.setObjectName("Status")
+        layout.addWidget(self.status)
+
+        self.pattern_edit.setFocus()
+
+    def _roots_label(self):
+        names = [os.path.basename(p.rstrip("\\/")) or p for p in self.roots[:3]]
+        return ", ".join(names) + (f" +{len(self.roots) - 3}" if len(self.roots) > 3 else "")
+
+    def _display_path(self, path):
+        """検索対象のフォルダからの相対パス（複数あるときはそのフォルダ名から）"""
+        for root in self.roots:
+            if path.startswith(root.rstrip("\\/") + os.sep):
+                rel = os.path.relpath(path, root)
+                return rel if len(self.roots) == 1 else os.path.join(os.path.basename(root.rstrip("\\/")), rel)
+        return path
+
+    def start_search(self):
+        pattern = self.pattern_edit.text()
+        if not pattern:
+            return
+        options = GrepOptions(pattern, regex=self.regex_check.isChecked(),
+                              case_sensitive=self.case_check.isChecked(),
+                              include=self.include_edit.text(), exclude=self.exclude_edit.text())
+        try:
+            self._token = self.search.start(self.roots, options)
+        except re.error as e:
+            self.status.setText(f"Invalid regular expression: {e}")
+            return
+        self.results.clear()
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.status.setText("Searching...")
+
+    def on_hits(self, token, path, hits):
+        if token != self._token:
+            return
+        shown = self._display_path(path)
+        items = []
+        for line_no, snippet, _column in hits:
+            item = QTreeWidgetItem([shown, str(line_no), snippet])
+            item.setData(0, Qt.UserRole, path)
+            item.setToolTip(0, path)
+            item.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
+            items.append(item)
+        self.results.addTopLevelItems(items)
+
+    def on_progress(self, token, files, size, elapsed):
+        if token != self._token:
+            return
+        mb = size / (1024 * 1024)
+        self.status.setText(
+            f"{self.results.topLevelItemCount():,} hit(s) - {files:,} files, {mb:,.1f} MB in {elapsed:.1f}s"
+            f" ({_format_rate(files, elapsed, 'files')}, {_format_rate(mb, elapsed, 'MB')})")
+
+    def on_finished(self, token, files, size, hits, cancelled):
+        if token != self._token:
+            return
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        if cancelled:
+            suffix = " - hit limit reached" if hits >= ContentSearch.MAX_HITS else " - stopped"
+            self.status.setText(self.status.text() + suffix)
+
+    def open_item(self, item):
+        path = item.data(0, Qt.UserRole)
+        if path:
+            self.main_window.reset_flow_from(os.path.dirname(path))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            if self.search.isRunning():
+                self.search.cancel()
+            else:
+                self.close()
+            return
+        super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.search.close()
+        super().closeEvent(event)
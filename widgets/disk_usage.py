@@ -0,0 +1,259 @@
+import os
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTreeWidget, QTreeWidgetItem,
+                               QLabel, QHeaderView, QTabWidget, QSplitter)
+from PySide6.QtCore import Qt, QLocale
+from PySide6.QtGui import QKeySequence, QShortcut
+
+from models.disk_usage import DiskUsage
+
+NUMBER_ROLE = Qt.UserRole + 1
+
+
+def _format_size(size):
+    return QLocale.system().formattedDataSize(size, 1, QLocale.DataSizeTraditionalFormat)
+
+
+class _NumericItem(QTreeWidgetItem):
+    """NUMBER_ROLE に数値がある列は数値で並べる"""
+
+    def __lt__(self, other):
+        column = self.treeWidget().sortColumn() if self.treeWidget() else 0
+        left = self.data(column, NUMBER_ROLE)
+        right = other.data(column, NUMBER_ROLE)
+        if left is not None and right is not None:
+            return left < right
+        return self.text(column).lower() < other.text(column).lower()
+
+
+class DiskUsageWindow(QWidget):
+    """
+    v12.22 フォルダ以下の使用量の内訳を表示するウィンドウ（集計は models/disk_usage.py）。
+    上は今のフォルダの直下の内訳（サイズ・割合・項目数。見出しで並べ替え）、下は大きいファイル・フォルダ。
+    集計中も途中の合計を表示し続け、数え終えていないフォルダのサイズには "…" を付ける。
+    フォルダをダブルクリック / Enter で潜り、レーンのペインをルートからそのフォルダまでの順に表示する。
+    Backspace で1つ上へ（ルートまで）。
+    """
+
+    def __init__(self, pane, root, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.pane = pane
+        self.root = os.path.normpath(root)
+        self.current = self.root
+        self._token = 0
+        self._rows = {} # パス -> 内訳の行
+        self.usage = DiskUsage(self)
+        self.usage.progress.connect(self.on_progress)
+        self.usage.finished.connect(self.on_finished)
+        self.usage.listingReady.connect(self.on_listing_ready)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.setWindowTitle(f"Disk Usage - {os.path.basename(self.root) or self.root}")
+        self.resize(900, 680)
+        self.setStyleSheet("""
+            QWidget { background-color: #1e1e1e; color: #ccc; }
+            QPushButton { background-color: #0e639c; color: white; border: none; padding: 5px 14px; border-radius: 4px; }
+            QPushButton:disabled { background-color: #3a3a3a; color: #777; }
+            QTreeWidget { background-color: #252526; border: 1px solid #333; outline: none; }
+            QTreeWidget::item:selected { background-color: #094771; color: white; }
+            QHeaderView::section { background-color: #2d2d2d; color: #aaa; border: none; padding: 3px 6px; }
+            QTabWidget::pane { border: none; }
+            QTabBar::tab { background: #2d2d2d; color: #aaa; padding: 4px 12px; }
+            QTabBar::tab:selected { background: #1e1e1e; color: #fff; }
+            QLabel#Status { color: #888; }
+            QLabel#Location { color: #fff; font-weight: bold; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(6)
+
+        row = QHBoxLayout()
+        self.up_button = QPushButton("Up")
+        self.up_button.clicked.connect(self.go_up)
+        row.addWidget(self.up_button)
+        self.location = QLabel()
+        self.location.setObjectName("Location")
+        row.addWidget(self.location, 1)
+        self.rescan_button = QPushButton("Rescan")
+        self.rescan_button.setToolTip("Recount everything, ignoring cached folder totals")
+        self.rescan_button.clicked.connect(lambda: self.start_scan(reuse=False))
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.usage.cancel)
+        row.addWidget(self.rescan_button)
+        row.addWidget(self.stop_button)
+        layout.addLayout(row)
+
+        splitter = QSplitter(Qt.Vertical)
+        self.breakdown = self._make_tree(["Name", "Size", "Share", "Items"])
+        self.breakdown.itemActivated.connect(self.open_breakdown_item)
+        splitter.addWidget(self.breakdown)
+        self.tabs = QTabWidget()
+        self.top_files = self._make_tree(["Size", "File"])
+        self.top_dirs = self._make_tree(["Size", "Folder"])
+        self.top_files.itemActivated.connect(self.open_top_item)
+        self.top_dirs.itemActivated.connect(self.open_top_item)
+        self.tabs.addTab(self.top_files, "Largest Files")
+        self.tabs.addTab(self.top_dirs, "Largest Folders")
+        splitter.addWidget(self.tabs)
+        splitter.setSizes([400, 240])
+        layout.addWidget(splitter, 1)
+
+        self.status = QLabel()
+        self.status.setObjectName("Status")
+        layout.addWidget(self.status)
+
+        QShortcut(QKeySequence("Backspace"), self, activated=self.go_up)
+
+        self.show_folder(self.root)
+        self.start_scan(reuse=True)
+
+    def _make_tree(self, labels):
+        tree = QTreeWidget()
+        tree.setHeaderLabels(labels)
+        tree.setRootIsDecorated(False)
+        tree.setUniformRowHeights(True)
+        tree.setSortingEnabled(True)
+        header = tree.header()
+        header.setSectionResizeMode(QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(0 if labels[0] == "Name" else len(labels) - 1, QHeaderView.Stretch)
+        header.setStretchLastSection(False)
+        return tree
+
+    def start_scan(self, reuse=True):
+        self._token = self.usage.start(self.root, reuse=reuse)
+        self.rescan_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.status.setText("Scanning...")
+
+    # --- breakdown ---
+
+    def show_folder(self, path):
+        """
+        path の直下の内訳を作り直す（数値は refresh() で更新する）。
+        一覧は集計の列挙を使い、まだなければワーカーで列挙して届いてから作る
+        """
+        self.current = path
+        self.location.setText(path)
+        self.up_button.setEnabled(path != self.root)
+        self.breakdown.setSortingEnabled(False)
+        self.breakdown.clear()
+        self._rows = {}
+        listing = self.usage.listing(path)
+        if listing is None:
+            self.usage.requestListing(path)
+            return
+        files, dirs, error = listing
+        if error:
+            self.status.setText(f"Cannot read {path}: {error}")
+        entries = [(d, True, None) for d in dirs] + [(os.path.join(path, name), False, size) for name, size in files]
+        for entry_path, is_dir, size in entries:
+            item = _NumericItem([os.path.basename(entry_path) + (os.sep if is_dir else ""), "", "", ""])
+            item.setData(0, Qt.UserRole, (entry_path, is_dir))
+            for col in (1, 2, 3):
+                item.setTextAlignment(col, Qt.AlignRight | Qt.AlignVCenter)
+            if not is_dir:
+                item.setData(1, NUMBER_ROLE, size)
+            self._rows[entry_path] = item
+            self.breakdown.addTopLevelItem(item)
+        self.refresh()
+        self.breakdown.setSortingEnabled(True)
+        self.breakdown.sortByColumn(1, Qt.DescendingOrder)
+
+    def on_listing_ready(self, path):
+        if path == self.current and not self._rows:
+            self.show_folder(path)
+
+    def refresh(self):
+        """内訳と大きいファイル・フォルダの数値を今の集計で更新する"""
+        total = self.usage.usage(self.current)
+        total_bytes = total[0] if total else 0
+        sorting = self.breakdown.isSortingEnabled()
+        self.breakdown.setSortingEnabled(False)
+        for path, item in self._rows.items():
+            _, is_dir = item.data(0, Qt.UserRole)
+            if is_dir:
+                usage = self.usage.usage(path)
+                if usage is None:
+                    item.setText(1, "…")
+                    continue
+                size, files, dirs, complete = usage
+                item.setData(1, NUMBER_ROLE, size)
+                item.setText(1, _format_size(size) + ("" if complete else " …"))
+                item.setData(3, NUMBER_ROLE, files + dirs)
+                item.setText(3, f"{files + dirs:,}")
+            else:
+                size = item.data(1, NUMBER_ROLE)
+                item.setText(1, _format_size(size))
+            share = size / total_bytes if total_bytes else 0
+            item.setData(2, NUMBER_ROLE, share)
+            item.setText(2, f"{share:.1%}")
+        self.breakdown.setSortingEnabled(sorting)
+        self._fill_top(self.top_files, self.usage.topFiles())
+        self._fill_top(self.top_dirs, self.usage.topDirs())
+
+    def _fill_top(self, tree, items):
+        tree.setSortingEnabled(False)
+        tree.clear()
+        for size, path in items:
+            item = _NumericItem([_format_size(size), path])
+            item.setData(0, NUMBER_ROLE, size)
+            item.setData(0, Qt.UserRole, path)
+            item.setTextAlignment(0, Qt.AlignRight | Qt.AlignVCenter)
+            tree.addTopLevelItem(item)
+        tree.setSortingEnabled(True)
+
+    def on_progress(self, token, dirs, files, size, elapsed):
+        if token != self._token:
+            return
+        self.status.setText(f"{_format_size(size)} in {files:,} files, {dirs:,} folders ({elapsed:.1f}s)")
+        self.refresh()
+
+    def on_finished(self, token, cancelled):
+        if token != self._token:
+            return
+        self.rescan_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.refresh()
+        if cancelled:
+            self.status.setText(self.status.text() + " - stopped")
+
+    # --- navigation ---
+
+    def drill_to(self, path):
+        """path（ルート以下のフォルダ）の内訳を表示し、レーンをルートから path まで辿る"""
+        path = os.path.normpath(path)
+        if path != self.root and not path.startswith(self.root.rstrip(os.sep) + os.sep):
+            return
+        self.show_folder(path)
+        chain = [path]
+        while chain[-1] != self.root:
+            chain.append(os.path.dirname(chain[-1]))
+        try:
+            self.pane.parent_lane.display_chain(chain[::-1])
+        except (RuntimeError, AttributeError): # ペインやレーンが閉じられた
+            pass
+
+    def go_up(self):
+        if self.current != self.root:
+            self.drill_to(os.path.dirname(self.current))
+
+    def open_breakdown_item(self, item):
+        path, is_dir = item.data(0, Qt.UserRole)
+        if is_dir:
+            self.drill_to(path)
+
+    def open_top_item(self, item):
+        path = item.data(0, Qt.UserRole)
+        self.drill_to(path if self.sender() is self.top_dirs else os.path.dirname(path))
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            if self.usage.isRunning():
+                self.usage.cancel()
+            else:
+                self.close()
+            return
+        super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.usage.close()
+        super().closeEvent(event)
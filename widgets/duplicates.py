@@ -0,0 +1,200 @@
+import os
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox,
+                               QTreeWidget, QTreeWidgetItem, QLabel, QHeaderView)
+from PySide6.QtCore import Qt, QLocale, QDateTime
+from PySide6.QtGui import QBrush, QKeySequence, QShortcut
+
+from models.duplicate_finder import DuplicateFinder, STAGE_SCAN
+from models.proxy_model import MARKED_COLOR
+
+# 最小サイズの選択肢
+MIN_SIZES = [("Any size", 1), (">= 4 KB", 4 * 1024), (">= 1 MB", 1024 * 1024), (">= 100 MB", 100 * 1024 * 1024)]
+
+
+def _format_size(size):
+    return QLocale.system().formattedDataSize(size, 1, QLocale.DataSizeTraditionalFormat)
+
+
+class DuplicatesWindow(QWidget):
+    """
+    v12.21 選択中（またはマーク済み）のフォルダ・ファイル以下の重複ファイルを一覧するウィンドウ。
+    グループは見つかった順に流し込み、各グループの中は更新日時の古い順（先頭を原本とみなす）。
+    M: 選択中のグループの原本以外をマークする / U: グループのマークを外す / Ctrl+M: 全グループの原本以外をマーク。
+    マークはペインのマーク（バケツ）と同じなので、そのままバッチ操作（移動・削除など）に使える。
+    """
+
+    def __init__(self, pane, roots, marked_paths, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.pane = pane
+        self.marked_paths = marked_paths # タブで共有のマーク（FlowArea.marked_paths）
+        self.roots = list(roots)
+        self._token = 0
+        self.finder = DuplicateFinder(self)
+        self.finder.groupFound.connect(self.on_group)
+        self.finder.progress.connect(self.on_progress)
+        self.finder.finished.connect(self.on_finished)
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        names = [os.path.basename(p.rstrip("\\/")) or p for p in self.roots[:3]]
+        self.setWindowTitle("Duplicates - " + ", ".join(names) + (f" +{len(self.roots) - 3}" if len(self.roots) > 3 else ""))
+        self.resize(900, 600)
+        self.setStyleSheet("""
+            QWidget { background-color: #1e1e1e; color: #ccc; }
+            QPushButton { background-color: #0e639c; color: white; border: none; padding: 5px 14px; border-radius: 4px; }
+            QPushButton:disabled { background-color: #3a3a3a; color: #777; }
+            QComboBox { background-color: #3c3c3c; border: 1px solid #555; padding: 3px 8px; }
+            QTreeWidget { background-color: #252526; border: 1px solid #333; outline: none; }
+            QTreeWidget::item:selected { background-color: #094771; color: white; }
+            QHeaderView::section { background-color: #2d2d2d; color: #aaa; border: none; padding: 3px 6px; }
+            QLabel#Status { color: #888; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(6)
+
+        row = QHBoxLayout()
+        self.min_size_combo = QComboBox()
+        for label, _ in MIN_SIZES:
+            self.min_size_combo.addItem(label)
+        self.min_size_combo.setCurrentIndex(1)
+        row.addWidget(self.min_size_combo)
+        self.start_button = QPushButton("Scan")
+        self.start_button.clicked.connect(self.start_scan)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.clicked.connect(self.finder.cancel)
+        row.addWidget(self.start_button)
+        row.addWidget(self.stop_button)
+        row.addStretch(1)
+        self.mark_all_button = QPushButton("Mark All Duplicates")
+        self.mark_all_button.clicked.connect(self.mark_all)
+        row.addWidget(self.mark_all_button)
+        layout.addLayout(row)
+
+        self.results = QTreeWidget()
+        self.results.setHeaderLabels(["Name", "Size", "Modified", "Folder"])
+        self.results.setUniformRowHeights(True)
+        self.results.setSelectionMode(QTreeWidget.ExtendedSelection)
+        header = self.results.header()
+        header.setSectionResizeMode(0, QHeaderView.Interactive)
+        header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        header.setStretchLastSection(True)
+        self.results.setColumnWidth(0, 320)
+        self.results.itemActivated.connect(self.open_item)
+        layout.addWidget(self.results, 1)
+
+        self.status = QLabel()
+        self.status.setObjectName("Status")
+        layout.addWidget(self.status)
+
+        QShortcut(QKeySequence("M"), self, activated=lambda: self.mark_selected_groups(True))
+        QShortcut(QKeySequence("U"), self, activated=lambda: self.mark_selected_groups(False))
+        QShortcut(QKeySequence("Ctrl+M"), self, activated=self.mark_all)
+
+        self.start_scan()
+
+    def start_scan(self):
+        self.results.clear()
+        self._token = self.finder.start(self.roots, MIN_SIZES[self.min_size_combo.currentIndex()][1])
+        self.start_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.status.setText("Scanning...")
+
+    def on_group(self, token, size, entries):
+        """entries は列挙時の (更新日時, パス) の古い順（先頭を原本として残す）"""
+        if token != self._token:
+            return
+        group = QTreeWidgetItem([f"{len(entries)} files", _format_size(size),
+                                 f"{_format_size(size * (len(entries) - 1))} reclaimable", ""])
+        group.setData(0, Qt.UserRole, None)
+        font = group.font(0)
+        font.setBold(True)
+        group.setFont(0, font)
+        for mtime, path in entries:
+            folder, name = os.path.split(path)
+            item = QTreeWidgetItem([name, _format_size(size),
+                                    QDateTime.fromSecsSinceEpoch(int(mtime)).toString("yyyy/MM/dd HH:mm"), folder])
+            item.setData(0, Qt.UserRole, path)
+            item.setToolTip(0, path)
+            group.addChild(item)
+        self.results.addTopLevelItem(group)
+        group.setExpanded(True)
+        self._paint_marks(group)
+
+    def on_progress(self, token, stage, done, total, size, total_size, elapsed):
+        if token != self._token:
+            return
+        if stage == STAGE_SCAN:
+            text = f"{stage}: {done:,} files, {_format_size(size)}"
+        else:
+            text = f"{stage}: {done:,}/{total:,} files, {_format_size(size)} / {_format_size(total_size)}"
+        mb = size / (1024 * 1024)
+        rate = f"{mb / elapsed:,.0f} MB/s" if elapsed > 0 and stage != STAGE_SCAN else ""
+        self.status.setText(f"{self.results.topLevelItemCount():,} group(s) - {text} {rate}".rstrip())
+
+    def on_finished(self, token, groups, wasted, cancelled):
+        if token != self._token:
+            return
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.status.setText(f"{groups:,} group(s), {_format_size(wasted)} reclaimable"
+                            + (" - stopped" if cancelled else ""))
+
+    def _groups_of(self, items):
+        groups = []
+        for item in items:
+            group = item.parent() or item
+            if group not in groups:
+                groups.append(group)
+        return groups
+
+    def mark_selected_groups(self, mark):
+        self._mark_groups(self._groups_of(self.results.selectedItems()), mark)
+
+    def mark_all(self):
+        self._mark_groups([self.results.topLevelItem(i) for i in range(self.results.topLevelItemCount())], True)
+
+    def _mark_groups(self, groups, mark):
+        """グループの原本（先頭）以外をマークする / グループ全員のマークを外す"""
+        paths = []
+        for group in groups:
+            children = [group.child(i) for i in range(group.childCount())]
+            if mark:
+                children = children[1:]
+            paths.extend(c.data(0, Qt.UserRole) for c in children)
+        if not paths:
+            return
+        try:
+            self.pane.action_mark_selected(paths, mark)
+        except RuntimeError: # ペインが閉じられた
+            return
+        for group in groups:
+            self._paint_marks(group)
+
+    def _paint_marks(self, group):
+        for i in range(group.childCount()):
+            child = group.child(i)
+            brush = QBrush(MARKED_COLOR) if child.data(0, Qt.UserRole) in self.marked_paths else QBrush()
+            for col in range(self.results.columnCount()):
+                child.setBackground(col, brush)
+
+    def open_item(self, item):
+        path = item.data(0, Qt.UserRole)
+        if path:
+            try:
+                self.pane.parent_filer.reset_flow_from(os.path.dirname(path))
+            except RuntimeError:
+                pass
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_Escape:
+            if self.finder.isRunning():
+                self.finder.cancel()
+            else:
+                self.close()
+            return
+        super().keyPressEvent(event)
+
+    def closeEvent(self, event):
+        self.finder.close()
+        super().closeEvent(event)
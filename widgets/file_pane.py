@@ -3,6 +3,7 @@ import shutil
 import zipfile
 import subprocess
 import sys
+from collections import defaultdict
 from PySide6.QtWidgets import (QFrame, QVBoxLayout, QWidget, QHBoxLayout, QLabel, 
                                QLineEdit, QPushButton, QScrollArea, QSplitter, 
                                QTreeView, QHeaderView, QMenu, QInputDialog, QMessageBox,
@@ -10,7 +11,16 @@ from PySide6.QtWidgets import (QFrame, QVBoxLayout, QWidget, QHBoxLayout, QLabel
 from PySide6.QtCore import Qt, QDir, QSize, QTimer, QEvent, QUrl, QMimeData
 from PySide6.QtGui import QAction, QDesktopServices, QKeySequence, QShortcut, QDrag, QIcon, QPixmap
 
-from models.proxy_model import SmartSortFilterProxyModel
+from models.proxy_model import SmartSortFilterProxyModel, FlatProxyModel
+from models.fs_registry import shared_model_registry
+from models.directory_model import FlatDirectoryModel
+from models.prefetcher import shared_prefetcher
+from models.io_policy import shared_io_policy
+from models.name_search import NameSearch
+from models.stat_service import shared_stat_service, PATH_MISSING, PATH_UNREACHABLE, PATH_DIR
+from widgets.content_search import ContentSearchWindow
+from widgets.duplicates import DuplicatesWindow
+from widgets.disk_usage import DiskUsageWindow
 
 class BatchTreeView(QTreeView):
     """v7.4 複数ペイン・マーク済みアイテムを一括でドラッグするためのカスタムTreeView"""
@@ -18,6 +28,15 @@ class BatchTreeView(QTreeView):
         super().__init__()
         self.owner_pane = owner_pane
         self.setMouseTracking(True) # v11.1 Hover Auto-Focus
+        # v12.3 全行同じ高さとみなし、大量行の挿入時に行ごとのサイズ計算を省く
+        self.setUniformRowHeights(True)
+        # v12.5 ホバー中のフォルダを先読み（マウストラッキング有効時のみ entered が来る）
+        self.entered.connect(lambda idx: self.owner_pane.prefetch_index(self, idx))
+
+    def currentChanged(self, current, previous):
+        super().currentChanged(current, previous)
+        # v12.5 カーソル移動（矢印キー等）で新しい行のフォルダを先読み。前の先読みは中断される
+        self.owner_pane.prefetch_index(self, current)
 
     def enterEvent(self, event):
         # v11.1 Hover Auto-Focus Logic
@@ -40,8 +59,9 @@ class BatchTreeView(QTreeView):
         if hasattr(self.owner_pane, 'parent_lane') and hasattr(self.owner_pane.parent_lane, 'parent_area'):
             area = self.owner_pane.parent_lane.parent_area
             if area and area.marked_paths:
+                stat = shared_stat_service() # v12.12 応答のないマウントで固まらないように
                 for p in area.marked_paths:
-                    if os.path.exists(p):
+                    if stat.exists(p):
                         drag_paths.add(os.path.abspath(p))
             
         # B. このビューの選択アイテム [Local]
@@ -103,6 +123,9 @@ class FilePane(QFrame):
             QLineEdit:focus { border: 1px solid #007acc; background: #252526; }
         """)
         self.search_box.textChanged.connect(self.on_search_text_changed)
+        # v12.15 検索は入力が止まってからワーカーで照合する
+        self.name_search = NameSearch(self)
+        self.name_search.resultsReady.connect(self._on_search_results)
         h_layout.addWidget(self.search_box)
         
         h_layout.addStretch()
@@ -129,22 +152,38 @@ class FilePane(QFrame):
         # ショートカット: Ctrl+F, Esc
         QShortcut(QKeySequence("Ctrl+F"), self, activated=self.focus_search)
         QShortcut(QKeySequence("Esc"), self, activated=self.clear_search)
+        # v12.19 内容検索 (grep)
+        QShortcut(QKeySequence("Ctrl+Shift+F"), self, activated=self.action_content_search)
         
         self.main_layout.addWidget(self.scroll)
         
         # --- Model Architecture Change ---
         # base_model はデータを供給するだけ
-        self.base_model = QFileSystemModel()
-        # Drivesを含めないとルート表示がおかしくなることがある
-        self.base_model.setFilter(QDir.AllEntries | QDir.NoDotAndDotDot | QDir.Hidden | QDir.Drives)
-        self.base_model.setRootPath(QDir.rootPath())
-        self.base_model.setReadOnly(False) # 右クリック操作（削除・リネーム）のために必要
+        # v12.1 ペインごとに作らず、プロセス共有のモデルを参照カウント付きで借りる
+        registry = shared_model_registry()
+        self.base_model = registry.acquire()
+        # selfを捕まえるとC++側破棄後に触れてしまうため、registryだけを束縛する
+        self.destroyed.connect(lambda *_: registry.release())
+        # v12.12 応答しなくなった/戻ったマウントを表示に反映する
+        shared_stat_service().mountReachabilityChanged.connect(self._on_mount_reachability_changed)
         
         # 状態変数
         self.display_mode = 0  
         self.show_hidden = False
         self.current_sort_col = 0
         self.sort_order = Qt.AscendingOrder
+        # v12.2 ビューのデータ供給元: "flat" = 軽量フラットモデル, "qfs" = 共有QFileSystemModel
+        self.model_backend = "flat"
+        # v12.6 フラットモデルで Size/Date を表示中の行だけ遅延取得する（巨大・低速ディスク向け）
+        self.lazy_stat = True
+        # v12.8 名前を自然順 ("file2" < "file10") で並べる（フラットモデルのみ）
+        self.natural_sort = True
+        # v12.18 検索ボックスをあいまい照合（点数順の表示）にする
+        self.fuzzy_search = False
+        # v12.20 QFileSystemModel のビューで検索がターゲットの何段下まで見るか（0 = 直下だけ）
+        self.search_depth = 0
+        # v12.23 Size 列を出し、フォルダには以下の合計（裏で集計）を表示する
+        self.folder_sizes = False
         
         self.views = [] # (view, proxy, path, sep_widget) のタプルを保持
         self.current_paths = []
@@ -310,7 +349,9 @@ class FilePane(QFrame):
             self.header.setStyleSheet("background: #252526; border-bottom: 1px solid #333;")
             self.up_btn.setStyleSheet("border: none; color: #555; background: transparent;")
 
-    def display_folders(self, paths):
+    def display_folders(self, paths, backend=None):
+        if backend is not None:
+            self.model_backend = backend
         self.current_paths = [os.path.abspath(p) for p in paths]
         # v7.2 マーク機能の参照を確実にリンクする（タブ間移動などで親が変わる可能性に備え）
         if self._marked_paths_ref is None and hasattr(self, 'parent_lane'):
@@ -320,6 +361,8 @@ class FilePane(QFrame):
         if not paths:
             self.title_label.setText("...waiting for flow")
             # 全クリア
+            for _, proxy, _, _ in self.views:
+                self._release_view_model(proxy)
             while self.content_splitter.count():
                 w = self.content_splitter.widget(0)
                 w.setParent(None)
@@ -335,14 +378,16 @@ class FilePane(QFrame):
         # 1. 削除処理: 新しいパスに含まれない既存Viewを削除
         # 逆順で消さないとインデックスがずれる可能性があるが、リストから消すので注意
         new_path_set = set(self.current_paths)
+        policy = shared_io_policy()
         i = len(self.views) - 1
         while i >= 0:
             view, proxy, path, sep = self.views[i]
-            if path not in new_path_set:
+            if path not in new_path_set or self._view_backend(proxy) != self._backend_for(policy.profile_for(path)):
                 # コンテナ（Viewの親）を削除する必要がある
                 # sepがある場合、それはitem_containerの中にあるので一緒に消えるはず
                 # view.parent() は item_container
                 container = view.parentWidget() # QFrame
+                self._release_view_model(proxy)
                 if container:
                     container.setParent(None)
                     container.deleteLater()
@@ -363,8 +408,18 @@ class FilePane(QFrame):
         new_views_list = []
 
         # 2. 追加・並び替え処理
+        stat = shared_stat_service()
         for i, path in enumerate(self.current_paths):
-            if not os.path.exists(path): continue
+            # v12.13 マウントの種類（ローカル/ネットワーク/FUSE）でビューの I/O プロファイルを決める
+            mount = policy.mount_for(path)
+            profile = policy.profile_for_mount(mount)
+            stat.set_mount_timeout(mount.mount_point, profile.stat_timeout_ms)
+            backend = self._backend_for(profile)
+            # v12.12 存在確認はタイムアウト付き。応答のないマウントは QFileSystemModel が
+            # GUI スレッドで固まるため qfs では表示しない（flat は列挙がワーカーなので表示できる）
+            state = stat.state(path)
+            if state == PATH_MISSING: continue
+            if state == PATH_UNREACHABLE and backend != "flat": continue
             
             # 既存にあるか？
             if path in existing_map:
@@ -415,11 +470,13 @@ class FilePane(QFrame):
                     item_layout.addWidget(sep)
 
                 # Proxy作成
-                proxy = SmartSortFilterProxyModel()
-                proxy.setSourceModel(self.base_model)
+                proxy = self._create_proxy(path, profile)
                 proxy.setTargetRootPath(path)
                 proxy.setDisplayMode(self.display_mode)
                 proxy.setShowHidden(self.show_hidden)
+                proxy.setFuzzyMatching(self.fuzzy_search)
+                proxy.setSearchDepth(self.search_depth)
+                proxy.setFolderSizes(self.folder_sizes)
                 # v7.2 マーク共有（実体への参照を渡す）
                 if self._marked_paths_ref is None and hasattr(self, 'parent_lane'):
                     self._marked_paths_ref = self.parent_lane.parent_area.marked_paths
@@ -428,10 +485,7 @@ class FilePane(QFrame):
 
                 view = BatchTreeView(self)
                 view.setModel(proxy)
-                
-                source_idx = self.base_model.index(path)
-                proxy_idx = proxy.mapFromSource(source_idx)
-                view.setRootIndex(proxy_idx)
+                view.setRootIndex(proxy.proxyIndexForPath(path))
                 
                 view.setSortingEnabled(True)
                 view.setItemsExpandable(False) 
@@ -443,15 +497,17 @@ class FilePane(QFrame):
                 view.setHeaderHidden(False)
                 view.setIndentation(0)
                 
-                view.hideColumn(1) 
+                view.setColumnHidden(1, not self.folder_sizes) # v12.23 フォルダの合計を出すときだけ Size 列を表示
                 
                 # Header Resizing Strategy (v12.0)
                 header = view.header()
                 header.setSectionResizeMode(0, QHeaderView.Stretch)       # Name: 余白を埋める
+                header.setSectionResizeMode(1, QHeaderView.Interactive)   # v12.23 フォルダの合計
                 header.setSectionResizeMode(2, QHeaderView.Interactive)   # Size: ユーザー可変 (初期値固定)
                 header.setSectionResizeMode(3, QHeaderView.Interactive)   # Date: ユーザー可変 (初期値固定)
                 
                 # 初期幅の設定
+                view.setColumnWidth(1, 150)
                 view.setColumnWidth(2, 80)
                 view.setColumnWidth(3, 140)
                 
@@ -518,18 +574,97 @@ class FilePane(QFrame):
             
         self.update_header_title()
 
+    def _create_proxy(self, path, profile):
+        """v12.8 ビュー1つ分の Proxy とデータ供給元を作る（フラットモデルは並び替えを自前で行う）"""
+        backend = self._backend_for(profile)
+        proxy = FlatProxyModel() if backend == "flat" else SmartSortFilterProxyModel()
+        proxy.setSourceModel(self._create_source_model(path, proxy, backend, profile))
+        return proxy
+
+    def _backend_for(self, profile):
+        """
+        v12.13 ビューに使うバックエンド。控えめなプロファイルのマウントでは、
+        列挙や stat の量を制御できない QFileSystemModel ではなく常にフラットモデルを使う。
+        """
+        return "flat" if profile.force_flat else self.model_backend
+
+    def _create_source_model(self, path, proxy, backend, profile):
+        """v12.2 ビュー1つ分のデータ供給元を作る（バックエンド設定に従う）"""
+        if backend == "flat":
+            # Proxyを親にして、ビュー破棄時に一緒に消えるようにする
+            model = FlatDirectoryModel(path, parent=proxy, lazy_stat=self.lazy_stat,
+                                       natural_sort=self.natural_sort, io_profile=profile)
+            # v12.3 非同期列挙の進捗をヘッダーに出す
+            model.loadingProgress.connect(lambda *_: self.update_header_title())
+            model.loadingFinished.connect(lambda *_: self.update_header_title())
+            model.statProgress.connect(lambda *_: self.update_header_title())
+            return model
+        return self.base_model
+
+    def prefetch_index(self, view, proxy_index):
+        """
+        v12.5 ビュー上の行がフォルダなら、下流ペイン用に一覧を先読みする。
+        フォルダ以外の行に移ったときは、前の行の先読みを止める。
+        """
+        prefetcher = shared_prefetcher()
+        if not proxy_index.isValid():
+            prefetcher.cancel()
+            return
+        proxy = view.model()
+        model = proxy.sourceModel() if proxy else None
+        if not isinstance(model, FlatDirectoryModel):
+            prefetcher.cancel()
+            return # QFileSystemModel は自前でキャッシュするので対象外
+        src = proxy.mapToSource(proxy_index)
+        if not model.isDir(src):
+            prefetcher.cancel()
+            return
+        path = model.filePath(src)
+        # v12.13 ネットワーク/FUSE 上では投機的な列挙をしない
+        profile = shared_io_policy().profile_for(path)
+        if not profile.prefetch:
+            prefetcher.cancel()
+            return
+        # 下流ペインのモデルと同じ粒度で列挙する（遅延statなら size/mtime を取らない）
+        prefetcher.request(path, with_stat=not (self.lazy_stat or profile.lazy_stat))
+
+    def _release_view_model(self, proxy):
+        """v12.11 外すビューのフラットモデルの監視と列挙を、deleteLater を待たずに止める"""
+        model = proxy.sourceModel() if proxy else None
+        if isinstance(model, FlatDirectoryModel):
+            model.stopWatching()
+            model.cancelLoading()
+
+    def _on_mount_reachability_changed(self, mount_point, reachable):
+        """v12.12 マウントが応答を取り戻したら、表示できずにいたフォルダを開き直す"""
+        if reachable and len(self.views) < len(self.current_paths):
+            self.display_folders(self.current_paths)
+        else:
+            self.update_header_title()
+
+    def _view_backend(self, proxy):
+        return "flat" if isinstance(proxy.sourceModel(), FlatDirectoryModel) else "qfs"
+
     def get_state(self):
         """現在のペインの状態を辞書で返す（セッション保存用）"""
         # pathsは現在のcurrent_pathsを使う
         # ただし、有効なパスのみ
-        valid_paths = [p for p in self.current_paths if os.path.exists(p)]
+        # v12.12 応答のないマウント上のパスは、次回の起動で開けるかもしれないので残す
+        stat = shared_stat_service()
+        valid_paths = [p for p in self.current_paths if stat.state(p) != PATH_MISSING]
         return {
             "paths": valid_paths,
             "display_mode": self.display_mode,
             "show_hidden": self.show_hidden,
             "sort_col": self.current_sort_col,
             "sort_order": self.sort_order.value, # Enum to int
-            "is_compact": self.is_compact
+            "is_compact": self.is_compact,
+            "model_backend": self.model_backend,
+            "lazy_stat": self.lazy_stat,
+            "natural_sort": self.natural_sort,
+            "fuzzy_search": self.fuzzy_search,
+            "search_depth": self.search_depth,
+            "folder_sizes": self.folder_sizes
         }
 
     def restore_state(self, state):
@@ -539,6 +674,13 @@ class FilePane(QFrame):
         self.current_sort_col = state.get("sort_col", 0)
         self.sort_order = Qt.SortOrder(state.get("sort_order", 0))
         self.is_compact = state.get("is_compact", False)
+        self.model_backend = state.get("model_backend", "flat")
+        self.lazy_stat = state.get("lazy_stat", True)
+        self.natural_sort = state.get("natural_sort", True)
+        self.fuzzy_search = state.get("fuzzy_search", False)
+        self.search_depth = state.get("search_depth", 0)
+        self.folder_sizes = state.get("folder_sizes", False)
+        self.search_box.setPlaceholderText("Fuzzy..." if self.fuzzy_search else "Search...")
         
         paths = state.get("paths", [])
         if paths:
@@ -547,6 +689,15 @@ class FilePane(QFrame):
             # デフォルト
             self.display_folders([os.path.abspath(".")])
 
+    def _present_paths(self, paths):
+        """
+        v12.12 メニュー用に、消えた・応答のないマウント上のパスを除く。
+        マークは数千件になり得るので1件ずつ stat を待たず、キャッシュにないものは残す
+        （確認は裏で進み、次にメニューを開くときには反映される）
+        """
+        stat = shared_stat_service()
+        return [p for p in paths if stat.state(p, wait=False) not in (PATH_MISSING, PATH_UNREACHABLE)]
+
     def open_context_menu(self, pos, view, proxy):
         index = view.indexAt(pos)
         
@@ -560,15 +711,16 @@ class FilePane(QFrame):
                 if row not in processed_rows:
                     processed_rows.add(row)
                     col0_idx = idx.siblingAtColumn(0)
-                    all_selected_paths.append(self.base_model.filePath(p.mapToSource(col0_idx)))
+                    all_selected_paths.append(p.sourceModel().filePath(p.mapToSource(col0_idx)))
         
         # 重複排除と存在確認
-        paths = list(set([p for p in all_selected_paths if os.path.exists(p)]))
+        stat = shared_stat_service()
+        paths = self._present_paths(set(all_selected_paths))
         
         # v7.2 マーク済みのアイテム（バケツ）を取得（全タブ/ペイン横断）
         marked_list = []
         if self._marked_paths_ref:
-            marked_list = [p for p in self._marked_paths_ref if os.path.exists(p)]
+            marked_list = self._present_paths(self._marked_paths_ref)
         
         # 従来の単体View用セレクション情報
         selection = self.get_selection_info(view, proxy)
@@ -585,7 +737,8 @@ class FilePane(QFrame):
             
             # PDF変換
             office_exts = ('.docx', '.doc', '.xlsx', '.xls')
-            marked_office = [p for p in marked_list if not os.path.isdir(p) and p.lower().endswith(office_exts)]
+            marked_office = [p for p in marked_list
+                             if p.lower().endswith(office_exts) and stat.state(p, wait=False) != PATH_DIR]
             if marked_office:
                 act = QAction(f"Convert {len(marked_office)} marked office files to PDF", self)
                 act.triggered.connect(lambda: self.action_convert_to_pdf(marked_office))
@@ -599,6 +752,16 @@ class FilePane(QFrame):
             move_batch_act = QAction(f"Cut/Move {len(marked_list)} marked items", self)
             move_batch_act.triggered.connect(lambda: self.action_aggregate_clipboard(marked_list, "move"))
             batch_menu.addAction(move_batch_act)
+
+            # v12.19 マーク済みアイテムの中身を検索
+            grep_batch_act = QAction(f"Search in {len(marked_list)} marked items...", self)
+            grep_batch_act.triggered.connect(lambda: self.action_content_search(marked_list))
+            batch_menu.addAction(grep_batch_act)
+
+            # v12.21 マーク済みアイテムの中の重複ファイル
+            dupes_batch_act = QAction(f"Find Duplicates in {len(marked_list)} marked items...", self)
+            dupes_batch_act.triggered.connect(lambda: self.action_find_duplicates(marked_list))
+            batch_menu.addAction(dupes_batch_act)
             
             batch_menu.addSeparator()
             clear_mark_act = QAction("Clear All Marks", self)
@@ -647,13 +810,18 @@ class FilePane(QFrame):
         
         # 編集系
         new_folder_act = QAction("New Folder", self)
+        grep_act = QAction("Search in Files...\tCtrl+Shift+F", self) # v12.19
+        du_act = QAction("Analyze Disk Usage...", self) # v12.22
+        sizes_act = QAction("Show Folder Sizes", self) # v12.23
+        sizes_act.setCheckable(True)
+        sizes_act.setChecked(self.folder_sizes)
         rename_act = QAction("Rename", self)
         delete_act = QAction("Delete", self)
         fav_act = QAction("Add to Favorites", self)
         
         # v6.2 Cut/Copy/Paste
-        num_files = len([p for p in paths if not os.path.isdir(p)])
-        num_dirs = len([p for p in paths if os.path.isdir(p)])
+        num_dirs = len([p for p in paths if stat.is_dir(p)])
+        num_files = len(paths) - num_dirs
         
         # メニューラベルの動的生成
         label_suffix = ""
@@ -669,7 +837,7 @@ class FilePane(QFrame):
 
         # v7.0 PDF Conversion
         office_extensions = ('.docx', '.doc', '.xlsx', '.xls')
-        office_files = [p for p in paths if not os.path.isdir(p) and p.lower().endswith(office_extensions)]
+        office_files = [p for p in paths if p.lower().endswith(office_extensions) and not stat.is_dir(p)]
         
         show_pdf_convert = len(office_files) > 0
         pdf_label = "Convert to PDF"
@@ -687,7 +855,7 @@ class FilePane(QFrame):
             menu.addAction(open_act)
             if show_pdf_convert:
                 menu.addAction(pdf_convert_act)
-            if len(paths) == 1 and not os.path.isdir(paths[0]):
+            if len(paths) == 1 and not stat.is_dir(paths[0]):
                 open_with_act = QAction("Open with...", self)
                 open_with_act.triggered.connect(lambda checked=False, p=paths[0]: self.open_with_dialog(p))
                 menu.addAction(open_with_act)
@@ -722,6 +890,10 @@ class FilePane(QFrame):
             copy_menu.addAction(cp_unix)
 
             menu.addAction(term_act)
+            # v12.21 選択したフォルダ・ファイルの中の重複ファイル
+            dupes_act = QAction("Find Duplicates...", self)
+            dupes_act.triggered.connect(lambda: self.action_find_duplicates(paths))
+            menu.addAction(dupes_act)
             menu.addSeparator()
             menu.addAction(zip_act)
             if selection["has_zip"]:
@@ -729,6 +901,9 @@ class FilePane(QFrame):
             menu.addSeparator()
             
         menu.addAction(new_folder_act)
+        menu.addAction(grep_act)
+        menu.addAction(du_act)
+        menu.addAction(sizes_act)
         menu.addSeparator()
         if paths:
             menu.addAction(cut_act)
@@ -772,6 +947,13 @@ class FilePane(QFrame):
             self.action_unzip(selection)
         elif action == new_folder_act:
             self.action_new_folder(view, proxy)
+        elif action == grep_act:
+            self.action_content_search()
+        elif action == sizes_act:
+            self.toggle_folder_sizes()
+        elif action == du_act:
+            # 1つだけ選んだフォルダ、なければ表示中のフォルダ
+            self.action_disk_usage(paths[0] if len(paths) == 1 and num_dirs == 1 else None)
         elif action == rename_act:
             self.action_rename()
         elif action == delete_act:
@@ -786,7 +968,7 @@ class FilePane(QFrame):
             # 貼り付け先: 右クリックしたアイテムがフォルダならその中
             dest_dir = None
             if index.isValid():
-                p_under_mouse = self.base_model.filePath(proxy.mapToSource(index))
+                p_under_mouse = proxy.sourceModel().filePath(proxy.mapToSource(index))
                 if os.path.isdir(p_under_mouse):
                     dest_dir = p_under_mouse
             self.action_paste(dest_dir)
@@ -890,15 +1072,16 @@ class FilePane(QFrame):
         has_zip = False
         if view:
             selected_indexes = view.selectionModel().selectedRows()
+            model = proxy.sourceModel()
             for idx in selected_indexes:
                 src_idx = proxy.mapToSource(idx)
-                path = self.base_model.filePath(src_idx)
-                if os.path.exists(path):
-                    paths.append(path)
-                    is_dir = os.path.isdir(path)
-                    full_infos.append({"index": src_idx, "path": path, "is_dir": is_dir})
-                    if not is_dir and path.lower().endswith('.zip'):
-                        has_zip = True
+                # v12.12 モデルに載っている行なので、種別はモデルが持っている情報を使う（stat しない）
+                path = model.filePath(src_idx)
+                paths.append(path)
+                is_dir = model.isDir(src_idx)
+                full_infos.append({"index": src_idx, "model": model, "path": path, "is_dir": is_dir})
+                if not is_dir and path.lower().endswith('.zip'):
+                    has_zip = True
         return {"paths": paths, "full_infos": full_infos, "has_zip": has_zip, "view": view, "proxy": proxy}
 
     def action_aggregate_clipboard(self, paths, mode):
@@ -928,10 +1111,9 @@ class FilePane(QFrame):
         
         # v7.2 収集コピー起動時はマークをクリア
         if self._marked_paths_ref:
-            for p in final_list:
-                if p in self._marked_paths_ref:
-                    self._marked_paths_ref.remove(p)
-            self.refresh_all_views_in_tab()
+            removed = [p for p in final_list if p in self._marked_paths_ref]
+            self._marked_paths_ref.difference_update(removed)
+            self.refresh_marks(removed)
 
     def action_cut(self):
         info = self.get_selection_info()
@@ -962,14 +1144,14 @@ class FilePane(QFrame):
             ret = QMessageBox.question(self, "Delete", f"Are you sure you want to delete {len(paths)} items?", QMessageBox.Yes | QMessageBox.No)
             if ret == QMessageBox.Yes:
                 for item in info["full_infos"]:
-                    self.base_model.remove(item["index"])
+                    item["model"].remove(item["index"])
 
     def action_rename(self):
         info = self.get_selection_info()
         if info["view"]:
             idx = info["view"].currentIndex()
             if idx.isValid():
-                info["view"].edit(idx)
+                info["view"].edit(idx.siblingAtColumn(0)) # 編集できるのは Name 列だけ
 
     def action_new_folder(self, view=None, proxy=None):
         if view is None or proxy is None:
@@ -980,7 +1162,7 @@ class FilePane(QFrame):
             src_root_idx = proxy.mapToSource(view.rootIndex())
             name, ok = QInputDialog.getText(self, "New Folder", "Folder Name:")
             if ok and name:
-                self.base_model.mkdir(src_root_idx, name)
+                proxy.sourceModel().mkdir(src_root_idx, name)
 
     def action_terminal(self, paths):
         target_dir = paths[0] if paths and os.path.isdir(paths[0]) else os.path.dirname(paths[0]) if paths else self.current_paths[0]
@@ -1090,19 +1272,41 @@ class FilePane(QFrame):
 
     def update_header_title(self):
         titles = []
+        stat = shared_stat_service()
         for p in self.current_paths:
             name = os.path.basename(p) if os.path.basename(p) else p
+            if stat.is_unreachable(p):
+                name += " (unreachable)" # v12.12
             titles.append(name)
         
         mode_text = ["All", "Dirs", "Files"][self.display_mode]
         hidden_text = "+H" if self.show_hidden else ""
-        col_names = {0: "Name", 2: "Type", 3: "Date"}
+        col_names = {0: "Name", 1: "Size", 2: "Type", 3: "Date"}
         sort_name = col_names.get(self.current_sort_col, "?")
+        if self.current_sort_col == 0 and self.natural_sort and self.model_backend == "flat":
+            sort_name = "Natural"
         order_text = "ASC" if self.sort_order == Qt.AscendingOrder else "DESC"
         
-        tag = f"[{mode_text}{' ' + hidden_text if hidden_text else ''} | {sort_name} {order_text}]"
+        fuzzy_text = " | Fuzzy" if self.fuzzy_search else ""
+        tag = f"[{mode_text}{' ' + hidden_text if hidden_text else ''} | {sort_name} {order_text}{fuzzy_text}]"
         compact_tag = " (COMPACT)" if self.is_compact else ""
-        self.title_label.setText(f"{tag}{compact_tag}  " + " + ".join(titles) if titles else "Empty")
+        
+        # v12.3 バックグラウンド列挙中は件数を表示
+        loading_tag = ""
+        loading_models = [p.sourceModel() for _, p, _, _ in self.views
+                          if isinstance(p.sourceModel(), FlatDirectoryModel) and p.sourceModel().isLoading()]
+        if loading_models:
+            loaded = sum(m.loadedCount() for m in loading_models)
+            loading_tag = f"  loading {loaded:,}…"
+        # v12.6 サイズ/日付ソートのための一括stat中は進捗を表示
+        stat_progress = [p.sourceModel().statProgressInfo() for _, p, _, _ in self.views
+                         if isinstance(p.sourceModel(), FlatDirectoryModel)]
+        stat_progress = [sp for sp in stat_progress if sp]
+        if stat_progress:
+            done = sum(d for d, _ in stat_progress)
+            total = sum(t for _, t in stat_progress)
+            loading_tag += f"  stat {done:,}/{total:,}…"
+        self.title_label.setText(f"{tag}{compact_tag}  " + " + ".join(titles) + loading_tag if titles else "Empty")
 
     def toggle_sort(self, col):
         current_col = self.current_sort_col
@@ -1120,6 +1324,34 @@ class FilePane(QFrame):
             
         self.update_header_title()
 
+    def toggle_natural_sort(self):
+        """v12.8 名前の自然順ソートの ON/OFF"""
+        self.natural_sort = not self.natural_sort
+        for _, proxy, _, _ in self.views:
+            model = proxy.sourceModel()
+            if isinstance(model, FlatDirectoryModel):
+                model.setNaturalSort(self.natural_sort)
+        self.update_header_title()
+
+    def toggle_fuzzy_search(self):
+        """v12.18 検索ボックスの照合を部分一致/あいまい照合（点数順）で切り替える"""
+        self.fuzzy_search = not self.fuzzy_search
+        self.search_box.setPlaceholderText("Fuzzy..." if self.fuzzy_search else "Search...")
+        self.name_search.cancel()
+        for view, proxy, path, _ in self.views:
+            proxy.setFuzzyMatching(self.fuzzy_search) # その場では行ごとの照合だけ
+            view.setRootIndex(proxy.proxyIndexForPath(path))
+        if self.search_box.text():
+            self.on_search_text_changed(self.search_box.text()) # 一覧との照合はワーカーで
+        self.update_header_title()
+
+    def toggle_folder_sizes(self):
+        """v12.23 Size 列（フォルダは以下の合計・項目数）の表示を切り替える"""
+        self.folder_sizes = not self.folder_sizes
+        for view, proxy, _, _ in self.views:
+            proxy.setFolderSizes(self.folder_sizes)
+            view.setColumnHidden(1, not self.folder_sizes)
+
     def cycle_display_mode(self):
         self.display_mode = (self.display_mode + 1) % 3
         # モード切替時にViewがルート(My Computer)に飛ぶのを防ぐため、
@@ -1128,9 +1360,7 @@ class FilePane(QFrame):
             proxy.setDisplayMode(self.display_mode)
             
             # 再設定
-            source_idx = self.base_model.index(path)
-            proxy_idx = proxy.mapFromSource(source_idx)
-            view.setRootIndex(proxy_idx)
+            view.setRootIndex(proxy.proxyIndexForPath(path))
             
         self.update_header_title()
 
@@ -1139,9 +1369,7 @@ class FilePane(QFrame):
         for i, (view, proxy, path, _) in enumerate(self.views):
             proxy.setShowHidden(self.show_hidden)
             # 再設定
-            source_idx = self.base_model.index(path)
-            proxy_idx = proxy.mapFromSource(source_idx)
-            view.setRootIndex(proxy_idx)
+            view.setRootIndex(proxy.proxyIndexForPath(path))
             
         self.update_header_title()
 
@@ -1151,8 +1379,9 @@ class FilePane(QFrame):
             for idx in view.selectionModel().selectedRows():
                 # ProxyインデックスなのでSourceに戻してパス取得
                 source_idx = proxy.mapToSource(idx)
-                p = self.base_model.filePath(source_idx)
-                if os.path.isdir(p): current_selected.append(p)
+                # v12.12 フォルダ判定はモデルの情報で行う（GUI スレッドで stat しない）
+                if proxy.sourceModel().isDir(source_idx):
+                    current_selected.append(proxy.sourceModel().filePath(source_idx))
         
         if not current_selected:
             # 選択解除された場合、空にするかどうかは要検討だが、
@@ -1202,7 +1431,7 @@ class FilePane(QFrame):
                 break
         if target_proxy:
             source_idx = target_proxy.mapToSource(index)
-            path = os.path.abspath(self.base_model.filePath(source_idx))
+            path = os.path.abspath(target_proxy.sourceModel().filePath(source_idx))
             
             # v7.2 Alt + Click でマーク処理
             if QApplication.keyboardModifiers() & Qt.AltModifier and self._marked_paths_ref is not None:
@@ -1210,26 +1439,33 @@ class FilePane(QFrame):
                     self._marked_paths_ref.remove(path)
                 else:
                     self._marked_paths_ref.add(path)
-                # 全Viewの表示を更新するためにinvalidateをかける
-                self.refresh_all_views_in_tab()
+                self.refresh_marks([path])
                 return # Altクリック時は通常のプレビュー更新などはしない（邪魔しない）
 
             self.parent_filer.update_preview(path)
             self.parent_filer.update_address_bar(path)
 
-    def refresh_all_views_in_tab(self):
-        """タブ内の全ペインの全Viewの見た目をリフレッシュ（マーク色反映用）"""
-        if hasattr(self, 'parent_lane') and hasattr(self.parent_lane, 'parent_area'):
-            area = self.parent_lane.parent_area
-            for lane in area.lanes:
-                for pane in lane.panes:
-                    for _, p, _, _ in pane.views:
-                        p.invalidate()
+    def refresh_marks(self, paths):
+        """
+        v12.25 マークを付け外ししたパスを、フォルダごとにまとめてタブ内の全Viewへ差分で知らせる。
+        各プロキシは自分に出ている行だけ dataChanged を出す（layoutChanged で全Viewを組み直さない）
+        """
+        if not paths or not hasattr(self, 'parent_lane') or not hasattr(self.parent_lane, 'parent_area'):
+            return
+        changed = defaultdict(list)
+        for path in paths:
+            changed[os.path.dirname(path)].append(path)
+        area = self.parent_lane.parent_area
+        for lane in area.lanes:
+            for pane in lane.panes:
+                for _, p, _, _ in pane.views:
+                    p.updateMarks(changed)
 
     def clear_all_marks(self):
         if self._marked_paths_ref is not None:
+            removed = list(self._marked_paths_ref)
             self._marked_paths_ref.clear()
-            self.refresh_all_views_in_tab()
+            self.refresh_marks(removed)
 
     def get_current_selected_path(self):
         """現在選択されているアイテムのパスを返す（QuickLook用）"""
@@ -1241,7 +1477,7 @@ class FilePane(QFrame):
                 # 最後の選択を取得
                 idx = sel[-1]
                 source_idx = proxy.mapToSource(idx)
-                return self.base_model.filePath(source_idx)
+                return proxy.sourceModel().filePath(source_idx)
         return None
 
     def on_double_clicked(self, index, view):
@@ -1252,7 +1488,7 @@ class FilePane(QFrame):
             
         if target_proxy:
             source_idx = target_proxy.mapToSource(index)
-            path = self.base_model.filePath(source_idx)
+            path = target_proxy.sourceModel().filePath(source_idx)
             
             if os.path.isdir(path):
                 # フォルダなら下流ペインへ遷移
@@ -1270,14 +1506,44 @@ class FilePane(QFrame):
                     QDesktopServices.openUrl(QUrl.fromLocalFile(path))
 
     def on_search_text_changed(self, text):
-        """インクリメンタルサーチ実行"""
-        for i, (view, proxy, path, _) in enumerate(self.views):
-            proxy.setSearchText(text)
+        """
+        インクリメンタルサーチ実行
+        v12.15 キー入力ごとには絞り込まず、入力が止まってからワーカーで一覧のスナップショットと
+        照合し、結果を各ビューへ1回で反映する（入力が続けば古い照合は捨てる）。
+        クリアは待たずに即座に戻す。
+        """
+        if not text:
+            self.name_search.cancel()
+            for view, proxy, path, _ in self.views:
+                proxy.setSearchText("")
+                view.setRootIndex(proxy.proxyIndexForPath(path))
+            return
+        # v12.16 どのビューも同じクエリの結果を覚えていれば（バックスペースなど）、待たずに反映する
+        cached = [(view, proxy, path, proxy.cachedSearchResult(text)) for view, proxy, path, _ in self.views]
+        if cached and all(result is not None for *_, result in cached):
+            self.name_search.cancel()
+            for view, proxy, path, result in cached:
+                proxy.applySearchResult(result)
+                view.setRootIndex(proxy.proxyIndexForPath(path))
+            return
+        self.name_search.request(text, lambda: [((id(proxy), path), proxy.searchJob(text))
+                                                for _, proxy, path, _ in self.views])
+
+    def _on_search_results(self, text, results):
+        """v12.15 ワーカーで照合した結果を反映する"""
+        if text != self.search_box.text():
+            return
+        by_view = dict(results)
+        for view, proxy, path, _ in self.views:
+            result = by_view.get((id(proxy), path))
+            if result is not None:
+                proxy.applySearchResult(result)
+            else:
+                # 照合中に開かれたビュー、またはワーカーで一覧を読めなかった: プロキシ内で絞り込む
+                proxy.setSearchText(text)
             # フィルタ変更によるルートロスト防止：位置を再固定
-            source_idx = self.base_model.index(path)
-            proxy_idx = proxy.mapFromSource(source_idx)
-            view.setRootIndex(proxy_idx)
-            
+            view.setRootIndex(proxy.proxyIndexForPath(path))
+
     def focus_search(self):
         self.search_box.setFocus()
         self.search_box.selectAll()
@@ -1285,6 +1551,37 @@ class FilePane(QFrame):
     def clear_search(self):
         self.search_box.clear()
 
+    def action_content_search(self, paths=None):
+        """v12.19 表示中のフォルダ（paths 指定時はそのパス、マーク済みなど）以下のファイル内容を検索する"""
+        if paths is None:
+            stat = shared_stat_service()
+            paths = [p for p in self.current_paths if stat.state(p) not in (PATH_MISSING, PATH_UNREACHABLE)]
+        if not paths:
+            return
+        window = ContentSearchWindow(self.parent_filer, paths, self.window())
+        window.show()
+
+    def action_find_duplicates(self, paths):
+        """v12.21 paths（選択またはマーク済みアイテム）以下の重複ファイルを探す"""
+        if not paths:
+            return
+        if self._marked_paths_ref is None and hasattr(self, 'parent_lane'):
+            self._marked_paths_ref = self.parent_lane.parent_area.marked_paths
+        window = DuplicatesWindow(self, paths, self._marked_paths_ref if self._marked_paths_ref is not None else set(),
+                                  self.window())
+        window.show()
+
+    def action_disk_usage(self, path=None):
+        """v12.22 path（省略時は表示中のフォルダ）以下の使用量の内訳を表示する"""
+        if path is None:
+            stat = shared_stat_service()
+            folders = [p for p in self.current_paths if stat.state(p) not in (PATH_MISSING, PATH_UNREACHABLE)]
+            if not folders:
+                return
+            path = folders[0]
+        window = DiskUsageWindow(self, path, self.window())
+        window.show()
+
     def action_mark_selected(self, paths, mark=True):
         """v7.3 選択したアイテムを一括でマーク/マーク解除する"""
         if not paths: return
@@ -1296,31 +1593,15 @@ class FilePane(QFrame):
         
         if self._marked_paths_ref is None: return
 
-        changed = False
-        for p in paths:
-            # パスを正規化（絶対パス）して使用する
-            p_abs = os.path.abspath(p)
-            if mark:
-                if p_abs not in self._marked_paths_ref:
-                    self._marked_paths_ref.add(p_abs)
-                    changed = True
-            else:
-                if p_abs in self._marked_paths_ref:
-                    self._marked_paths_ref.remove(p_abs)
-                    changed = True
-        
-        if changed:
-            self.refresh_all_views_in_tab()
-
-    def refresh_all_views_in_tab(self):
-        """タブ内の全ペインの全Viewの見た目をリフレッシュ（マーク色反映用）"""
-        if hasattr(self, 'parent_lane') and hasattr(self.parent_lane, 'parent_area'):
-            area = self.parent_lane.parent_area
-            for lane in area.lanes:
-                for pane in lane.panes:
-                    for _, p, _, _ in pane.views:
-                        # 色の変更（data関数の結果変更）を反映させるには layoutChanged が確実
-                        p.layoutChanged.emit()
+        # パスを正規化（絶対パス）して使用する。変わった分だけをまとめて1回で知らせる (v12.25)
+        marked = self._marked_paths_ref
+        paths = {os.path.abspath(p) for p in paths}
+        changed = paths - marked if mark else paths & marked
+        if mark:
+            marked.update(changed)
+        else:
+            marked.difference_update(changed)
+        self.refresh_marks(changed)
 
     def action_convert_to_pdf(self, paths):
         """v7.1 Hybrid PDF Conversion (MS Office -> LibreOffice)"""
@@ -1379,10 +1660,9 @@ class FilePane(QFrame):
                 # v7.2 バッチ処理成功後にマークを解除（もしカゴから実行された場合）
                 if hasattr(self, '_marked_paths_ref') and self._marked_paths_ref:
                     # 変換に成功したパス（または渡されたパス全体）をマークから消す
-                    for p in paths:
-                        if p in self._marked_paths_ref:
-                            self._marked_paths_ref.remove(p)
-                    self.refresh_all_views_in_tab()
+                    removed = [p for p in paths if p in self._marked_paths_ref]
+                    self._marked_paths_ref.difference_update(removed)
+                    self.refresh_marks(removed)
                 
             except Exception as e:
                 print(f"MS Office Dispatch failed or not installed: {e}")
@@ -1453,13 +1733,19 @@ class FilePane(QFrame):
         for i, info in enumerate(self.views):
             v, proxy, p = info[0], info[1], info[2]
             if v == view:
+                # v12.13 別のマウントへ移るときは I/O プロファイルとバックエンドを選び直す
+                if self._rebuild_for_mount(i, proxy, p, path):
+                    return
+                # v12.2 フラットモデルはモデル自体の中身を差し替える
+                model = proxy.sourceModel()
+                if isinstance(model, FlatDirectoryModel):
+                    model.setRootPath(path)
+                
                 # ターゲットルート更新（これを先にやらないとフィルタで弾かれてsetRootIndexが失敗する）
                 proxy.setTargetRootPath(path)
                 
                 # RootIndex更新
-                source_idx = self.base_model.index(path)
-                proxy_idx = proxy.mapFromSource(source_idx)
-                view.setRootIndex(proxy_idx)
+                view.setRootIndex(proxy.proxyIndexForPath(path))
                 
                 # タプルを更新 (view, proxy, path, sep)
                 new_info = list(info)
@@ -1470,6 +1756,31 @@ class FilePane(QFrame):
                 break
         self.update_header_title()
 
+    def _rebuild_for_mount(self, i, proxy, old_path, path):
+        """
+        v12.13 移動先のマウントのプロファイルが今のビューと異なれば、display_folders で
+        ビューを作り直して True を返す（同じプロファイルならモデルの差し替えで足りる）
+        """
+        policy = shared_io_policy()
+        mount = policy.mount_for(path)
+        if mount.mount_point == policy.mount_for(old_path).mount_point:
+            return False
+        profile = policy.profile_for_mount(mount)
+        model = proxy.sourceModel()
+        current = model.ioProfile() if isinstance(model, FlatDirectoryModel) else policy.profile_for(old_path)
+        if profile is current and self._view_backend(proxy) == self._backend_for(profile):
+            shared_stat_service().set_mount_timeout(mount.mount_point, profile.stat_timeout_ms)
+            return False
+        paths = list(self.current_paths)
+        paths[i] = path
+        self.display_folders(paths)
+        for v, _, p, _ in self.views:
+            if p == os.path.abspath(path):
+                v.setFocus()
+                break
+        self.parent_filer.update_address_bar(path)
+        return True
+
     def toggle_compact(self):
         self.is_compact = not self.is_compact
         for i, (view, proxy, path, sep) in enumerate(self.views):
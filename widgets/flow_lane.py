@@ -63,6 +63,13 @@ class FlowLane(QWidget):
             for i in range(1, len(self.panes)):
                 self.panes[i].display_folders([])
 
+    def display_chain(self, paths):
+        """v12.22 paths[i] を i 番目のペインに表示する（足りなければペインを足し、残りのペインはクリア）"""
+        while len(self.panes) < len(paths):
+            self.add_pane()
+        for i, pane in enumerate(self.panes):
+            pane.display_folders([paths[i]] if i < len(paths) else [])
+
     def update_downstream(self, source_pane, paths):
         if source_pane not in self.panes: return
         idx = self.panes.index(source_pane)
@@ -0,0 +1,138 @@
+import os
+from PySide6.QtWidgets import QFrame, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+from PySide6.QtCore import Qt, QTimer, QEvent
+
+from models.path_index import shared_path_index
+from models.icon_cache import shared_icon_cache
+
+
+class GlobalSearchPopup(QFrame):
+    """
+    v12.17 パス索引（PathIndex）を引く全体検索のポップアップ (Ctrl+P)。
+    入力を DEBOUNCE_MS だけ待ってから索引に問い合わせ、結果を一致の質の順に並べる。
+    Enter / ダブルクリックで、フォルダならそのフォルダ、ファイルなら親フォルダから表示し直す。
+    """
+    DEBOUNCE_MS = 60
+
+    def __init__(self, main_window):
+        super().__init__(main_window, Qt.Popup | Qt.FramelessWindowHint)
+        self.main_window = main_window
+        self.index = shared_path_index()
+        self._token = 0
+        self._shown_token = 0
+        self._open_when_ready = False # 検索待ちの間に Enter が押された
+        self.setObjectName("GlobalSearch")
+        self.setStyleSheet("""
+            QFrame#GlobalSearch { background-color: #252526; border: 1px solid #454545; border-radius: 6px; }
+            QLineEdit { background-color: #3c3c3c; color: #fff; border: 1px solid #007acc;
+                        padding: 6px 10px; border-radius: 4px; }
+            QListWidget { background: transparent; color: #ccc; outline: none; border: none; }
+            QListWidget::item { padding: 3px 6px; border-radius: 4px; }
+            QListWidget::item:selected { background-color: #094771; color: white; }
+            QLabel { color: #888; padding: 0 4px; }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        layout.setSpacing(6)
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("Search indexed paths...")
+        self.input.installEventFilter(self)
+        self.input.textChanged.connect(self.on_text_changed)
+        layout.addWidget(self.input)
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.open_item)
+        layout.addWidget(self.results)
+        self.status = QLabel()
+        layout.addWidget(self.status)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.run_query)
+        self.index.resultsReady.connect(self.on_results)
+        self.index.indexProgress.connect(self.update_status)
+        self.index.indexFinished.connect(self.update_status)
+
+    def popup(self):
+        """メインウィンドウの上部中央に開く"""
+        w = min(720, int(self.main_window.width() * 0.8))
+        h = min(480, int(self.main_window.height() * 0.7))
+        origin = self.main_window.mapToGlobal(self.main_window.rect().topLeft())
+        self.setGeometry(origin.x() + (self.main_window.width() - w) // 2, origin.y() + 60, w, h)
+        self.update_status()
+        self.show()
+        self.input.setFocus()
+        self.input.selectAll()
+
+    def on_text_changed(self, text):
+        if not text.strip():
+            self._timer.stop()
+            self._token = 0
+            self.results.clear()
+            self.update_status()
+            return
+        self._timer.start(self.DEBOUNCE_MS)
+
+    def run_query(self):
+        self._open_when_ready = False
+        self._token = self.index.query(self.input.text())
+
+    def on_results(self, token, results):
+        if token != self._token:
+            return
+        icons = shared_icon_cache()
+        self.results.setUpdatesEnabled(False)
+        self.results.clear()
+        for path, is_dir in results:
+            parent, name = os.path.split(path)
+            ext = "" if is_dir else os.path.splitext(name)[1][1:].upper()
+            item = QListWidgetItem(icons.icon(parent, name, is_dir, ext), f"{name}    {parent}")
+            item.setData(Qt.UserRole, (path, is_dir))
+            item.setToolTip(path)
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+        self.results.setUpdatesEnabled(True)
+        self._shown_token = token
+        self.update_status(hits=len(results))
+        if self._open_when_ready:
+            self._open_when_ready = False
+            self.open_item(self.results.currentItem())
+
+    def update_status(self, *_, hits=None):
+        roots = self.index.roots()
+        if not roots:
+            self.status.setText("No index roots (add favorites or index_roots.json)")
+            return
+        text = f"{self.index.entryCount():,} paths indexed in {len(roots)} root(s)"
+        if hits is not None:
+            text = f"{hits} hit(s) - " + text
+        self.status.setText(text)
+
+    def open_item(self, item):
+        if item is None:
+            return
+        path, is_dir = item.data(Qt.UserRole)
+        self.hide()
+        self.main_window.reset_flow_from(path if is_dir else os.path.dirname(path))
+
+    def eventFilter(self, obj, event):
+        if obj is self.input and event.type() == QEvent.KeyPress:
+            key = event.key()
+            if key in (Qt.Key_Down, Qt.Key_Up, Qt.Key_PageDown, Qt.Key_PageUp):
+                # 入力欄にフォーカスを置いたまま結果を選べるようにする
+                self.results.keyPressEvent(event)
+                return True
+            if key in (Qt.Key_Return, Qt.Key_Enter):
+                if self._timer.isActive():
+                    self._timer.stop()
+                    self.run_query()
+                if self._token and self._token != self._shown_token:
+                    self._open_when_ready = True # 結果が届いたら先頭を開く
+                    return True
+                self.open_item(self.results.currentItem())
+                return True
+            if key == Qt.Key_Escape:
+                self.hide()
+                return True
+        return super().eventFilter(obj, event)
@@ -2,13 +2,18 @@ import os
 import sys
 import json
 from PySide6.QtWidgets import (QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QSplitter, 
-                               QTabWidget, QTabBar, QApplication, QMenu, QInputDialog, QLineEdit)
-from PySide6.QtCore import Qt, QSize
+                               QTabWidget, QTabBar, QApplication, QMenu, QInputDialog, QLineEdit, QCompleter)
+from PySide6.QtCore import Qt, QSize, QStringListModel
 from PySide6.QtGui import QAction, QKeySequence, QShortcut, QIcon
 
 from .navigation_pane import NavigationPane
 from .quick_look import QuickLookWindow
 from .flow_area import FlowArea
+from .global_search import GlobalSearchPopup
+from models.path_index import shared_path_index, load_index_roots
+from models.name_search import NameSearch
+from models.path_jump import jump_candidates
+from models.stat_service import shared_stat_service, PATH_DIR, PATH_FILE
 
 class ChainFlowFiler(QMainWindow):
     def __init__(self):
@@ -74,6 +79,18 @@ class ChainFlowFiler(QMainWindow):
             }
         """)
         self.address_bar.returnPressed.connect(self.on_address_return)
+        # v12.18 存在しないパスを打つと、あいまい照合で移動先の候補（お気に入り・子フォルダ）を出す
+        self.jump_model = QStringListModel(self)
+        self.jump_completer = QCompleter(self.jump_model, self)
+        self.jump_completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.jump_completer.setWidget(self.address_bar)
+        self.jump_completer.activated.connect(self.on_jump_activated)
+        # 候補の列挙・照合は入力が落ち着いてからワーカーで行う（キー入力ごとに GUI スレッドで scandir しない）
+        self.jump_search = NameSearch(self)
+        self.jump_search.resultsReady.connect(self.on_jump_candidates)
+        self._jump_result = None            # 最後に届いた (テキスト, 状態, 候補)
+        self._open_jump_when_ready = False  # 候補を待っている間に Enter が押された
+        self.address_bar.textEdited.connect(self.update_jump_candidates)
         self.toolbar_layout.addWidget(self.address_bar)
         
         self.main_layout.addLayout(self.toolbar_layout)
@@ -104,6 +121,12 @@ class ChainFlowFiler(QMainWindow):
 
         # QuickLook (Hidden by default)
         self.quick_look = QuickLookWindow(self)
+
+        # v12.17 パス索引（index_roots.json が無ければお気に入りを索引する）と全体検索
+        self.index_roots = load_index_roots()
+        shared_path_index().setRoots(self.index_roots if self.index_roots is not None else self.nav.favorite_paths())
+        self.nav.favoritesChanged.connect(self.on_favorites_changed)
+        self.global_search = GlobalSearchPopup(self)
         
         # 初期タブ追加
         self.add_new_tab()
@@ -300,6 +323,7 @@ class ChainFlowFiler(QMainWindow):
         QShortcut(QKeySequence("Ctrl+W"), self).activated.connect(self.close_current_tab)
         QShortcut(QKeySequence("Ctrl+L"), self).activated.connect(self.focus_address_bar)
         QShortcut(QKeySequence("Alt+D"), self).activated.connect(self.focus_address_bar)
+        QShortcut(QKeySequence("Ctrl+P"), self).activated.connect(self.global_search.popup) # v12.17
         
         # --- v9.2 サイドバー開閉 ---
         QShortcut(QKeySequence("Ctrl+B"), self).activated.connect(self.toggle_sidebar)
@@ -486,6 +510,10 @@ class ChainFlowFiler(QMainWindow):
 
     # --- Address Bar Actions ---
 
+    def on_favorites_changed(self, paths):
+        if self.index_roots is None:
+            shared_path_index().setRoots(paths)
+
     def toggle_favorites_focus(self):
         """v6.5 Fキーでお気に入り欄とペインのフォーカスを行き来する"""
         fav_list = self.nav.fav_list
@@ -528,7 +556,8 @@ class ChainFlowFiler(QMainWindow):
             elif key == "Z": self.run_on_hovered(lambda p: p.toggle_sort(3))
             elif key == "D": self.run_on_hovered(lambda p: p.cycle_display_mode())
             elif key == "C": self.run_on_hovered(lambda p: p.toggle_compact())
-            # X, E は現在はグローバルアクションなし
+            elif key == "X": self.run_on_hovered(lambda p: p.toggle_natural_sort()) # v12.8
+            elif key == "E": self.run_on_hovered(lambda p: p.toggle_fuzzy_search()) # v12.18
 
     def focus_address_bar(self):
         if self.address_bar.hasFocus():
@@ -541,14 +570,101 @@ class ChainFlowFiler(QMainWindow):
             self.address_bar.setFocus()
             self.address_bar.selectAll()
 
+    def jump_base_dir(self):
+        """相対パス・子フォルダの候補の基準（最後に触れたペインのフォルダ）"""
+        if self.hovered_pane and self.hovered_pane.current_paths:
+            return self.hovered_pane.current_paths[0]
+        return None
+
+    def update_jump_candidates(self, text):
+        """
+        v12.18 入力中のテキストがパスとして存在しなければ、移動先の候補を点数順に出す。
+        NameSearch で DEBOUNCE_MS 待ってから、存在確認と候補の照合をまとめてワーカーで行う
+        """
+        self._open_jump_when_ready = False
+        if not text.strip():
+            self.jump_search.cancel()
+            self._jump_result = None
+            self.jump_model.setStringList([])
+            self.jump_completer.popup().hide()
+            return
+        self.request_jump(text)
+
+    def request_jump(self, text):
+        """text の存在確認と移動先の候補をワーカーに頼む（結果は on_jump_candidates）"""
+        path = os.path.expanduser(text.strip())
+
+        def tasks():
+            favorites = self.nav.favorite_paths()
+            base_dir = self.jump_base_dir()
+
+            def find(job):
+                state = shared_stat_service().state(path)
+                if state in (PATH_DIR, PATH_FILE):
+                    return state, []
+                return state, jump_candidates(text, favorites, base_dir)
+            return [(None, find)]
+        self.jump_search.request(text, tasks)
+
+    def on_jump_candidates(self, text, results):
+        if text != self.address_bar.text():
+            return
+        state, candidates = results[0][1] if results else (None, [])
+        self._jump_result = (text, state, candidates)
+        if self._open_jump_when_ready:
+            # 結果を待っている間に Enter が押された
+            self._open_jump_when_ready = False
+            self.open_jump_result()
+            return
+        if not self.address_bar.hasFocus():
+            return
+        self.jump_model.setStringList(candidates)
+        if candidates:
+            self.jump_completer.complete()
+        else:
+            self.jump_completer.popup().hide()
+
+    def on_jump_activated(self, path):
+        # 候補は列挙で見つけたフォルダなので、確かめずに移動する
+        self.address_bar.setText(path)
+        self.open_address(path)
+
     def on_address_return(self):
-        path = self.address_bar.text().strip()
-        if path and os.path.exists(path):
-            self.reset_flow_from(path)
-            self.tab_widget.currentWidget().setFocus() # フォーカスを戻す
-        elif path:
-             # パスが無効な場合は通知（簡易的に）
-             self.address_bar.setStyleSheet(self.address_bar.styleSheet() + "QLineEdit { border-color: #f44; }")
+        """
+        入力したパスへ移動する。v12.18 存在しなければ最もよく一致する移動先へ。
+        存在の確認・候補の照合はワーカーの結果を使い（まだなら届いてから移動する）、GUI スレッドでは stat しない
+        """
+        text = self.address_bar.text()
+        if not text.strip():
+            return
+        path = os.path.expanduser(text.strip())
+        if shared_stat_service().state(path, wait=False) in (PATH_DIR, PATH_FILE):
+            self.jump_search.cancel()
+            self.open_address(path)
+            return
+        if self._jump_result is not None and self._jump_result[0] == text and not self.jump_search.isPending():
+            self.open_jump_result()
+            return
+        self._open_jump_when_ready = True
+        if not self.jump_search.isPending():
+            self.request_jump(text)
+
+    def open_jump_result(self):
+        text, state, candidates = self._jump_result
+        if state in (PATH_DIR, PATH_FILE):
+            self.open_address(os.path.expanduser(text.strip()))
+        elif candidates:
+            self.address_bar.setText(candidates[0])
+            self.open_address(candidates[0])
+        else:
+            # パスが無効な場合は通知（簡易的に）
+            self.jump_completer.popup().hide()
+            self.address_bar.setStyleSheet(self.address_bar.styleSheet() + "QLineEdit { border-color: #f44; }")
+
+    def open_address(self, path):
+        self.jump_completer.popup().hide()
+        self.reset_flow_from(path)
+        self.tab_widget.currentWidget().setFocus() # フォーカスを戻す
 
     def update_address_bar(self, path):
         if not self.address_bar.hasFocus():
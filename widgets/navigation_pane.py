@@ -3,10 +3,15 @@ import sys
 import json
 from PySide6.QtWidgets import (QFrame, QVBoxLayout, QWidget, QLabel, QApplication,
                                QTreeView, QListWidget, QListWidgetItem, QMenu, QFileSystemModel,
-                               QToolButton, QStyle, QFileIconProvider, QAbstractItemView, QSizePolicy, QSpacerItem, QSplitter)
-from PySide6.QtCore import Qt, QDir, QUrl, QSize, QFileInfo, QEvent
+                               QToolButton, QStyle, QAbstractItemView, QSizePolicy, QSpacerItem, QSplitter)
+from PySide6.QtCore import Qt, QDir, QUrl, QSize, QEvent, Signal
 from PySide6.QtGui import QAction, QDesktopServices, QIcon
 
+from models.proxy_model import SmartSortFilterProxyModel
+from models.fs_registry import shared_model_registry
+from models.stat_service import shared_stat_service, PATH_FILE, PATH_UNREACHABLE
+from models.icon_cache import shared_icon_cache
+
 class DragDropListWidget(QListWidget):
     """
     ドラッグ＆ドロップでお気に入りを登録・並び替えできるカスタムリスト
@@ -96,6 +101,8 @@ class SectionHeader(QToolButton):
             """)
 
 class NavigationPane(QFrame):
+    favoritesChanged = Signal(list) # v12.17 保存したお気に入りのパス
+
     def __init__(self, parent_filer=None):
         super().__init__()
         self.parent_filer = parent_filer
@@ -171,6 +178,7 @@ class NavigationPane(QFrame):
         self.fav_list.itemClicked.connect(self.on_fav_clicked)
         self.fav_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.fav_list.customContextMenuRequested.connect(self.open_fav_menu)
+        shared_stat_service().stateChanged.connect(self._on_path_state_changed) # v12.12
         
         self.fav_header.clicked.connect(lambda checked: self.toggle_section(self.fav_list))
         
@@ -189,13 +197,18 @@ class NavigationPane(QFrame):
         self.drv_header.setArrowType(Qt.RightArrow)
         
         # Drive Tree Setup
-        self.model = QFileSystemModel()
-        self.model.setRootPath("")
-        self.model.setFilter(QDir.AllDirs | QDir.NoDotAndDotDot | QDir.Drives)
+        # v12.1 ペインと同じ共有モデルを使い、フォルダのみの表示はProxyで行う
+        registry = shared_model_registry()
+        self.model = registry.acquire()
+        self.destroyed.connect(lambda *_: registry.release())
+        self.tree_proxy = SmartSortFilterProxyModel()
+        self.tree_proxy.setSourceModel(self.model)
+        self.tree_proxy.setDisplayMode(1) # Dirs Only
+        self.tree_proxy.sort(0, Qt.AscendingOrder)
         
         self.tree = QTreeView()
-        self.tree.setModel(self.model)
-        self.tree.setRootIndex(self.model.index(""))
+        self.tree.setModel(self.tree_proxy)
+        self.tree.setRootIndex(self.tree_proxy.mapFromSource(self.model.index("")))
         for i in range(1, 4): self.tree.hideColumn(i)
         self.tree.setHeaderHidden(True)
         self.tree.setFrameStyle(QFrame.NoFrame)
@@ -310,11 +323,13 @@ class NavigationPane(QFrame):
             ("Videos", os.path.join(home, "Videos")),
         ]
         
-        provider = QFileIconProvider()
+        # v12.14 アイコンは共有キャッシュから（特別なフォルダごとに1回だけ引く）
+        icons = shared_icon_cache()
+        stat = shared_stat_service()
         
         for name, path in items:
-            if os.path.exists(path):
-                icon = provider.icon(QFileInfo(path))
+            if stat.is_dir(path):
+                icon = icons.folder_icon(path)
                 item = QListWidgetItem(icon, name)
                 item.setToolTip(path)
                 self.std_list.addItem(item)
@@ -427,7 +442,7 @@ class NavigationPane(QFrame):
             self.open_path(path)
 
     def on_tree_clicked(self, index):
-        path = self.model.filePath(index)
+        path = self.model.filePath(self.tree_proxy.mapToSource(index))
         if os.path.isdir(path): self.open_path(path)
 
     def open_path(self, path):
@@ -460,14 +475,16 @@ class NavigationPane(QFrame):
                 self.refresh_item_labels()
             except: pass
 
+    def favorite_paths(self):
+        return [self.fav_list.item(i).toolTip() for i in range(self.fav_list.count())]
+
     def save_favorites(self):
-        paths = []
-        for i in range(self.fav_list.count()):
-            paths.append(self.fav_list.item(i).toolTip())
+        paths = self.favorite_paths()
         try:
             with open(self.fav_file, "w", encoding="utf-8") as f:
                 json.dump(paths, f, ensure_ascii=False, indent=2)
         except: pass
+        self.favoritesChanged.emit(paths)
 
     def add_favorite(self, path):
         for i in range(self.fav_list.count()):
@@ -489,11 +506,19 @@ class NavigationPane(QFrame):
 
     def refresh_item_labels(self):
         hotkeys = ["Q", "A", "Z", "W", "S", "X", "E", "D", "C"]
+        # v12.12 種別は待たずにキャッシュから取る。未確定なら後で _on_path_state_changed が描き直す
+        stat = shared_stat_service()
         for i in range(self.fav_list.count()):
             item = self.fav_list.item(i)
             path = item.toolTip()
             name = os.path.basename(path) or path
-            prefix = "📁 " if os.path.isdir(path) else "📄 "
+            state = stat.state(path, wait=False)
+            if state == PATH_UNREACHABLE:
+                prefix = "⚠ "
+            elif state == PATH_FILE:
+                prefix = "📄 "
+            else:
+                prefix = "📁 " # 未確定の間はフォルダとして表示（お気に入りのほとんどはフォルダ）
             
             hk_prefix = ""
             if i < len(hotkeys):
@@ -501,6 +526,13 @@ class NavigationPane(QFrame):
             
             item.setText(f"{hk_prefix}{prefix}{name}")
 
+    def _on_path_state_changed(self, path, state):
+        """v12.12 お気に入りのパスの種別が確定・変化したらラベルを更新する"""
+        for i in range(self.fav_list.count()):
+            if os.path.abspath(self.fav_list.item(i).toolTip()) == path:
+                self.refresh_item_labels()
+                return
+
     def open_fav_menu(self, pos):
         item = self.fav_list.itemAt(pos)
         if not item: return
@@ -6,6 +6,9 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTextEdit, QHBoxLay
 from PySide6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, QPoint, QTimer
 from PySide6.QtGui import QPixmap, QImage, QFont, QColor, QPalette, QKeyEvent
 
+from models.folder_sizes import shared_folder_size_service, format_folder_size, COMPUTING_TEXT
+from models.listing_cache import shared_listing_cache
+
 class QuickLookWindow(QWidget):
     def __init__(self, parent=None):
         # WindowStaysOnTopHint: 常に最前面
@@ -21,6 +24,9 @@ class QuickLookWindow(QWidget):
         self.log("Initialized")
         
         self.setup_ui()
+        # v12.23 フォルダはペインのサイズ列と同じキャッシュ・集計で合計を出す（届いたら表示し直す）
+        self._folder_path = None
+        shared_folder_size_service().sizeReady.connect(self._on_folder_size)
         
     def log(self, message):
         try:
@@ -144,6 +150,7 @@ class QuickLookWindow(QWidget):
             self.header_label.setText(os.path.basename(path))
             
             # リセット
+            self._folder_path = None
             self.image_label.hide()
             self.text_edit.hide()
             self.info_label.hide()
@@ -152,11 +159,8 @@ class QuickLookWindow(QWidget):
             # フォルダの場合
             if os.path.isdir(path):
                 self.log("Type: Folder")
-                try:
-                    items = len(os.listdir(path))
-                    self.show_info(f"📁 Folder\n\nContains {items} items.")
-                except:
-                    self.show_info("📁 Folder\n\n(Access Denied)")
+                self._folder_path = path
+                self.show_folder_info(path)
                 return
 
             ext = os.path.splitext(path)[1].lower()
@@ -236,6 +240,25 @@ class QuickLookWindow(QWidget):
             self.copy_btn.setText("Copied!")
             QTimer.singleShot(1000, lambda: self.copy_btn.setText(orig_text))
 
+    def show_folder_info(self, path):
+        """v12.23 フォルダの合計（無ければ裏で数え、届いたら _on_folder_size で表示し直す）"""
+        service = shared_folder_size_service()
+        requested = service.request(path)
+        entry = service.cache().get(path)
+        lines = ["📁 Folder", ""]
+        rows = shared_listing_cache().get(path, count_stats=False) # 開いたことのあるフォルダだけ（列挙しない）
+        if rows is not None:
+            lines.append(f"Contains {len(rows):,} items.")
+        if entry is not None:
+            lines.append(f"Total: {format_folder_size(entry)}")
+        elif requested:
+            lines.append(f"Total: {COMPUTING_TEXT}")
+        self.show_info("\n".join(lines))
+
+    def _on_folder_size(self, path):
+        if self._folder_path and os.path.normcase(os.path.abspath(path)) == os.path.normcase(os.path.abspath(self._folder_path)):
+            self.show_folder_info(self._folder_path)
+
     def show_info(self, text):
         self.log(f"Show Info: {text.replace(chr(10), ' ')}")
         self.info_label.setText(text)